@@ -1,4 +1,5 @@
 import abc
+import asyncio
 import socketserver
 import socket
 import threading
@@ -7,13 +8,22 @@ from loguru import logger
 from ._AndroidBase import AndroidBotBase
 from ._WebBase import WebBotBase
 from ._WinBase import WinBotBase
-from ._utils import _protect, _ThreadingTCPServer, get_local_ip, Log_Format
+from ._multiprocess import serve_workers
+from ._pool import driver_pool
+from ._metrics import Metrics
+from ._protocol import FrameReader
+from ._AsyncBase import AsyncAndroidBot, _AsyncScriptServer, _async_script_class
+from ._utils import _protect, _create_server, get_local_ip, Log_Format
+
+
+class AndroidBotMain(socketserver.BaseRequestHandler, AndroidBotBase, metaclass=_protect("handle", "execute", "execute_async")):
+    # Socket 服务配置：max_sessions 大于 0 时使用有界线程池，最多同时运行 max_sessions 个 script_main，
+    # 超出的连接最多排队 session_queue_size 个，再多则拒绝；thread_stack_size 为工作线程栈大小（字节），0 为系统默认
+    request_queue_size = 5
+    max_sessions = 0
+    session_queue_size = 128
+    thread_stack_size = 0
 
-WIN_DRIVER: WinBotBase | None = None
-WEB_DRIVER: WebBotBase | None = None
-
-
-class AndroidBotMain(socketserver.BaseRequestHandler, AndroidBotBase, metaclass=_protect("handle", "execute")):
     def __init__(self, request, client_address, server):
         self.log = logger
 
@@ -25,6 +35,9 @@ class AndroidBotMain(socketserver.BaseRequestHandler, AndroidBotBase, metaclass=
                              retention='0 days')
 
         self._lock = threading.Lock()
+        self._metrics = Metrics()
+        self._reader = FrameReader(request, client_address)
+        self._leased_drivers = []
         super().__init__(request, client_address, server)
 
     def handle(self) -> None:
@@ -39,7 +52,13 @@ class AndroidBotMain(socketserver.BaseRequestHandler, AndroidBotBase, metaclass=
         # t = threading.Thread(target=heart_check)
         # t.join()
         # t.start()
-        self.script_main()
+        try:
+            self.script_main()
+        finally:
+            # 会话结束，归还 build_*_driver 借用的驱动连接
+            for driver in self._leased_drivers:
+                driver_pool.checkin(driver)
+            self._leased_drivers.clear()
 
     @abc.abstractmethod
     def script_main(self):
@@ -47,10 +66,11 @@ class AndroidBotMain(socketserver.BaseRequestHandler, AndroidBotBase, metaclass=
         """
 
     @classmethod
-    def execute(cls, listen_port: int):
+    def execute(cls, listen_port: int, workers: int = 1):
         """
         启动 Socket 服务，执行脚本
 
+        :param workers: 工作进程数，大于 1 时以 spawn 方式启动多个进程共同监听该端口，脚本入口需位于 if __name__ == '__main__' 中
         :return:
         """
 
@@ -66,37 +86,82 @@ class AndroidBotMain(socketserver.BaseRequestHandler, AndroidBotBase, metaclass=
         local_ip = get_local_ip()
 
         # 启动 Socket 服务
-        sock = _ThreadingTCPServer(socket_address, cls, bind_and_activate=True)
-        sock.request_queue_size = int(getattr(cls, "request_queue_size", 5))
+        if workers > 1:
+            print(f"Server stared on {local_ip}:{socket_address[1]}, workers: {workers}")
+            serve_workers(cls, socket_address, workers)
+            return
+
+        sock = _create_server(socket_address, cls)
         print(f"Server stared on {local_ip}:{socket_address[1]}")
         sock.serve_forever()
 
+    @classmethod
+    def execute_async(cls, listen_port: int):
+        """
+        在单个 asyncio 事件循环中启动 Socket 服务，执行脚本
+
+        脚本类的 ``script_main`` 需要使用 ``async def`` 定义，其中的 self 为 AsyncAndroidBot，需要 await 调用各方法；
+        每个设备连接运行一个 script_main 协程，不再为每个设备创建线程。
+
+        :param listen_port: 脚本监听的端口
+        :return:
+        """
+        if listen_port < 0 or listen_port > 65535:
+            raise OSError("`listen_port` must be in 0-65535.")
+
+        # 获取 IPv4 可用地址
+        address_info = \
+            socket.getaddrinfo(None, listen_port, socket.AF_INET, socket.SOCK_STREAM, 0, socket.AI_PASSIVE)[0]
+        *_, socket_address = address_info
+
+        # 获取局域网 IP
+        local_ip = get_local_ip()
+
+        if cls.log_storage:
+            path = "runtime.log"
+            if path not in str(logger._core.handlers):
+                logger.add(path, level=cls.log_level.upper(), format=Log_Format,
+                           rotation=f'{cls.log_size} MB',
+                           retention='0 days')
+
+        script_cls = _async_script_class(cls, AndroidBotMain, AsyncAndroidBot)
+        asyncio.run(_AsyncScriptServer(script_cls).serve_forever(socket_address, local_ip))
+
     def build_web_driver(self, listen_port: int, local: bool = True, driver_params: dict = None,
                          new_driver=False) -> WebBotBase:
         """
         构建 web driver
 
+        从驱动连接池 driver_pool 借用连接，连接在多个脚本会话间复用，会话结束时自动归还；
+        local 为 True 时每个端口的最大连接数由 driver_pool.pool_size 配置（每个连接启动一个驱动进程），
+        超出时与其他会话共用借用数最少的连接；pool_size 默认为 1，即所有会话共用同一个连接、请求逐个收发，
+        多个会话需要并发操作驱动时应调大，例如在启动脚本前设置 driver_pool.pool_size = 4；
+        远程部署（local 为 False）时所有会话共用同一个连接
+
         :param listen_port: Web 脚本要监听的端口
         :param local: 脚本是否部署在本地
         :param driver_params: Web 驱动启动参数
-        :param new_driver: 是否强制获取新的 Web 脚本驱动
+        :param new_driver: 是否丢弃已有连接，强制获取新的 Web 脚本驱动
         """
-        global WEB_DRIVER
-        with self._lock:
-            if WEB_DRIVER is None or new_driver:
-                WEB_DRIVER = WebBotBase._build(listen_port, local, driver_params)
-        return WEB_DRIVER
+        driver = driver_pool.checkout("web", listen_port, {"local": local, "driver_params": driver_params},
+                                      shared=True, new_driver=new_driver)
+        self._leased_drivers.append(driver)
+        return driver
 
     def build_win_driver(self, listen_port: int, local: bool = True, new_driver=False) -> WinBotBase:
         """
         构建 win driver
 
+        从驱动连接池 driver_pool 借用连接，连接在多个脚本会话间复用，会话结束时自动归还；
+        local 为 True 时每个端口的最大连接数由 driver_pool.pool_size 配置（每个连接启动一个驱动进程），
+        超出时与其他会话共用借用数最少的连接；pool_size 默认为 1，即所有会话共用同一个连接、请求逐个收发，
+        多个会话需要并发操作驱动时应调大，例如在启动脚本前设置 driver_pool.pool_size = 4；
+        远程部署（local 为 False）时所有会话共用同一个连接
+
         :param listen_port: Win 脚本要监听的端口
         :param local: 脚本是否部署在本地
-        :param new_driver: 是否强制获取新的 Win 脚本驱动
+        :param new_driver: 是否丢弃已有连接，强制获取新的 Win 脚本驱动
         """
-        global WIN_DRIVER
-        with self._lock:
-            if WIN_DRIVER is None or new_driver:
-                WIN_DRIVER = WinBotBase._build(listen_port, local)
-        return WIN_DRIVER
+        driver = driver_pool.checkout("win", listen_port, {"local": local}, shared=True, new_driver=new_driver)
+        self._leased_drivers.append(driver)
+        return driver
@@ -1,4 +1,5 @@
 import abc
+import asyncio
 import socket
 import socketserver
 import subprocess
@@ -9,13 +10,38 @@ from loguru import logger
 from AiBot._AndroidBase import AndroidBotBase
 from AiBot._WebBase import WebBotBase
 from AiBot._WinBase import WinBotBase
-from AiBot._utils import _protect, _ThreadingTCPServer, get_local_ip, Log_Format
+from AiBot._AsyncBase import AsyncWinBot, _AsyncScriptServer, _async_script_class
+from AiBot._multiprocess import serve_workers
+from AiBot._pool import driver_pool
+from AiBot._metrics import Metrics
+from AiBot._protocol import FrameReader
+from AiBot._utils import _protect, _create_server, get_local_ip, Log_Format
+
+
+def _start_windows_driver(listen_port: int):
+    """
+    本地部署时自动启动 WindowsDriver.exe
+
+    :param listen_port: 脚本监听的端口
+    :return:
+    """
+    try:
+        subprocess.Popen(["WindowsDriver.exe", "127.0.0.1", str(listen_port)])
+        print("本地启动 WindowsDriver 成功，开始执行脚本")
+    except FileNotFoundError as e:
+        err_msg = "\n异常排除步骤：\n1. 检查 Aibote.exe 路径是否存在中文；\n2. 是否启动 Aibote.exe 初始化环境变量；\n3. 检查电脑环境变量是否初始化成功，环境变量中是否存在 %Aibote% 开头的；\n4. 首次初始化环境变量后，是否重启开发工具；\n5. 是否以管理员权限启动开发工具；\n"
+        print("\033[92m", err_msg, "\033[0m")
+        raise e
+
+
+class WinBotMain(socketserver.BaseRequestHandler, WinBotBase, metaclass=_protect("handle", "execute", "execute_async")):
+    # Socket 服务配置：max_sessions 大于 0 时使用有界线程池，最多同时运行 max_sessions 个 script_main，
+    # 超出的连接最多排队 session_queue_size 个，再多则拒绝；thread_stack_size 为工作线程栈大小（字节），0 为系统默认
+    request_queue_size = 5
+    max_sessions = 0
+    session_queue_size = 128
+    thread_stack_size = 0
 
-AND_DRIVER: AndroidBotBase | None = None
-WEB_DRIVER: WebBotBase | None = None
-
-
-class WinBotMain(socketserver.BaseRequestHandler, WinBotBase, metaclass=_protect("handle", "execute")):
     def __init__(self, request, client_address, server):
         self.log = logger
 
@@ -27,10 +53,19 @@ class WinBotMain(socketserver.BaseRequestHandler, WinBotBase, metaclass=_protect
                              retention='0 days')
 
         self._lock = threading.Lock()
+        self._metrics = Metrics()
+        self._reader = FrameReader(request, client_address)
+        self._leased_drivers = []
         super().__init__(request, client_address, server)
 
     def handle(self) -> None:
-        self.script_main()
+        try:
+            self.script_main()
+        finally:
+            # 会话结束，归还 build_*_driver 借用的驱动连接
+            for driver in self._leased_drivers:
+                driver_pool.checkin(driver)
+            self._leased_drivers.clear()
 
     @abc.abstractmethod
     def script_main(self):
@@ -38,12 +73,13 @@ class WinBotMain(socketserver.BaseRequestHandler, WinBotBase, metaclass=_protect
         """
 
     @classmethod
-    def execute(cls, listen_port: int, local: bool = True):
+    def execute(cls, listen_port: int, local: bool = True, workers: int = 1):
         """
         多线程启动 Socket 服务
 
         :param listen_port: 脚本监听的端口
         :param local: 脚本是否部署在本地
+        :param workers: 工作进程数，大于 1 时以 spawn 方式启动多个进程共同监听该端口，脚本入口需位于 if __name__ == '__main__' 中
         :return:
         """
 
@@ -60,46 +96,91 @@ class WinBotMain(socketserver.BaseRequestHandler, WinBotBase, metaclass=_protect
 
         # 如果是本地部署，则自动启动 WindowsDriver.exe
         if local:
-            try:
-                subprocess.Popen(["WindowsDriver.exe", "127.0.0.1", str(listen_port)])
-                print("本地启动 WindowsDriver 成功，开始执行脚本")
-            except FileNotFoundError as e:
-                err_msg = "\n异常排除步骤：\n1. 检查 Aibote.exe 路径是否存在中文；\n2. 是否启动 Aibote.exe 初始化环境变量；\n3. 检查电脑环境变量是否初始化成功，环境变量中是否存在 %Aibote% 开头的；\n4. 首次初始化环境变量后，是否重启开发工具；\n5. 是否以管理员权限启动开发工具；\n"
-                print("\033[92m", err_msg, "\033[0m")
-                raise e
+            _start_windows_driver(listen_port)
         else:
             print("等待驱动连接...")
 
         # 启动 Socket 服务
-        sock = _ThreadingTCPServer(socket_address, cls, bind_and_activate=True)
+        if workers > 1:
+            print(f"Server stared on {local_ip}:{socket_address[1]}, workers: {workers}")
+            serve_workers(cls, socket_address, workers)
+            return
+
+        sock = _create_server(socket_address, cls)
         print(f"Server stared on {local_ip}:{socket_address[1]}")
         sock.serve_forever()
 
+    @classmethod
+    def execute_async(cls, listen_port: int, local: bool = True):
+        """
+        在单个 asyncio 事件循环中启动 Socket 服务
+
+        脚本类的 ``script_main`` 需要使用 ``async def`` 定义，其中的 self 为 AsyncWinBot，需要 await 调用各方法；
+        每个驱动连接运行一个 script_main 协程，不再为每个连接创建线程。
+
+        :param listen_port: 脚本监听的端口
+        :param local: 脚本是否部署在本地
+        :return:
+        """
+        if listen_port < 0 or listen_port > 65535:
+            raise OSError("`listen_port` must be in 0-65535.")
+
+        # 获取 IPv4 可用地址
+        address_info = socket.getaddrinfo(None, listen_port, socket.AF_INET, socket.SOCK_STREAM, 0, socket.AI_PASSIVE)[
+            0]
+        *_, socket_address = address_info
+
+        # 获取局域网 IP
+        local_ip = get_local_ip()
+
+        if cls.log_storage:
+            path = "runtime.log"
+            if path not in str(logger._core.handlers):
+                logger.add(path, level=cls.log_level.upper(), format=Log_Format,
+                           rotation=f'{cls.log_size} MB',
+                           retention='0 days')
+
+        script_cls = _async_script_class(cls, WinBotMain, AsyncWinBot)
+
+        # 如果是本地部署，则自动启动 WindowsDriver.exe
+        if local:
+            _start_windows_driver(listen_port)
+        else:
+            print("等待驱动连接...")
+
+        asyncio.run(_AsyncScriptServer(script_cls).serve_forever(socket_address, local_ip))
+
     def build_android_driver(self, listen_port: int, new_driver=False) -> AndroidBotBase:
         """
         构建 android driver
 
+        从驱动连接池 driver_pool 借用连接，连接在多个脚本会话间复用，会话结束时自动归还；
+        Android 驱动由手机主动连入，无法按需建立新连接，所有会话共用同一个连接、请求逐个收发
+
         :param listen_port: Android 脚本要监听的端口
-        :param new_driver: 是否强制获取新的 Android 脚本驱动
+        :param new_driver: 是否丢弃已有连接，强制获取新的 Android 脚本驱动
         """
-        global AND_DRIVER
-        with self._lock:
-            if AND_DRIVER is None or new_driver:
-                AND_DRIVER = AndroidBotBase._build(listen_port)
-        return AND_DRIVER
+        driver = driver_pool.checkout("android", listen_port, shared=True, new_driver=new_driver)
+        self._leased_drivers.append(driver)
+        return driver
 
     def build_web_driver(self, listen_port: int, local: bool = True, driver_params: dict = None,
                          new_driver=False) -> WebBotBase:
         """
         构建 web driver
 
+        从驱动连接池 driver_pool 借用连接，连接在多个脚本会话间复用，会话结束时自动归还；
+        local 为 True 时每个端口的最大连接数由 driver_pool.pool_size 配置（每个连接启动一个驱动进程），
+        超出时与其他会话共用借用数最少的连接；pool_size 默认为 1，即所有会话共用同一个连接、请求逐个收发，
+        多个会话需要并发操作驱动时应调大，例如在启动脚本前设置 driver_pool.pool_size = 4；
+        远程部署（local 为 False）时所有会话共用同一个连接
+
         :param listen_port: Web 脚本要监听的端口
         :param local: 脚本是否部署在本地
         :param driver_params: Web 驱动启动参数
-        :param new_driver: 是否强制获取新的 Web 脚本驱动
+        :param new_driver: 是否丢弃已有连接，强制获取新的 Web 脚本驱动
         """
-        global WEB_DRIVER
-        with self._lock:
-            if WEB_DRIVER is None or new_driver:
-                WEB_DRIVER = WebBotBase._build(listen_port, local, driver_params)
-        return WEB_DRIVER
+        driver = driver_pool.checkout("web", listen_port, {"local": local, "driver_params": driver_params},
+                                      shared=True, new_driver=new_driver)
+        self._leased_drivers.append(driver)
+        return driver
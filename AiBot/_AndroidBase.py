@@ -1,14 +1,26 @@
+import contextlib
+import hashlib
 import json
-import socket
+import os
 import threading
 import time
-from ast import literal_eval
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple, Any, Callable, Union
 
 from loguru import logger
 
-from ._utils import _Point_Tuple, _Region, _Algorithm, _SubColors, Point, Point2s
+from ._conditions import Condition, ImageCondition, ColorCondition, ElementCondition, ElementTextCondition, \
+    TextCondition
+from ._frame import Frame, FrozenFrame
+from ._metrics import Metrics, prometheus_text
+from ._ocr import OcrCache, OcrLine, OcrPage, TextMatcher, parse_ocr
+from ._protocol import FrameReader, Pipeline, BufferBody, FileBody, FileSink, TransferStats, encode_frame, \
+    encode_file_header, transact
+from ._sync import sync_dir
+from ._templates import TemplateRegistry
+from ._trace import should_trace, preview
+from ._wait import Waiter, WaitStats
+from ._utils import _Point_Tuple, _Region, _Algorithm, _SubColors, Point, Point2s, _ocr_text_points, _shared_listener
 
 
 # _LOG_PATH = Path(__file__).parent.resolve() / "logs"
@@ -37,23 +49,59 @@ class AndroidBotBase:
     wait_timeout = 3  # seconds
     interval_timeout = 0.5  # seconds
 
+    # 轮询等待：间隔的指数增长倍数（1 表示固定间隔）、最大间隔、随机抖动比例，见 Waiter
+    wait_backoff = 1.0
+    wait_max_interval: Optional[float] = None
+    wait_jitter = 0.0
+    # 最近一次轮询等待的统计
+    last_wait: Optional[WaitStats] = None
+
     log_storage = False
     log_level = "INFO"
     log_size = 10  # MB
     log = logger
 
+    # 调试日志：数据预览的最大字节数（0 表示不截断），以及每 N 帧记录一帧
+    trace_preview_size = 256
+    trace_sample_rate = 1
+
+    # 当前连接的请求流水线
+    _pipeline: Optional[Pipeline] = None
+
+    # 最近一次文件传输的统计
+    last_transfer: Optional[TransferStats] = None
+
+    # 是否记录命令统计，见 metrics()
+    metrics_enabled = True
+    _metrics: Optional[Metrics] = None
+
+    # 当前的冻结截图帧，见 frozen_frame()；以下命令会改变屏幕内容，发送时作废冻结帧
+    _frozen: Optional[FrozenFrame] = None
+    frozen_frame_invalidated_by = frozenset({
+        "click", "doubleClick", "longClick", "swipe", "dispatchGesture", "press", "move", "release", "sendKeys",
+        "sendVk", "back", "home", "recents", "powerDialog", "clickElement", "setElementText", "scrollElement",
+        "startApp", "startActivity", "openUri",
+    })
+
+    # 找图模板注册表，find_image、find_images 的图片名称为注册表中的逻辑名称时自动同步并替换为手机上的图片名称
+    template_registry: Optional[TemplateRegistry] = None
+    _templates_synced = False
+
+    # OCR 识别结果缓存，见 OcrCache；识别前先截取识别区域，截图内容未变化时直接返回缓存的结果
+    ocr_cache: Optional[OcrCache] = None
+    # 计算截图内容摘要时的截图缩放率，越小截图越快
+    ocr_cache_hash_scale = 0.5
+
     # 基础存储路径
     _base_path = "/storage/emulated/0/Android/data/com.aibot.client/files/"
 
     def __init__(self, port):
         self._lock = threading.Lock()
-        address_info = socket.getaddrinfo(None, port, socket.AF_INET, socket.SOCK_STREAM)[0]
-        family, socket_type, proto, _, socket_address = address_info
-        server = socket.socket(family, socket_type, proto)
-        server.bind(socket_address)
-        server.listen(1)
+        self._metrics = Metrics()
+        server = _shared_listener(port)
         print("AndroidSocket服务启动成功，等待客户端链接...")
         self.request, self.client_address = server.accept()
+        self._reader = FrameReader(self.request, self.client_address)
         print("AndroidSocket客户端链接成功")
 
     @classmethod
@@ -67,27 +115,17 @@ class AndroidBotBase:
 
         return AndroidBotBase(listen_port)
 
-    def __send_data_return_bytes(self, *args) -> bytes:
-        args_len = ""
-        args_text = ""
-
-        for argv in args:
-            argv = str(argv)
-            args_text += argv
-            args_len += str(len(bytes(argv, 'utf8'))) + "/"
-
-        data = (args_len.strip("/") + "\n" + args_text).encode("utf8")
+    def __send_data_return_bytes(self, *args) -> bytearray:
+        if self._frozen is not None and args[0] in self.frozen_frame_invalidated_by:
+            self._frozen.invalidate()
+        data = encode_frame(*args)
         try:
-            with self._lock:
-                self.log.debug(rf"---> {data}")
-                self.request.sendall(data)
-                response = self.request.recv(65535)
-                if response == b"":
-                    raise ConnectionAbortedError(f"{self.client_address[0]}:{self.client_address[1]} 客户端断开链接")
-                data_length, data = response.split(b"/", 1)
-                while int(data_length) > len(data):
-                    data += self.request.recv(65535)
-                self.log.debug(rf"<--- {data}")
+            traced = should_trace(self)
+            if traced:
+                self.log.debug(f"---> {preview(data, self.trace_preview_size)}")
+            data = transact(self, data, command=args[0])
+            if traced:
+                self.log.debug(f"<--- {preview(data, self.trace_preview_size)}")
         except Exception as e:
             self.log.error("send/read tcp data error: " + str(e))
             raise e
@@ -97,56 +135,62 @@ class AndroidBotBase:
         data = self.__send_data_return_bytes(*args)
         return data.decode("utf8").strip()
 
-    def __push_file(self, func_name: str, to_path: str, file: bytes):
-        func_name = bytes(func_name, "utf8")
-        to_path = bytes(to_path, "utf8")
-
-        str_data = ""
-        str_data += str(len(func_name)) + "/"  # func_name 字节长度
-        str_data += str(len(to_path)) + "/"  # to_path 字节长度
-        str_data += str(len(file)) + "\n"  # file 字节长度
-
-        bytes_data = bytes(str_data, "utf8")
-        bytes_data += func_name
-        bytes_data += to_path
-        bytes_data += file
-
-        with self._lock:
-            self.log.debug(rf"---> {bytes_data}")
-            self.request.sendall(bytes_data)
-            response = self.request.recv(65535)
-            if response == b"":
-                raise ConnectionAbortedError(f"{self.client_address[0]}:{self.client_address[1]} 客户端断开链接")
-            data_length, data = response.split(b"/", 1)
-            while int(data_length) > len(data):
-                data += self.request.recv(65535)
-            self.log.debug(rf"<--- {data}")
+    def __push_file(self, func_name: str, to_path: str, file: Union[FileBody, BufferBody]):
+        # 头部与文件内容分开发送，文件内容从磁盘或内存分块发送，不在内存中保留副本
+        header = encode_file_header(func_name, to_path, len(file))
+
+        traced = should_trace(self)
+        if traced:
+            self.log.debug(f"---> {preview(header, self.trace_preview_size)}")
+        data = transact(self, header, file, command=func_name)
+        if traced:
+            self.log.debug(f"<--- {preview(data, self.trace_preview_size)}")
 
         return data.decode("utf8").strip()
 
-    def __pull_file(self, *args) -> bytes:
-        args_len = ""
-        args_text = ""
+    def __pull_file(self, func_name: str, remote_path: str, file: FileSink) -> int:
+        # 响应数据按固定大小的缓冲区接收后直接写入文件，不在内存中保留副本
+        data = encode_frame(func_name, remote_path)
 
-        for argv in args:
-            argv = str(argv)
-            args_text += argv
-            args_len += str(len(bytes(argv, 'utf8'))) + "/"
+        traced = should_trace(self)
+        if traced:
+            self.log.debug(f"---> {preview(data, self.trace_preview_size)}")
+        transact(self, data, command=func_name, sink=file)
+        if traced:
+            self.log.debug(f"<--- {file.received} bytes")
 
-        data = (args_len.strip("/") + "\n" + args_text).encode("utf8")
+        return file.received
 
-        with self._lock:
-            self.log.debug(rf"---> {data}")
-            self.request.sendall(data)
-            response = self.request.recv(65535)
-            if response == b"":
-                raise ConnectionAbortedError(f"{self.client_address[0]}:{self.client_address[1]} 客户端断开链接")
-            data_length, data = response.split(b"/", 1)
-            while int(data_length) > len(data):
-                data += self.request.recv(65535)
-            self.log.debug(rf"<--- {data}")
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        获取当前连接按命令名统计的调用次数、错误次数、收发字节数、锁等待时间与往返时间分位数
 
-        return data
+        :return: {命令名: {"count", "errors", "bytes_sent", "bytes_received", "lock_wait", "rtt_avg", "rtt_p50", "rtt_p95", "rtt_p99"}}，时间单位为秒
+        """
+        return self._metrics.snapshot()
+
+    def prometheus_metrics(self) -> str:
+        """
+        以 Prometheus 文本格式导出当前连接的命令统计
+
+        :return:
+        """
+        return prometheus_text([self])
+
+    def pipeline(self, max_workers: int = 16) -> Pipeline:
+        """
+        请求流水线，连续发送多个命令，只需约一次往返时间
+
+        :param max_workers: 同时等待响应的最大调用数
+        :return: Pipeline
+
+        ex:
+        with self.pipeline() as p:
+            p.click((100, 200))
+            color = p.get_color((300, 400))
+        print(color.result())
+        """
+        return Pipeline(self, max_workers)
 
     def active_device(self, key :str) -> str:
         return self.__send_data("activateFrame", key)
@@ -250,6 +294,15 @@ class AndroidBotBase:
 
         :return: 图像字节格式或者"null"的字节格式
 
+        """
+        data = self.__screenshot_data(region, algorithm, scale)
+        # 接收缓冲区为 bytearray，对外返回不可变的 bytes
+        return None if data is None else bytes(data)
+
+    def __screenshot_data(self, region: _Region = None, algorithm: _Algorithm = None,
+                          scale: float = 1.0) -> Optional[bytearray]:
+        """
+        截图，直接返回接收缓冲区，供 capture、OCR 缓存等内部调用，避免复制
         """
         if not region:
             region = [0, 0, 0, 0]
@@ -267,6 +320,54 @@ class AndroidBotBase:
             return None
         return response
 
+    def capture(self, region: _Region = None, scale: float = 1.0) -> Optional[Frame]:
+        """
+        截图并解码为本地图像帧，之后可在本地多次取色、找色、找图，不再与驱动通信
+
+        frame = bot.capture()
+        point = frame.find_color("#008577")
+
+        :param region: 截图区域，默认全屏，``region = (起点x、起点y、终点x、终点y)``，得到一个矩形
+        :param scale: 图片缩放率，默认为 1.0，1.0 以下为缩小，1.0 以上为放大；
+        :return: Frame 或者 None，需要安装 numpy 以及 opencv-python 或 Pillow
+        """
+        data = self.__screenshot_data(region, None, scale)
+        if data is None:
+            return None
+        return Frame.from_bytes(data, region, scale, driver=self)
+
+    @contextlib.contextmanager
+    def frozen_frame(self, ttl: float = 0.2):
+        """
+        冻结截图帧：首次取色/找色时截取一张全屏截图，之后 ttl 秒内的 get_color、find_color 直接在本地图像中完成；
+        过期后下次使用时重新截图，发送点击、滑动、输入等命令（见 frozen_frame_invalidated_by）时立即作废。
+
+        适合连续读取多个像素点的场景，例如读取游戏界面状态栏：
+
+        with bot.frozen_frame(ttl=0.2):
+            hp = bot.get_color((100, 20))
+            mp = bot.get_color((100, 40))
+
+        嵌套使用时沿用外层的冻结帧。需要安装 numpy 以及 opencv-python 或 Pillow。
+
+        :param ttl: 帧的有效时长（秒）
+        :return: FrozenFrame
+        """
+        if self._frozen is not None:
+            yield self._frozen
+            return
+
+        self._frozen = FrozenFrame(ttl, self.capture)
+        try:
+            yield self._frozen
+        finally:
+            self._frozen = None
+
+    def __frozen(self) -> Optional[Frame]:
+        if self._frozen is None:
+            return None
+        return self._frozen.get()
+
     # #############
     #   色值相关   #
     # #############
@@ -278,6 +379,10 @@ class AndroidBotBase:
         :return: 色值字符串(例如: #008577)或者 None
 
         """
+        frame = self.__frozen()
+        if frame is not None:
+            return frame.get_color(point)
+
         response = self.__send_data("getColor", point[0], point[1])
         if response == "null":
             return None
@@ -326,15 +431,24 @@ class AndroidBotBase:
         else:
             sub_colors_str = "null"
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
+            frame = self.__frozen()
+            if frame is not None:
+                point = frame.find_color(color, sub_colors, region, similarity)
+                if point is None:
+                    continue
+                waiter.hit()
+                return point
+
             response = self.__send_data("findColor", color, sub_colors_str, *region, similarity)
             # 找色失败
             if response == "-1.0|-1.0":
-                time.sleep(interval_time)
+                continue
             else:
                 # 找色成功
                 x, y = response.split("|")
+                waiter.hit()
                 return Point(x=float(x), y=float(y), driver=self)
         # 超时
         if raise_err:
@@ -455,13 +569,14 @@ class AndroidBotBase:
                 threshold = 127
                 max_val = 255
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        image_name = self.__template_name(image_name)
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data("findImage", self._base_path + image_name, *region, similarity,
                                         algorithm_type, threshold, max_val, multi)
             # 找图失败
             if response == "-1.0|-1.0":
-                time.sleep(interval_time)
+                continue
             else:
                 # 找图成功，返回图片左上角坐标
                 # 分割出多个图片的坐标
@@ -470,12 +585,32 @@ class AndroidBotBase:
                 for point_str in image_points:
                     x, y = point_str.split("|")
                     point_list.append(Point(x=float(x), y=float(y), driver=self))
+                waiter.hit()
                 return point_list
         # 超时
         if raise_err:
             raise TimeoutError("`find_images` 操作超时")
         return []
 
+    def sync_templates(self, verify: bool = False) -> Dict[str, int]:
+        """
+        将 template_registry 中缺失或已变化的模板推送到手机
+
+        :param verify: 是否逐个确认手机清单中的文件仍然存在
+        :return: {"pushed": 推送文件数, "skipped": 已存在的文件数, "bytes": 推送字节数}
+        """
+        stats = self.template_registry.sync(self, verify)
+        self._templates_synced = True
+        return stats
+
+    def __template_name(self, image_name: str) -> str:
+        registry = self.template_registry
+        if registry is None or image_name not in registry:
+            return image_name
+        if not self._templates_synced:
+            self.sync_templates()
+        return registry.remote_name(image_name)
+
     def find_dynamic_image(self,
                            interval_ti: int,
                            region: _Region = None,
@@ -505,12 +640,12 @@ class AndroidBotBase:
         if not region:
             region = [0, 0, 0, 0]
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data("findAnimation", interval_ti, *region)
             # 找图失败
             if response == "-1.0|-1.0":
-                time.sleep(interval_time)
+                continue
             else:
                 # 找图成功，返回图片左上角坐标
                 # 分割出多个图片的坐标
@@ -519,6 +654,7 @@ class AndroidBotBase:
                 for point_str in image_points:
                     x, y = point_str.split("|")
                     point_list.append(Point(x=float(x), y=float(y), driver=self))
+                waiter.hit()
                 return point_list
         # 超时
         if raise_err:
@@ -651,27 +787,17 @@ class AndroidBotBase:
     #   OCR 相关   #
     ################
     @staticmethod
-    def __parse_ocr(text: str) -> list:
+    def __parse_ocr(text: str) -> List[OcrLine]:
         """
         解析 OCR 识别出出来的信息
 
         :param text:
         :return:
         """
-        # pattern = re.compile(r'(\[\[\[).+?(\)])')
-        # matches = pattern.finditer(text)
-        #
-        # text_info_list = []
-        # for match in matches:
-        #     result_str = match.group()
-        #     text_info = literal_eval(result_str)
-        #     text_info_list.append(text_info)
-        #
-        # return text_info_list
-
-        return literal_eval(text)
+        return parse_ocr(text)
 
-    def __ocr_server(self, region: _Region = None, algorithm: _Algorithm = None, scale: float = 1.0) -> list:
+    def __ocr_server(self, region: _Region = None, algorithm: _Algorithm = None,
+                     scale: float = 1.0) -> List[OcrLine]:
         """
         OCR 服务，通过 OCR 识别屏幕中文字
 
@@ -695,10 +821,29 @@ class AndroidBotBase:
         if region[2] == 0:
             scale = 1.0
 
+        cache = self.ocr_cache
+        key = None
+        if cache is not None:
+            key = self.__ocr_cache_key(region, (algorithm_type, threshold, max_val), scale)
+            lines = None if key is None else cache.get(key)
+            if lines is not None:
+                return lines
+
         response = self.__send_data("ocr", *region, algorithm_type, threshold, max_val, scale)
         if response == "null" or response == "":
-            return []
-        return self.__parse_ocr(response)
+            lines = []
+        else:
+            lines = self.__parse_ocr(response)
+        if key is not None:
+            cache.put(key, lines)
+        return lines
+
+    def __ocr_cache_key(self, region: _Region, algorithm: tuple, scale: float) -> Optional[tuple]:
+        # 以识别区域缩小后截图的字节摘要代表屏幕内容，截图比 OCR 快得多
+        data = self.__screenshot_data(region, None, self.ocr_cache_hash_scale)
+        if data is None:
+            return None
+        return "ocr", tuple(region), algorithm, scale, hashlib.blake2b(data, digest_size=16).digest()
 
     def init_ocr_server(self, ip: str, use_angle_model: bool = False, enable_gpu: bool = False,
                         enable_tensorrt: bool = False) -> bool:
@@ -726,11 +871,7 @@ class AndroidBotBase:
             :meth:`find_image`: ``region`` 和 ``algorithm`` 的参数说明
         """
         text_info_list = self.__ocr_server(region, algorithm, scale)
-        text_list = []
-        for text_info in text_info_list:
-            text = text_info[-1][0]
-            text_list.append(text)
-        return text_list
+        return [line.text for line in text_info_list]
 
     def find_text(self, text: str, region: _Region = None, algorithm: _Algorithm = None, scale: float = 1.0) -> \
             List[Point]:
@@ -750,44 +891,49 @@ class AndroidBotBase:
             region = [0, 0, 0, 0]
 
         text_info_list = self.__ocr_server(region, algorithm, scale)
+        return _ocr_text_points(text_info_list, text, region, scale, driver=self)
 
-        text_points = []
-        for text_info in text_info_list:
-            if text in text_info[-1][0]:
-                points, words_tuple = text_info
+    def find_texts(self, texts: List[str], region: _Region = None, algorithm: _Algorithm = None, scale: float = 1.0,
+                   max_distance: int = 0) -> Dict[str, List[Point]]:
+        """
+        只识别一次屏幕，同时查找多个文字的坐标，坐标计算与 find_text 相同
 
-                left, top, right, bottom = points
+        :param texts: 要查找的文字列表；
+        :param region: 识别区域，默认全屏；
+        :param algorithm: 处理图片/屏幕所用算法和参数，默认保存原图；
+        :param scale: 图片缩放率，默认为 1.0，1.0 以下为缩小，1.0 以上为放大；
+        :param max_distance: 允许的最大编辑距离，用于容忍 OCR 识别错误的字符，默认 0 精确匹配；
+        :return: {文字: 坐标列表}，未找到的文字对应空列表
 
-                # 文本区域起点坐标
-                start_x = left[0]
-                start_y = left[1]
-                # 文本区域终点坐标
-                end_x = right[0]
-                end_y = right[1]
-                # 文本区域中心点据左上角的偏移量
-                # 可能指定文本只是部分文本，要计算出实际位置(x轴)
-                words: str = words_tuple[0]
-                width = end_x - start_x
+        .. seealso::
+            :meth:`find_image`: ``region`` 和 ``algorithm`` 的参数说明
+        """
+        if not region:
+            region = [0, 0, 0, 0]
 
-                # 单字符宽度
-                single_word_width = width / len(words)
-                # 文本在整体文本的起始位置
-                pos = words.find(text)
+        text_info_list = self.__ocr_server(region, algorithm, scale)
+        return TextMatcher(texts, max_distance).points(text_info_list, region, scale, driver=self)
 
-                offset_x = pos * single_word_width + len(text) * single_word_width / 2
-                offset_y = (end_y - start_y) / 2
+    def ocr_page(self, region: _Region = None, algorithm: _Algorithm = None, scale: float = 1.0) -> OcrPage:
+        """
+        识别屏幕中的文字并建立空间索引，之后的区域、最近邻、右侧、下方等查询都在本地完成
 
-                # [ { x: 108, y: 1153 } ]
+        :param region: 识别区域，默认全屏；
+        :param algorithm: 处理图片/屏幕所用算法和参数，默认保存原图；
+        :param scale: 图片缩放率，默认为 1.0，1.0 以下为缩小，1.0 以上为放大；
+        :return: OcrPage，坐标为屏幕坐标
 
-                # 计算文本区域中心坐标
-                text_point = Point(
-                    x=float(region[0] + (start_x + offset_x) / scale),
-                    y=float(region[1] + (start_y + offset_y) / scale),
-                    driver=self
-                )
-                text_points.append(text_point)
+        ex:
+        page = self.ocr_page()
+        gold = page.right_of("金币:")
 
-        return text_points
+        .. seealso::
+            :meth:`find_image`: ``region`` 和 ``algorithm`` 的参数说明
+        """
+        if not region:
+            region = [0, 0, 0, 0]
+
+        return OcrPage(self.__ocr_server(region, algorithm, scale), region, scale, driver=self)
 
     def init_yolo_server(self, ip: str, model_path: str = "d:/yolov8n.onnx", classes_path: str = ''):
         """
@@ -835,15 +981,16 @@ class AndroidBotBase:
         if raise_err is None:
             raise_err = self.raise_err
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             data = self.__send_data("getElementRect", xpath)
             # 失败
             if data == "-1|-1|-1|-1":
-                time.sleep(interval_time)
+                continue
             # 成功
             else:
                 start_x, start_y, end_x, end_y = data.split("|")
+                waiter.hit()
                 return Point2s(p1=Point(x=float(start_x), y=float(start_y), driver=self),
                                p2=Point(x=float(end_x), y=float(end_y), driver=self))
         # 超时
@@ -871,14 +1018,15 @@ class AndroidBotBase:
         if raise_err is None:
             raise_err = self.raise_err
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             data = self.__send_data("getElementDescription", xpath)
             # 失败
             if data == "null":
-                time.sleep(interval_time)
+                continue
             # 成功
             else:
+                waiter.hit()
                 return data
         # 超时
         if raise_err:
@@ -905,14 +1053,15 @@ class AndroidBotBase:
         if raise_err is None:
             raise_err = self.raise_err
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             data = self.__send_data("getElementText", xpath)
             # 失败
             if data == "null":
-                time.sleep(interval_time)
+                continue
             # 成功
             else:
+                waiter.hit()
                 return data
         # 超时
         if raise_err:
@@ -940,13 +1089,14 @@ class AndroidBotBase:
         if raise_err is None:
             raise_err = self.raise_err
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             # 失败
             if self.__send_data("setElementText", xpath, text) != "true":
-                time.sleep(interval_time)
+                continue
             # 成功
             else:
+                waiter.hit()
                 return True
         # 超时
         if raise_err:
@@ -973,13 +1123,14 @@ class AndroidBotBase:
         if raise_err is None:
             raise_err = self.raise_err
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             # 失败
             if self.__send_data("clickElement", xpath) != "true":
-                time.sleep(interval_time)
+                continue
             # 成功
             else:
+                waiter.hit()
                 return True
         # 超时
         if raise_err:
@@ -1006,13 +1157,13 @@ class AndroidBotBase:
         if raise_err is None:
             raise_err = self.raise_err
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             for xpath in xpath_list:
                 result = self.click_element(xpath, wait_time=0.05, interval_time=0.01, raise_err=False)
                 if result:
+                    waiter.hit()
                     return True
-            time.sleep(interval_time)
 
         if raise_err:
             raise TimeoutError("`click_any_elements` 操作超时")
@@ -1043,13 +1194,14 @@ class AndroidBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             # 存在
             if self.__send_data("existsElement", xpath) == "true":
-                time.sleep(interval_time)
+                continue
             # 不存在
             else:
+                waiter.hit()
                 return True
         return False
 
@@ -1068,13 +1220,14 @@ class AndroidBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             # 失败
             if self.__send_data("existsElement", xpath) != "true":
-                time.sleep(interval_time)
+                continue
             # 成功
             else:
+                waiter.hit()
                 return True
         return False
 
@@ -1094,15 +1247,97 @@ class AndroidBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
-            for xpath in xpath_list:
-                result = self.element_exists(xpath, wait_time=0.05, interval_time=0.01)
-                if result:
-                    return xpath
-            time.sleep(interval_time)
+        hit = self.wait_any([ElementCondition(xpath) for xpath in xpath_list], wait_time, interval_time, False)
+        if hit is None:
+            return None
+        return hit[1]
+
+    def wait_any(self, conditions: List[Condition], wait_time: float = None, interval_time: float = None,
+                 raise_err: bool = None) -> Optional[Tuple[int, Any]]:
+        """
+        等待任意一个条件满足，返回命中条件的下标和结果
+
+        每轮在一个请求流水线中发出全部条件的命令，只需约一次往返时间；
+        region、algorithm、scale 相同的 TextCondition 共用一次 OCR。同一轮有多个条件满足时，返回列表中靠前的条件。
+
+        index, result = self.wait_any([
+            ElementCondition("com.aibot.client/android.widget.Button@text=登录"),
+            ImageCondition("error_popup.png"),
+            ColorCondition("#FF0000", region=(0, 0, 1080, 200)),
+        ])
+
+        :param conditions: 条件列表，支持 ImageCondition、ColorCondition、ElementCondition、ElementTextCondition、TextCondition
+        :param wait_time: 等待时间，默认取 self.wait_timeout
+        :param interval_time: 轮询间隔时间，默认取 self.interval_timeout
+        :param raise_err: 超时是否抛出异常
+        :return: (条件下标, 条件结果) 或者 None
+        """
+        if wait_time is None:
+            wait_time = self.wait_timeout
+
+        if interval_time is None:
+            interval_time = self.interval_timeout
+
+        if raise_err is None:
+            raise_err = self.raise_err
+
+        if not conditions:
+            return None
+
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        try:
+            for _ in waiter:
+                # 每轮单独开启流水线，轮询间隔期间不占用连接；已处于流水线中时共用外层流水线
+                with self.pipeline() as p:
+                    futures = []
+                    ocr_futures = {}
+                    for condition in conditions:
+                        if isinstance(condition, ImageCondition):
+                            future = p.find_image(condition.image_name, condition.region, condition.algorithm,
+                                                  condition.similarity, wait_time=0, raise_err=False)
+                        elif isinstance(condition, ColorCondition):
+                            future = p.find_color(condition.color, condition.sub_colors, condition.region,
+                                                  condition.similarity, wait_time=0, raise_err=False)
+                        elif isinstance(condition, ElementCondition):
+                            future = p.element_exists(condition.xpath, wait_time=0)
+                        elif isinstance(condition, ElementTextCondition):
+                            future = p.get_element_text(condition.xpath, wait_time=0, raise_err=False)
+                        elif isinstance(condition, TextCondition):
+                            region = tuple(condition.region or (0, 0, 0, 0))
+                            key = (region, tuple(condition.algorithm or ()), condition.scale)
+                            future = ocr_futures.get(key)
+                            if future is None:
+                                future = ocr_futures[key] = p.submit(self.__ocr_server, list(region),
+                                                                     condition.algorithm, condition.scale)
+                        else:
+                            raise TypeError(f"不支持的条件类型：{type(condition).__name__}")
+                        futures.append(future)
+
+                    for index, (condition, future) in enumerate(zip(conditions, futures)):
+                        result = self.__condition_result(condition, future.result())
+                        if result:
+                            waiter.hit()
+                            return index, result
+        finally:
+            # 条件内部的单次查找会覆盖 last_wait，恢复为本次等待的统计
+            self.last_wait = waiter.stats
+
+        if raise_err:
+            raise TimeoutError("`wait_any` 操作超时")
         return None
 
+    def __condition_result(self, condition: Condition, response) -> Any:
+        if isinstance(condition, ElementCondition):
+            return condition.xpath if response else None
+        if isinstance(condition, ElementTextCondition):
+            if response is None or (condition.expected is not None and condition.expected not in response):
+                return None
+            return response
+        if isinstance(condition, TextCondition):
+            region = condition.region or [0, 0, 0, 0]
+            return _ocr_text_points(response, condition.text, region, condition.scale, driver=self)
+        return response
+
     def element_is_selected(self, xpath: str) -> bool:
         """
         元素是否存在
@@ -1141,19 +1376,19 @@ class AndroidBotBase:
         else:
             raise RuntimeError(f"未知方向：{direction}")
 
-        end_time = time.time() + wait_time
-        current_count = 0
-        while time.time() < end_time and current_count < count:
-            current_count += 1
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for current_count in waiter:
+            if current_count > count:
+                break
 
             if self.click_element(xpath, wait_time=1, interval_time=0.5, raise_err=False):
+                waiter.hit()
                 return True
 
             if end_flag_xpath and self.element_exists(end_flag_xpath, wait_time=1, interval_time=0.5):
                 return False
 
             self.swipe(_start_point, _end_point, duration)
-            time.sleep(interval_time)
 
         if raise_err:
             raise TimeoutError("`click_element_by_slide` 操作超时")
@@ -1162,12 +1397,15 @@ class AndroidBotBase:
     # #############
     #   文件传输   #
     # #############
-    def push_file(self, origin_path: str, to_path: str) -> bool:
+    def push_file(self, origin_path: str, to_path: str, progress: Callable[[int, int], None] = None) -> bool:
         """
         将电脑文件传输到手机端
 
+        先发送请求头部，再从磁盘分块发送文件内容，内存占用与文件大小无关；传输统计见 last_transfer。
+
         :param origin_path: 源文件路径
         :param to_path: 目标存储路径
+        :param progress: 进度回调，参数为 (已发送字节数, 总字节数)
         :return:
 
         ex:
@@ -1178,16 +1416,44 @@ class AndroidBotBase:
             to_path = "/storage/emulated/0/" + to_path
 
         with open(origin_path, "rb") as file:
-            data = file.read()
+            size = os.fstat(file.fileno()).st_size
+            start = time.perf_counter()
+            response = self.__push_file("pushFile", to_path, FileBody(file, size, progress))
+            self.last_transfer = TransferStats(size, time.perf_counter() - start)
+
+        self.log.debug(f"push_file {origin_path} -> {to_path}: {self.last_transfer}")
+        return response == "true"
 
-        return self.__push_file("pushFile", to_path, data) == "true"
+    def push_buffer(self, data, to_path: str, progress: Callable[[int, int], None] = None) -> bool:
+        """
+        将内存中的数据（bytes、mmap 等）传输到手机端，按块发送，不复制数据；传输统计见 last_transfer。
 
-    def pull_file(self, remote_path: str, local_path: str) -> bool:
+        :param data: 要传输的数据
+        :param to_path: 目标存储路径
+        :param progress: 进度回调，参数为 (已发送字节数, 总字节数)，在回调中阻塞即可限制发送速度
+        :return:
+        """
+        if not to_path.startswith("/storage/emulated/0/"):
+            to_path = "/storage/emulated/0/" + to_path
+
+        body = BufferBody(data, progress)
+        start = time.perf_counter()
+        response = self.__push_file("pushFile", to_path, body)
+        self.last_transfer = TransferStats(len(body), time.perf_counter() - start)
+
+        self.log.debug(f"push_buffer -> {to_path}: {self.last_transfer}")
+        return response == "true"
+
+    def pull_file(self, remote_path: str, local_path: str, progress: Callable[[int, int], None] = None) -> bool:
         """
         将手机文件传输到电脑端
 
+        接收的数据直接写入 local_path 所在目录的临时文件，传输完成后原子地重命名为 local_path，
+        传输失败或中断时不会留下不完整的文件；内存占用与文件大小无关，传输统计见 last_transfer。
+
         :param remote_path: 手机端文件路径
         :param local_path: 电脑本地文件存储路径
+        :param progress: 进度回调，参数为 (已接收字节数, 总字节数)
         :return:
 
         ex:
@@ -1197,12 +1463,26 @@ class AndroidBotBase:
         if not remote_path.startswith("/storage/emulated/0/"):
             remote_path = "/storage/emulated/0/" + remote_path
 
-        data = self.__pull_file("pullFile", remote_path)
-        if data == b"null":
-            return False
+        # 临时文件与目标文件位于同一目录，保证可以原子重命名；以 x 模式创建，权限与直接写入目标文件时一致
+        local_dir, local_name = os.path.split(os.path.abspath(local_path))
+        temp_path = os.path.join(local_dir, f".{local_name}.{os.urandom(4).hex()}.part")
+        try:
+            with open(temp_path, "x+b") as file:
+                start = time.perf_counter()
+                size = self.__pull_file("pullFile", remote_path, FileSink(file, progress))
+                self.last_transfer = TransferStats(size, time.perf_counter() - start)
+                # 驱动以 null 表示文件不存在或读取失败
+                failed = size == 4 and file.seek(0) == 0 and file.read(4) == b"null"
+            if failed:
+                os.remove(temp_path)
+                return False
+            os.replace(temp_path, local_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
 
-        with open(local_path, "wb") as file:
-            file.write(data)
+        self.log.debug(f"pull_file {remote_path} -> {local_path}: {self.last_transfer}")
         return True
 
     # #############
@@ -1251,13 +1531,14 @@ class AndroidBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             # 失败
             if self.__send_data("startApp", name) != "true":
-                time.sleep(interval_time)
+                continue
             # 成功
             else:
+                waiter.hit()
                 return True
         # 超时
         return False
@@ -1437,6 +1718,26 @@ class AndroidBotBase:
             return []
         return response.split("|")
 
+    def sync_dir(self, local_dir: str, remote_dir: str, delete: bool = True,
+                 progress: Callable[[str, int, int], None] = None) -> Dict[str, int]:
+        """
+        将本地目录增量同步到手机目录
+
+        手机目录下的清单文件记录已同步文件的内容摘要，本地摘要按修改时间与大小缓存在本地目录下；
+        同步时只读取一次清单，对比后通过流水线创建缺失的目录、推送新增或已变化的文件、删除本地已不存在的文件，最后写回清单。
+        目录未变化时只需一次请求。只会删除清单中记录的文件，不影响手机目录中的其他文件；空目录不会同步。
+
+        :param local_dir: 本地目录
+        :param remote_dir: 手机目录
+        :param delete: 是否删除本地已不存在的文件
+        :param progress: 进度回调，参数为 (相对路径, 已发送字节数, 总字节数)
+        :return: {"pushed": 推送文件数, "deleted": 删除文件数, "skipped": 未变化文件数, "dirs": 创建目录数, "bytes": 推送字节数, "failed": 失败数}
+
+        ex:
+        self.sync_dir("assets", "Android/data/com.aibot.client/files/assets")
+        """
+        return sync_dir(self, local_dir, remote_dir, delete, progress)
+
     def make_android_dir(self, android_directory: str) -> bool:
         """
         创建安卓文件夹
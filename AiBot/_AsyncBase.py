@@ -0,0 +1,1257 @@
+import asyncio
+import inspect
+import json
+import random
+import socket
+import subprocess
+import time
+from typing import Optional, List, Dict, Any, Tuple
+
+from loguru import logger
+
+from ._frame import Frame
+from ._metrics import Metrics, prometheus_text
+from ._ocr import OcrLine, OcrPage, TextMatcher, parse_ocr
+from ._protocol import encode_frame, read_frame_async
+from ._trace import should_trace, preview
+from ._wait import Waiter, WaitStats
+from ._utils import _Point_Tuple, _Region, _Algorithm, _SubColors, Point, Point2s, _ocr_text_points
+
+
+def _algorithm_args(algorithm: _Algorithm = None) -> Tuple[int, int, int]:
+    if not algorithm:
+        return 0, 0, 0
+    algorithm_type, threshold, max_val = algorithm
+    if algorithm_type in (5, 6):
+        threshold = 127
+        max_val = 255
+    return algorithm_type, threshold, max_val
+
+
+def _sub_colors_str(sub_colors: _SubColors = None) -> str:
+    if not sub_colors:
+        return "null"
+    return "\n".join(f"{offset_x}/{offset_y}/{color_str}" for offset_x, offset_y, color_str in sub_colors)
+
+
+def _start_driver(args: List[str], success_msg: str) -> None:
+    try:
+        subprocess.Popen(args)
+        print(success_msg)
+    except FileNotFoundError as e:
+        err_msg = "\n异常排除步骤：\n1. 检查 Aibote.exe 路径是否存在中文；\n2. 是否启动 Aibote.exe 初始化环境变量；\n3. 检查电脑环境变量是否初始化成功，环境变量中是否存在 %Aibote% 开头的；\n4. 首次初始化环境变量后，是否重启开发工具；\n5. 是否以管理员权限启动开发工具；\n"
+        print("\033[92m", err_msg, "\033[0m")
+        raise e
+
+
+class _NotTrue:
+    """
+    匹配除 "true" 以外的所有响应，用于只有 "true" 表示成功的命令
+    """
+
+    def __contains__(self, response: str) -> bool:
+        return response != "true"
+
+
+_NOT_TRUE = _NotTrue()
+
+
+class _AsyncBotBase:
+    """
+    基于 asyncio 流的驱动连接，一个事件循环即可驱动大量设备，无需每个设备占用一个线程
+    """
+    raise_err = False
+    wait_timeout = 3  # seconds
+    interval_timeout = 0.5  # seconds
+
+    # 轮询等待：间隔的指数增长倍数（1 表示固定间隔）、最大间隔、随机抖动比例，见 Waiter
+    wait_backoff = 1.0
+    wait_max_interval: Optional[float] = None
+    wait_jitter = 0.0
+    # 最近一次轮询等待的统计
+    last_wait: Optional[WaitStats] = None
+
+    log_storage = False
+    log_level = "INFO"
+    log_size = 10  # MB
+    log = logger
+
+    # 调试日志：数据预览的最大字节数（0 表示不截断），以及每 N 帧记录一帧
+    trace_preview_size = 256
+    trace_sample_rate = 1
+
+    # 是否记录命令统计，见 metrics()
+    metrics_enabled = True
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._lock = asyncio.Lock()
+        self._metrics = Metrics()
+        self._stream_reader = reader
+        self._stream_writer = writer
+        self.client_address = writer.get_extra_info("peername")
+
+    @classmethod
+    async def _accept(cls, listen_port: int):
+        """
+        监听端口，等待驱动连接，返回第一个连接
+
+        :param listen_port: 脚本监听的端口
+        :return:
+        """
+        if listen_port < 0 or listen_port > 65535:
+            raise OSError("`listen_port` must be in 0-65535.")
+
+        connected = asyncio.get_running_loop().create_future()
+
+        async def on_connect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            if connected.done():
+                writer.close()
+                return
+            connected.set_result(cls(reader, writer))
+
+        server = await asyncio.start_server(on_connect, port=listen_port, family=socket.AF_INET)
+        try:
+            return await connected
+        finally:
+            server.close()
+
+    async def _send_data_return_bytes(self, *args) -> bytes:
+        data = encode_frame(*args)
+        metrics = self._metrics if self.metrics_enabled else None
+        sent = len(data)
+        start = time.perf_counter()
+        acquired = start
+        try:
+            async with self._lock:
+                acquired = time.perf_counter()
+                traced = should_trace(self)
+                if traced:
+                    self.log.debug(f"---> {preview(data, self.trace_preview_size)}")
+                self._stream_writer.write(data)
+                await self._stream_writer.drain()
+                data = await read_frame_async(self._stream_reader, self.client_address)
+                if traced:
+                    self.log.debug(f"<--- {preview(data, self.trace_preview_size)}")
+        except Exception as e:
+            if metrics is not None:
+                metrics.record_error(args[0])
+            self.log.error("send/read tcp data error: " + str(e))
+            raise e
+        if metrics is not None:
+            metrics.record(args[0], sent, len(data), acquired - start, time.perf_counter() - acquired)
+        return data
+
+    async def _send_data(self, *args) -> str:
+        data = await self._send_data_return_bytes(*args)
+        return data.decode("utf8").strip()
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        获取当前连接按命令名统计的调用次数、错误次数、收发字节数、锁等待时间与往返时间分位数
+
+        :return: {命令名: {"count", "errors", "bytes_sent", "bytes_received", "lock_wait", "rtt_avg", "rtt_p50", "rtt_p95", "rtt_p99"}}，时间单位为秒
+        """
+        return self._metrics.snapshot()
+
+    def prometheus_metrics(self) -> str:
+        """
+        以 Prometheus 文本格式导出当前连接的命令统计
+
+        :return:
+        """
+        return prometheus_text([self])
+
+    async def call(self, command: str, *args) -> str:
+        """
+        直接发送驱动命令，用于调用未封装的接口
+
+        :param command: 驱动命令名，例如 "getAndroidId"
+        :param args: 命令参数
+        :return: 响应字符串
+        """
+        return await self._send_data(command, *args)
+
+    async def close(self) -> None:
+        """
+        关闭连接
+
+        :return:
+        """
+        self._stream_writer.close()
+        await self._stream_writer.wait_closed()
+
+    def get_device_ip(self) -> str:
+        """
+        获取设备IP地址
+
+        :return: 设备IP地址字符串
+        """
+        return self.client_address[0]
+
+    async def _poll(self, fail_response, wait_time: float, interval_time: float, *args) -> Optional[str]:
+        """
+        轮询发送命令，直到响应不在 fail_response 中或者超时
+
+        :return: 成功的响应，超时返回 None
+        """
+        if wait_time is None:
+            wait_time = self.wait_timeout
+
+        if interval_time is None:
+            interval_time = self.interval_timeout
+
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        polls = waiter.__aiter__()
+        try:
+            async for _ in polls:
+                response = await self._send_data(*args)
+                if response not in fail_response:
+                    waiter.hit()
+                    return response
+        finally:
+            # 异步生成器不会随 return 立即关闭，显式关闭以及时记录统计
+            await polls.aclose()
+        return None
+
+    def _parse_points(self, response: str) -> List[Point]:
+        point_list = []
+        for point_str in response.split("/"):
+            x, y = point_str.split("|")
+            point_list.append(Point(x=float(x), y=float(y), driver=self))
+        return point_list
+
+
+class AsyncAndroidBot(_AsyncBotBase):
+    """
+    AndroidBot 的 asyncio 版本，方法与 AndroidBotBase 同名，返回值相同，需要 await 调用
+    """
+
+    # 基础存储路径
+    _base_path = "/storage/emulated/0/Android/data/com.aibot.client/files/"
+
+    @classmethod
+    async def _build(cls, listen_port: int) -> "AsyncAndroidBot":
+        """
+        :param listen_port: 脚本监听的端口
+        :return:
+        """
+        print("AndroidSocket服务启动成功，等待客户端链接...")
+        bot = await cls._accept(listen_port)
+        print("AndroidSocket客户端链接成功")
+        return bot
+
+    async def save_screenshot(self, image_name: str, region: _Region = None,
+                              algorithm: _Algorithm = None) -> Optional[str]:
+        """
+        保存截图，参见 :meth:`AndroidBotBase.save_screenshot`
+        """
+        if image_name.find("/") != -1:
+            raise ValueError("`image_name` cannot contain `/`.")
+
+        if not region:
+            region = [0, 0, 0, 0]
+
+        response = await self._send_data("saveScreenshot", self._base_path + image_name, *region,
+                                         *_algorithm_args(algorithm))
+        if response == "true":
+            return self._base_path + image_name
+        return None
+
+    async def take_screenshot(self, region: _Region = None, algorithm: _Algorithm = None,
+                              scale: float = 1.0) -> Optional[bytes]:
+        """
+        截图，返回图像字节格式，参见 :meth:`AndroidBotBase.take_screenshot`
+        """
+        if not region:
+            region = [0, 0, 0, 0]
+
+        response = await self._send_data_return_bytes("takeScreenshot", *region, *_algorithm_args(algorithm), scale)
+        if response == b'null':
+            return None
+        return response
+
+    async def capture(self, region: _Region = None, scale: float = 1.0) -> Optional[Frame]:
+        """
+        截图并解码为本地图像帧，参见 :meth:`AndroidBotBase.capture`
+        """
+        data = await self.take_screenshot(region, None, scale)
+        if data is None:
+            return None
+        return Frame.from_bytes(data, region, scale, driver=self)
+
+    async def get_color(self, point: _Point_Tuple) -> Optional[str]:
+        """
+        获取指定坐标点的色值，参见 :meth:`AndroidBotBase.get_color`
+        """
+        response = await self._send_data("getColor", point[0], point[1])
+        if response == "null":
+            return None
+        return response
+
+    async def find_color(self, color: str, sub_colors: _SubColors = None, region: _Region = None,
+                         similarity: float = 0.9, wait_time: float = None, interval_time: float = None,
+                         raise_err: bool = None) -> Optional[Point]:
+        """
+        获取指定色值的坐标点，参见 :meth:`AndroidBotBase.find_color`
+        """
+        if raise_err is None:
+            raise_err = self.raise_err
+
+        if not region:
+            region = [0, 0, 0, 0]
+
+        response = await self._poll(("-1.0|-1.0",), wait_time, interval_time,
+                                    "findColor", color, _sub_colors_str(sub_colors), *region, similarity)
+        if response is not None:
+            x, y = response.split("|")
+            return Point(x=float(x), y=float(y), driver=self)
+        # 超时
+        if raise_err:
+            raise TimeoutError("`find_color` 操作超时")
+        return None
+
+    async def find_image(self, image_name, region: _Region = None, algorithm: _Algorithm = None,
+                         similarity: float = 0.9, wait_time: float = None, interval_time: float = None,
+                         raise_err: bool = None) -> Optional[Point]:
+        """
+        寻找图片坐标，参见 :meth:`AndroidBotBase.find_image`
+        """
+        result = await self.find_images(image_name, region, algorithm, similarity, 1, wait_time, interval_time,
+                                        raise_err)
+        if not result:
+            return None
+        return result[0]
+
+    async def find_images(self, image_name, region: _Region = None, algorithm: _Algorithm = None,
+                          similarity: float = 0.9, multi: int = 1, wait_time: float = None,
+                          interval_time: float = None, raise_err: bool = None) -> List[Point]:
+        """
+        寻找图片坐标，返回坐标列表，参见 :meth:`AndroidBotBase.find_images`
+        """
+        if raise_err is None:
+            raise_err = self.raise_err
+
+        if not region:
+            region = [0, 0, 0, 0]
+
+        response = await self._poll(("-1.0|-1.0",), wait_time, interval_time,
+                                    "findImage", self._base_path + image_name, *region, similarity,
+                                    *_algorithm_args(algorithm), multi)
+        if response is not None:
+            return self._parse_points(response)
+        # 超时
+        if raise_err:
+            raise TimeoutError("`find_images` 操作超时")
+        return []
+
+    async def find_dynamic_image(self, interval_ti: int, region: _Region = None, wait_time: float = None,
+                                 interval_time: float = None, raise_err: bool = None) -> List[Point]:
+        """
+        找动态图，参见 :meth:`AndroidBotBase.find_dynamic_image`
+        """
+        if raise_err is None:
+            raise_err = self.raise_err
+
+        if not region:
+            region = [0, 0, 0, 0]
+
+        response = await self._poll(("-1.0|-1.0",), wait_time, interval_time, "findAnimation", interval_ti, *region)
+        if response is not None:
+            return self._parse_points(response)
+        # 超时
+        if raise_err:
+            raise TimeoutError("`find_dynamic_image` 操作超时")
+        return []
+
+    async def click(self, point: _Point_Tuple, offset_x: float = 0, offset_y: float = 0) -> bool:
+        """
+        点击坐标，参见 :meth:`AndroidBotBase.click`
+        """
+        return await self._send_data("click", point[0] + offset_x, point[1] + offset_y) == "true"
+
+    async def double_click(self, point: _Point_Tuple, offset_x: float = 0, offset_y: float = 0) -> bool:
+        """
+        双击坐标，参见 :meth:`AndroidBotBase.double_click`
+        """
+        return await self._send_data("doubleClick", point[0] + offset_x, point[1] + offset_y) == "true"
+
+    async def long_click(self, point: _Point_Tuple, duration: float, offset_x: float = 0,
+                         offset_y: float = 0) -> bool:
+        """
+        长按坐标，参见 :meth:`AndroidBotBase.long_click`
+        """
+        return await self._send_data("longClick", point[0] + offset_x, point[1] + offset_y,
+                                     duration * 1000) == "true"
+
+    async def swipe(self, start_point: _Point_Tuple, end_point: _Point_Tuple, duration: float) -> bool:
+        """
+        滑动坐标，参见 :meth:`AndroidBotBase.swipe`
+        """
+        return await self._send_data("swipe", start_point[0], start_point[1], end_point[0], end_point[1],
+                                     duration * 1000) == "true"
+
+    async def gesture(self, gesture_path: List[_Point_Tuple], duration: float) -> bool:
+        """
+        执行手势，参见 :meth:`AndroidBotBase.gesture`
+        """
+        gesture_path_str = "\n".join(f"{point[0]}/{point[1]}/" for point in gesture_path)
+        return await self._send_data("dispatchGesture", gesture_path_str, duration * 1000) == "true"
+
+    async def press(self, point: _Point_Tuple, duration: float) -> bool:
+        """
+        手指按下，参见 :meth:`AndroidBotBase.press`
+        """
+        return await self._send_data("press", point[0], point[1], duration * 1000) == "true"
+
+    async def move(self, point: _Point_Tuple, duration: float) -> bool:
+        """
+        手指移动，参见 :meth:`AndroidBotBase.move`
+        """
+        return await self._send_data("move", point[0], point[1], duration * 1000) == "true"
+
+    async def release(self) -> bool:
+        """手指抬起"""
+        return await self._send_data("release") == "true"
+
+    async def __ocr_server(self, region: _Region = None, algorithm: _Algorithm = None,
+                           scale: float = 1.0) -> List[OcrLine]:
+        if not region:
+            region = [0, 0, 0, 0]
+
+        # scale 仅支持区域识别
+        if region[2] == 0:
+            scale = 1.0
+
+        response = await self._send_data("ocr", *region, *_algorithm_args(algorithm), scale)
+        if response == "null" or response == "":
+            return []
+        return parse_ocr(response)
+
+    async def init_ocr_server(self, ip: str, use_angle_model: bool = False, enable_gpu: bool = False,
+                              enable_tensorrt: bool = False) -> bool:
+        """
+        初始化 OCR 服务，参见 :meth:`AndroidBotBase.init_ocr_server`
+        """
+        return await self._send_data("initOcr", ip, use_angle_model, enable_gpu, enable_tensorrt) == "true"
+
+    async def get_text(self, region: _Region = None, algorithm: _Algorithm = None, scale: float = 1.0) -> List[str]:
+        """
+        通过 OCR 识别屏幕中的文字，参见 :meth:`AndroidBotBase.get_text`
+        """
+        text_info_list = await self.__ocr_server(region, algorithm, scale)
+        return [line.text for line in text_info_list]
+
+    async def find_text(self, text: str, region: _Region = None, algorithm: _Algorithm = None,
+                        scale: float = 1.0) -> List[Point]:
+        """
+        查找文字所在的坐标，参见 :meth:`AndroidBotBase.find_text`
+        """
+        if not region:
+            region = [0, 0, 0, 0]
+
+        text_info_list = await self.__ocr_server(region, algorithm, scale)
+        return _ocr_text_points(text_info_list, text, region, scale, driver=self)
+
+    async def find_texts(self, texts: List[str], region: _Region = None, algorithm: _Algorithm = None,
+                         scale: float = 1.0, max_distance: int = 0) -> Dict[str, List[Point]]:
+        """
+        只识别一次屏幕，同时查找多个文字的坐标，参见 :meth:`AndroidBotBase.find_texts`
+        """
+        if not region:
+            region = [0, 0, 0, 0]
+
+        text_info_list = await self.__ocr_server(region, algorithm, scale)
+        return TextMatcher(texts, max_distance).points(text_info_list, region, scale, driver=self)
+
+    async def ocr_page(self, region: _Region = None, algorithm: _Algorithm = None, scale: float = 1.0) -> OcrPage:
+        """
+        识别屏幕中的文字并建立空间索引，参见 :meth:`AndroidBotBase.ocr_page`
+        """
+        if not region:
+            region = [0, 0, 0, 0]
+
+        return OcrPage(await self.__ocr_server(region, algorithm, scale), region, scale, driver=self)
+
+    async def get_element_rect(self, xpath: str, wait_time: float = None, interval_time: float = None,
+                               raise_err: bool = None) -> Optional[Point2s]:
+        """
+        获取元素位置，参见 :meth:`AndroidBotBase.get_element_rect`
+        """
+        if raise_err is None:
+            raise_err = self.raise_err
+
+        data = await self._poll(("-1|-1|-1|-1",), wait_time, interval_time, "getElementRect", xpath)
+        if data is not None:
+            start_x, start_y, end_x, end_y = data.split("|")
+            return Point2s(p1=Point(x=float(start_x), y=float(start_y), driver=self),
+                           p2=Point(x=float(end_x), y=float(end_y), driver=self))
+        # 超时
+        if raise_err:
+            raise TimeoutError("`get_element_rect` 操作超时")
+        return None
+
+    async def get_element_desc(self, xpath: str, wait_time: float = None, interval_time: float = None,
+                               raise_err: bool = None) -> Optional[str]:
+        """
+        获取元素描述，参见 :meth:`AndroidBotBase.get_element_desc`
+        """
+        if raise_err is None:
+            raise_err = self.raise_err
+
+        data = await self._poll(("null",), wait_time, interval_time, "getElementDescription", xpath)
+        if data is None and raise_err:
+            raise TimeoutError("`get_element_desc` 操作超时")
+        return data
+
+    async def get_element_text(self, xpath: str, wait_time: float = None, interval_time: float = None,
+                               raise_err: bool = None) -> Optional[str]:
+        """
+        获取元素文本，参见 :meth:`AndroidBotBase.get_element_text`
+        """
+        if raise_err is None:
+            raise_err = self.raise_err
+
+        data = await self._poll(("null",), wait_time, interval_time, "getElementText", xpath)
+        if data is None and raise_err:
+            raise TimeoutError("`get_element_text` 操作超时")
+        return data
+
+    async def set_element_text(self, xpath: str, text: str, wait_time: float = None, interval_time: float = None,
+                               raise_err: bool = None) -> bool:
+        """
+        设置元素文本，参见 :meth:`AndroidBotBase.set_element_text`
+        """
+        if raise_err is None:
+            raise_err = self.raise_err
+
+        if await self._poll(_NOT_TRUE, wait_time, interval_time, "setElementText", xpath, text) is not None:
+            return True
+        if raise_err:
+            raise TimeoutError("`set_element_text` 操作超时")
+        return False
+
+    async def click_element(self, xpath: str, wait_time: float = None, interval_time: float = None,
+                            raise_err: bool = None) -> bool:
+        """
+        点击元素，参见 :meth:`AndroidBotBase.click_element`
+        """
+        if raise_err is None:
+            raise_err = self.raise_err
+
+        if await self._poll(_NOT_TRUE, wait_time, interval_time, "clickElement", xpath) is not None:
+            return True
+        if raise_err:
+            raise TimeoutError("`click_element` 操作超时")
+        return False
+
+    async def scroll_element(self, xpath: str, direction: int = 0) -> bool:
+        """
+        滚动元素，0 向上滑动，1 向下滑动
+        """
+        return await self._send_data("scrollElement", xpath, direction) == "true"
+
+    async def element_exists(self, xpath: str, wait_time: float = None, interval_time: float = None) -> bool:
+        """
+        元素是否存在，参见 :meth:`AndroidBotBase.element_exists`
+        """
+        return await self._poll(_NOT_TRUE, wait_time, interval_time, "existsElement", xpath) is not None
+
+    async def element_not_exists(self, xpath: str, wait_time: float = None, interval_time: float = None) -> bool:
+        """
+        元素是否不存在，参见 :meth:`AndroidBotBase.element_not_exists`
+        """
+        return await self._poll(("true",), wait_time, interval_time, "existsElement", xpath) is not None
+
+    async def start_app(self, name: str, wait_time: float = None, interval_time: float = None) -> bool:
+        """
+        启动 APP，参见 :meth:`AndroidBotBase.start_app`
+        """
+        return await self._poll(_NOT_TRUE, wait_time, interval_time, "startApp", name) is not None
+
+    async def app_is_running(self, app_name: str) -> bool:
+        """
+        判断app是否正在运行(包含前后台)
+        """
+        return await self._send_data("appIsRunnig", app_name) == "true"
+
+    async def get_android_id(self) -> str:
+        """
+        获取 Android 设备 ID
+        """
+        return await self._send_data("getAndroidId")
+
+    async def get_window_size(self) -> Dict[str, float]:
+        """
+        获取屏幕大小
+        """
+        width, height = (await self._send_data("getWindowSize")).split("|")
+        return {"width": float(width), "height": float(height)}
+
+    async def show_toast(self, text: str, duration: float = 3) -> bool:
+        """
+        Toast 弹窗，参见 :meth:`AndroidBotBase.show_toast`
+        """
+        return await self._send_data("showToast", text, duration * 1000) == "true"
+
+    async def send_keys(self, text: str) -> bool:
+        """
+        发送文本，需要打开 AiBot 输入法
+        """
+        return await self._send_data("sendKeys", text) == "true"
+
+    async def send_vk(self, vk: int) -> bool:
+        """
+        发送 vk
+        """
+        return await self._send_data("sendVk", vk) == "true"
+
+    async def back(self) -> bool:
+        """
+        返回
+        """
+        return await self._send_data("back") == "true"
+
+    async def home(self) -> bool:
+        """
+        返回桌面
+        """
+        return await self._send_data("home") == "true"
+
+    async def recent_tasks(self) -> bool:
+        """
+        显示最近任务
+        """
+        return await self._send_data("recents") == "true"
+
+    async def open_uri(self, uri: str) -> bool:
+        """
+        唤起 app，参见 :meth:`AndroidBotBase.open_uri`
+        """
+        return await self._send_data("openUri", uri) == "true"
+
+    async def get_activity(self) -> str:
+        """
+        获取活动页
+        """
+        return await self._send_data("getActivity")
+
+    async def get_package(self) -> str:
+        """
+        获取包名
+        """
+        return await self._send_data("getPackage")
+
+    async def set_clipboard_text(self, text: str) -> bool:
+        """
+        设置剪切板文本
+        """
+        return await self._send_data("setClipboardText", text) == "true"
+
+    async def get_clipboard_text(self) -> str:
+        """
+        获取剪切板内容
+        """
+        return await self._send_data("getClipboardText")
+
+    async def close_driver(self):
+        """
+        关闭连接
+        """
+        await self._send_data("closeDriver")
+
+
+class AsyncWinBot(_AsyncBotBase):
+    """
+    WinBot 的 asyncio 版本，方法与 WinBotBase 同名，返回值相同，需要 await 调用
+    """
+
+    @classmethod
+    async def _build(cls, listen_port: int, local: bool = True) -> "AsyncWinBot":
+        """
+        :param listen_port: 脚本监听的端口
+        :param local: 脚本是否部署在本地
+        :return:
+        """
+        if local:
+            _start_driver(["WindowsDriver.exe", "127.0.0.1", str(listen_port)], "本地 WindowsDriver 客户端启动成功")
+        print("WinSocket服务启动成功，等待客户端链接...")
+        bot = await cls._accept(listen_port)
+        print("WinSocket客户端链接成功")
+        return bot
+
+    async def find_window(self, class_name: str = None, window_name: str = None) -> Optional[str]:
+        """
+        查找窗口句柄，仅查找顶级窗口，不包含子窗口
+        """
+        response = await self._send_data("findWindow", class_name, window_name)
+        if response == "null":
+            return None
+        return response
+
+    async def find_windows(self, class_name: str = None, window_name: str = None) -> List[str]:
+        """
+        查找窗口句柄数组，仅查找顶级窗口，不包含子窗口
+        """
+        response = await self._send_data("findWindows", class_name, window_name)
+        if response == "null":
+            return []
+        return response.split("|")
+
+    async def find_sub_window(self, hwnd: str, class_name: str = None, window_name: str = None) -> Optional[str]:
+        """
+        查找子窗口句柄
+        """
+        response = await self._send_data("findSubWindow", hwnd, class_name, window_name)
+        if response == "null":
+            return None
+        return response
+
+    async def get_window_pos(self, hwnd: str, wait_time: float = None,
+                             interval_time: float = None) -> Optional[Point2s]:
+        """
+        获取窗口位置，参见 :meth:`WinBotBase.get_window_pos`
+        """
+        response = await self._poll(("-1|-1|-1|-1",), wait_time, interval_time, "getWindowPos", hwnd)
+        if response is None:
+            return None
+        x1, y1, x2, y2 = response.split("|")
+        return Point2s(Point(x=float(x1), y=float(y1)), Point(x=float(x2), y=float(y2)))
+
+    async def set_window_pos(self, hwnd: str, left: float, top: float, width: float, height: float) -> bool:
+        """
+        设置窗口位置
+        """
+        return await self._send_data("setWindowPos", hwnd, left, top, width, height) == "true"
+
+    async def show_window(self, hwnd: str, show: bool) -> bool:
+        """
+        显示/隐藏窗口
+        """
+        return await self._send_data("showWindow", hwnd, show) == "true"
+
+    async def move_mouse(self, hwnd: str, x: float, y: float, mode: bool = False, ele_hwnd: str = "0") -> bool:
+        """
+        移动鼠标，参见 :meth:`WinBotBase.move_mouse`
+        """
+        return await self._send_data("moveMouse", hwnd, x, y, mode, ele_hwnd) == "true"
+
+    async def scroll_mouse(self, hwnd: str, x: float, y: float, count: int, mode: bool = False) -> bool:
+        """
+        滚动鼠标，参见 :meth:`WinBotBase.scroll_mouse`
+        """
+        return await self._send_data("rollMouse", hwnd, x, y, count, mode) == "true"
+
+    async def click_mouse(self, hwnd: str, x: float, y: float, typ: int, mode: bool = False,
+                          ele_hwnd: str = "0") -> bool:
+        """
+        鼠标点击，参见 :meth:`WinBotBase.click_mouse`
+        """
+        return await self._send_data("clickMouse", hwnd, x, y, typ, mode, ele_hwnd) == "true"
+
+    async def send_keys(self, text: str) -> bool:
+        """
+        输入文本
+        """
+        return await self._send_data("sendKeys", text) == "true"
+
+    async def send_keys_by_hwnd(self, hwnd: str, text: str) -> bool:
+        """
+        后台输入文本
+        """
+        return await self._send_data("sendKeysByHwnd", hwnd, text) == "true"
+
+    async def send_vk(self, vk: int, typ: int) -> bool:
+        """
+        输入虚拟键值(VK)，参见 :meth:`WinBotBase.send_vk`
+        """
+        return await self._send_data("sendVk", vk, typ) == "true"
+
+    async def send_vk_by_hwnd(self, hwnd: str, vk: int, typ: int) -> bool:
+        """
+        后台输入虚拟键值(VK)，参见 :meth:`WinBotBase.send_vk_by_hwnd`
+        """
+        return await self._send_data("sendVkByHwnd", hwnd, vk, typ) == "true"
+
+    async def save_screenshot(self, hwnd: str, save_path: str, region: _Region = None, algorithm: _Algorithm = None,
+                              mode: bool = False) -> bool:
+        """
+        截图，参见 :meth:`WinBotBase.save_screenshot`
+        """
+        if not region:
+            region = [0, 0, 0, 0]
+
+        return await self._send_data("saveScreenshot", hwnd, save_path, *region, *_algorithm_args(algorithm),
+                                     mode) == "true"
+
+    async def get_color(self, hwnd: str, x: float, y: float, mode: bool = False) -> Optional[str]:
+        """
+        获取指定坐标点的色值，参见 :meth:`WinBotBase.get_color`
+        """
+        response = await self._send_data("getColor", hwnd, x, y, mode)
+        if response == "null":
+            return None
+        return response
+
+    async def find_color(self, hwnd: str, color: str, sub_colors: _SubColors = None, region: _Region = None,
+                         similarity: float = 0.9, mode: bool = False, wait_time: float = None,
+                         interval_time: float = None) -> Optional[Point]:
+        """
+        获取指定色值的坐标点，参见 :meth:`WinBotBase.find_color`
+        """
+        if not region:
+            region = [0, 0, 0, 0]
+
+        response = await self._poll(("-1.0|-1.0",), wait_time, interval_time, "findColor", hwnd, color,
+                                    _sub_colors_str(sub_colors), *region, similarity, mode)
+        if response is None:
+            return None
+        x, y = response.split("|")
+        return Point(x=float(x), y=float(y))
+
+    async def find_images(self, hwnd_or_big_image_path: str, image_path: str, region: _Region = None,
+                          algorithm: _Algorithm = None, similarity: float = 0.9, mode: bool = False, multi: int = 1,
+                          wait_time: float = None, interval_time: float = None) -> List[Point]:
+        """
+        寻找图片坐标，返回坐标列表，参见 :meth:`WinBotBase.find_images`
+        """
+        if not region:
+            region = [0, 0, 0, 0]
+
+        command = "findImage" if hwnd_or_big_image_path.isdigit() else "findImageByFile"
+        response = await self._poll(("-1.0|-1.0", "-1|-1"), wait_time, interval_time, command,
+                                    hwnd_or_big_image_path, image_path, *region, similarity,
+                                    *_algorithm_args(algorithm), multi, mode)
+        if response is None:
+            return []
+        return [Point(x=point.x, y=point.y) for point in self._parse_points(response)]
+
+    async def __ocr(self, hwnd_or_image_path: str, region: _Region = None, algorithm: _Algorithm = None,
+                    mode: bool = False) -> List[OcrLine]:
+        if not region:
+            region = [0, 0, 0, 0]
+
+        if hwnd_or_image_path.isdigit():
+            # 句柄
+            response = await self._send_data("ocrByHwnd", hwnd_or_image_path, *region, *_algorithm_args(algorithm),
+                                             mode)
+        else:
+            # 图片
+            response = await self._send_data("ocrByFile", hwnd_or_image_path, *region, *_algorithm_args(algorithm))
+        if response == "null" or response == "":
+            return []
+        return parse_ocr(response)
+
+    async def init_ocr_server(self, ip: str, use_angle_model: bool = False, enable_gpu: bool = False,
+                              enable_tensorrt: bool = False) -> bool:
+        """
+        初始化 OCR 服务，参见 :meth:`WinBotBase.init_ocr_server`
+        """
+        return await self._send_data("initOcr", ip, use_angle_model, enable_gpu, enable_tensorrt) == "true"
+
+    async def get_text(self, hwnd_or_image_path: str, region: _Region = None, algorithm: _Algorithm = None,
+                       mode: bool = False) -> List[str]:
+        """
+        通过 OCR 识别窗口/图片中的文字，参见 :meth:`WinBotBase.get_text`
+        """
+        text_info_list = await self.__ocr(hwnd_or_image_path, region, algorithm, mode)
+        return [line.text for line in text_info_list]
+
+    async def find_text(self, hwnd_or_image_path: str, text: str, region: _Region = None,
+                        algorithm: _Algorithm = None, mode: bool = False) -> List[Point]:
+        """
+        查找文字所在的坐标，参见 :meth:`WinBotBase.find_text`
+        """
+        if not region:
+            region = [0, 0, 0, 0]
+
+        text_info_list = await self.__ocr(hwnd_or_image_path, region, algorithm, mode)
+        return _ocr_text_points(text_info_list, text, region)
+
+    async def find_texts(self, hwnd_or_image_path: str, texts: List[str], region: _Region = None,
+                         algorithm: _Algorithm = None, mode: bool = False,
+                         max_distance: int = 0) -> Dict[str, List[Point]]:
+        """
+        只识别一次窗口/图片，同时查找多个文字的坐标，参见 :meth:`WinBotBase.find_texts`
+        """
+        if not region:
+            region = [0, 0, 0, 0]
+
+        text_info_list = await self.__ocr(hwnd_or_image_path, region, algorithm, mode)
+        return TextMatcher(texts, max_distance).points(text_info_list, region)
+
+    async def ocr_page(self, hwnd_or_image_path: str, region: _Region = None, algorithm: _Algorithm = None,
+                       mode: bool = False) -> OcrPage:
+        """
+        识别窗口/图片中的文字并建立空间索引，参见 :meth:`WinBotBase.ocr_page`
+        """
+        if not region:
+            region = [0, 0, 0, 0]
+
+        return OcrPage(await self.__ocr(hwnd_or_image_path, region, algorithm, mode), region)
+
+    async def get_element_name(self, hwnd: str, xpath: str, wait_time: float = None,
+                               interval_time: float = None) -> Optional[str]:
+        """
+        获取元素名称，参见 :meth:`WinBotBase.get_element_name`
+        """
+        return await self._poll(("null",), wait_time, interval_time, "getElementName", hwnd, xpath)
+
+    async def get_element_value(self, hwnd: str, xpath: str, wait_time: float = None,
+                                interval_time: float = None) -> Optional[str]:
+        """
+        获取元素文本，参见 :meth:`WinBotBase.get_element_value`
+        """
+        return await self._poll(("null",), wait_time, interval_time, "getElementValue", hwnd, xpath)
+
+    async def get_element_rect(self, hwnd: str, xpath: str, wait_time: float = None,
+                               interval_time: float = None) -> Optional[Point2s]:
+        """
+        获取元素矩形，参见 :meth:`WinBotBase.get_element_rect`
+        """
+        response = await self._poll(("-1|-1|-1|-1",), wait_time, interval_time, "getElementRect", hwnd, xpath)
+        if response is None:
+            return None
+        x1, y1, x2, y2 = response.split("|")
+        return Point2s(Point(x=float(x1), y=float(y1)), Point(x=float(x2), y=float(y2)))
+
+    async def click_element(self, hwnd: str, xpath: str, typ: int, wait_time: float = None,
+                            interval_time: float = None) -> bool:
+        """
+        点击元素，参见 :meth:`WinBotBase.click_element`
+        """
+        return await self._poll(("false",), wait_time, interval_time, "clickElement", hwnd, xpath, typ) is not None
+
+    async def invoke_element(self, hwnd: str, xpath: str, wait_time: float = None,
+                             interval_time: float = None) -> bool:
+        """
+        执行元素默认操作，参见 :meth:`WinBotBase.invoke_element`
+        """
+        return await self._poll(("false",), wait_time, interval_time, "invokeElement", hwnd, xpath) is not None
+
+    async def set_element_value(self, hwnd: str, xpath: str, value: str, wait_time: float = None,
+                                interval_time: float = None) -> bool:
+        """
+        设置元素文本，参见 :meth:`WinBotBase.set_element_value`
+        """
+        return await self._poll(("false",), wait_time, interval_time, "setElementValue", hwnd, xpath,
+                                value) is not None
+
+    async def set_clipboard_text(self, text: str) -> bool:
+        """
+        设置剪切板内容
+        """
+        return await self._send_data("setClipboardText", text) == "true"
+
+    async def get_clipboard_text(self) -> str:
+        """
+        获取剪切板内容
+        """
+        return await self._send_data("getClipboardText")
+
+    async def start_process(self, cmd: str, show_window=True, is_wait=False) -> bool:
+        """
+        执行cmd命令，参见 :meth:`WinBotBase.start_process`
+        """
+        return await self._send_data("startProcess", cmd, show_window, is_wait) == "true"
+
+    async def execute_command(self, command: str, wait_timeout: int = 300) -> str:
+        """
+        执行cmd命令，参见 :meth:`WinBotBase.execute_command`
+        """
+        return await self._send_data("executeCommand", command, wait_timeout)
+
+    async def close_driver(self) -> bool:
+        """
+        关闭WindowsDriver.exe驱动程序
+        """
+        return await self._send_data("closeDriver") == "true"
+
+
+class AsyncWebBot(_AsyncBotBase):
+    """
+    WebBot 的 asyncio 版本，方法与 WebBotBase 同名，返回值相同，需要 await 调用
+    """
+
+    @classmethod
+    async def _build(cls, listen_port: int, local: bool = True, driver_params: dict = None) -> "AsyncWebBot":
+        """
+        :param listen_port: 脚本监听的端口
+        :param local: 脚本是否部署在本地
+        :param driver_params: Web 驱动启动参数
+        :return:
+        """
+        if local:
+            default_params = {
+                "serverIp": "127.0.0.1",
+                "serverPort": listen_port,
+                "browserName": "chrome",
+                "debugPort": 0,
+                "userDataDir": f"./UserData{random.randint(100000, 999999)}",
+                "browserPath": None,
+                "argument": None,
+            }
+            if driver_params:
+                default_params.update(driver_params)
+            _start_driver(["WebDriver.exe", json.dumps(default_params)], "本地 WebDriver 客户端启动成功")
+        print("WebSocket服务启动成功，等待客户端链接...")
+        bot = await cls._accept(listen_port)
+        print("WebSocket客户端链接成功")
+        return bot
+
+    async def goto(self, url: str) -> bool:
+        """
+        跳转页面
+        """
+        return await self._send_data("goto", url) == "true"
+
+    async def new_page(self, url: str) -> bool:
+        """
+        新建 Tab 并跳转页面
+        """
+        return await self._send_data("newPage", url) == "true"
+
+    async def back(self) -> bool:
+        """
+        后退
+        """
+        return await self._send_data("back") == "true"
+
+    async def forward(self) -> bool:
+        """
+        前进
+        """
+        return await self._send_data("forward") == "true"
+
+    async def refresh(self) -> bool:
+        """
+        刷新
+        """
+        return await self._send_data("refresh") == "true"
+
+    async def save_screenshot(self, xpath: str = None) -> Optional[str]:
+        """
+        截图，返回 PNG 格式的 base64，参见 :meth:`WebBotBase.save_screenshot`
+        """
+        if xpath is None:
+            response = await self._send_data("takeScreenshot")
+        else:
+            response = await self._send_data("takeScreenshot", xpath)
+        if response == "null":
+            return None
+        return response
+
+    async def get_current_page_id(self) -> Optional[str]:
+        """
+        获取当前页面 ID
+        """
+        response = await self._send_data("getCurPageId")
+        if response == "null":
+            return None
+        return response
+
+    async def get_all_page_id(self) -> list:
+        """
+        获取所有页面 ID
+        """
+        response = await self._send_data("getAllPageId")
+        if response == "null":
+            return []
+        return response.split("|")
+
+    async def switch_to_page(self, page_id: str) -> bool:
+        """
+        切换到指定页面
+        """
+        return await self._send_data("switchPage", page_id) == "true"
+
+    async def close_current_page(self) -> bool:
+        """
+        关闭当前页面
+        """
+        return await self._send_data("closePage") == "true"
+
+    async def get_current_url(self) -> Optional[str]:
+        """
+        获取当前页面 URL
+        """
+        response = await self._send_data("getCurrentUrl")
+        if response == "webdriver error":
+            return None
+        return response
+
+    async def get_current_title(self) -> Optional[str]:
+        """
+        获取当前页面标题
+        """
+        response = await self._send_data("getTitle")
+        if response == "webdriver error":
+            return None
+        return response
+
+    async def switch_to_frame(self, xpath) -> bool:
+        """
+        切换到指定 frame
+        """
+        return await self._send_data("switchFrame", xpath) == "true"
+
+    async def switch_to_main_frame(self) -> bool:
+        """
+        切回主 frame
+        """
+        return await self._send_data("switchMainFrame") == "true"
+
+    async def click_element(self, xpath: str) -> bool:
+        """
+        点击元素
+        """
+        return await self._send_data("clickElement", xpath) == "true"
+
+    async def get_element_text(self, xpath: str) -> Optional[str]:
+        """
+        获取元素文本
+        """
+        response = await self._send_data("getElementText", xpath)
+        if response == "null":
+            return None
+        return response
+
+    async def get_element_rect(self, xpath: str) -> Optional[Tuple[Point, Point]]:
+        """
+        获取元素矩形坐标
+        """
+        response = await self._send_data("getElementRect", xpath)
+        if response == "null":
+            return None
+        rect: dict = json.loads(response)
+        return (Point(x=float(rect.get("left")), y=float(rect.get("top"))),
+                Point(x=float(rect.get("right")), y=float(rect.get("bottom"))))
+
+    async def get_element_attr(self, xpath: str, attr_name: str) -> Optional[str]:
+        """
+        获取元素的属性
+        """
+        response = await self._send_data("getElementAttribute", xpath, attr_name)
+        if response == "null":
+            return None
+        return response
+
+    async def is_displayed(self, xpath: str) -> bool:
+        """
+        元素是否可见
+        """
+        return await self._send_data("isDisplayed", xpath) == "true"
+
+    async def clear_element(self, xpath: str) -> bool:
+        """
+        清除元素值
+        """
+        return await self._send_data("clearElement", xpath) == "true"
+
+    async def send_keys(self, xpath: str, value: str) -> bool:
+        """
+        输入值，参见 :meth:`WebBotBase.send_keys`
+        """
+        return await self._send_data("sendKeys", xpath, value) == "true"
+
+    async def set_element_value(self, xpath: str, value: str) -> bool:
+        """
+        设置元素值
+        """
+        return await self._send_data("setElementValue", xpath, value) == "true"
+
+    async def execute_script(self, script: str) -> Optional[Any]:
+        """
+        注入执行 JS，参见 :meth:`WebBotBase.execute_script`
+        """
+        response = await self._send_data("executeScript", script)
+        if response == "null":
+            return None
+        return response
+
+    async def get_all_cookies(self) -> Optional[list]:
+        """
+        获取所有的 Cookies
+        """
+        response = await self._send_data("getAllCookies")
+        if response == "null":
+            return None
+        return json.loads(response)
+
+    async def quit(self) -> bool:
+        """
+        退出浏览器
+        """
+        return await self._send_data("closeBrowser") == "true"
+
+    async def close_driver(self) -> bool:
+        """
+        关闭WebDriver.exe驱动程序
+        """
+        return await self._send_data("closeDriver") == "true"
+
+
+def _async_script_class(cls, main_cls, async_base):
+    """
+    根据用户脚本类（AndroidBotMain 等的子类）构建 asyncio 版本的脚本类
+
+    用户在脚本类中定义的属性和方法（script_main、wait_timeout、log_level 等）会复制到新的类中，新的类继承 async_base。
+
+    :param cls: 用户脚本类
+    :param main_cls: AndroidBotMain/WinBotMain/WebBotMain
+    :param async_base: AsyncAndroidBot/AsyncWinBot/AsyncWebBot
+    :return:
+    """
+    namespace = {}
+    for klass in reversed(cls.__mro__):
+        if klass is main_cls or not issubclass(klass, main_cls):
+            continue
+        for name, value in vars(klass).items():
+            if name.startswith("__") and name.endswith("__") or name == "_abc_impl":
+                continue
+            namespace[name] = value
+
+    if not inspect.iscoroutinefunction(namespace.get("script_main")):
+        raise TypeError("execute_async 要求 `script_main` 使用 async def 定义")
+
+    namespace["__module__"] = cls.__module__
+    namespace["__qualname__"] = cls.__qualname__
+    return type(cls.__name__, (async_base,), namespace)
+
+
+class _AsyncScriptServer:
+    """
+    单事件循环的脚本服务，每个设备连接运行一个 script_main 协程
+    """
+
+    def __init__(self, script_cls):
+        self.script_cls = script_cls
+        self.sessions = set()
+
+    @property
+    def active_sessions(self) -> int:
+        """
+        当前活跃的会话数
+
+        :return:
+        """
+        return len(self.sessions)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        bot = self.script_cls(reader, writer)
+        self.sessions.add(bot)
+        bot.log.info(f"{bot.client_address[0]}:{bot.client_address[1]} 已连接，当前活跃会话数：{self.active_sessions}")
+        try:
+            await bot.script_main()
+        except Exception as e:
+            bot.log.exception(f"script_main 执行异常: {e}")
+        finally:
+            self.sessions.discard(bot)
+            writer.close()
+            bot.log.info(f"{bot.client_address[0]}:{bot.client_address[1]} 已断开，当前活跃会话数：{self.active_sessions}")
+
+    async def serve_forever(self, socket_address, local_ip: str) -> None:
+        server = await asyncio.start_server(self._handle, host=socket_address[0], port=socket_address[1],
+                                            family=socket.AF_INET, reuse_address=True)
+        print(f"Server stared on {local_ip}:{socket_address[1]}")
+        async with server:
+            await server.serve_forever()
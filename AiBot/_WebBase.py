@@ -1,13 +1,15 @@
 import json
 import random
-import socket
 import subprocess
 import threading
-from typing import Optional, Tuple, Any, Literal
+from typing import Optional, Tuple, Any, Literal, Dict
 
 from loguru import logger
 
-from ._utils import Point, _Point_Tuple
+from ._metrics import Metrics, prometheus_text
+from ._protocol import FrameReader, Pipeline, encode_frame, transact
+from ._trace import should_trace, preview
+from ._utils import Point, _Point_Tuple, _shared_listener
 
 
 class WebBotBase:
@@ -20,15 +22,24 @@ class WebBotBase:
     log_size = 10  # MB
     log = logger
 
+    # 调试日志：数据预览的最大字节数（0 表示不截断），以及每 N 帧记录一帧
+    trace_preview_size = 256
+    trace_sample_rate = 1
+
+    # 当前连接的请求流水线
+    _pipeline: Optional[Pipeline] = None
+
+    # 是否记录命令统计，见 metrics()
+    metrics_enabled = True
+    _metrics: Optional[Metrics] = None
+
     def __init__(self, port):
         self._lock = threading.Lock()
-        address_info = socket.getaddrinfo(None, port, socket.AF_INET, socket.SOCK_STREAM)[0]
-        family, socket_type, proto, _, socket_address = address_info
-        server = socket.socket(family, socket_type, proto)
-        server.bind(socket_address)
-        server.listen(1)
+        self._metrics = Metrics()
+        server = _shared_listener(port)
         print("WebSocket服务启动成功，等待客户端链接...")
         self.request, self.client_address = server.accept()
+        self._reader = FrameReader(self.request, self.client_address)
         print("WebSocket客户端链接成功")
 
     @classmethod
@@ -67,40 +78,52 @@ class WebBotBase:
         return WebBotBase(listen_port)
 
     def __send_data(self, *args) -> str:
-        args_len = ""
-        args_text = ""
-
-        for argv in args:
-            if argv is None:
-                argv = ""
-            elif isinstance(argv, bool) and argv:
-                argv = "true"
-            elif isinstance(argv, bool) and not argv:
-                argv = "false"
-
-            argv = str(argv)
-            args_text += argv
-            args_len += str(len(bytes(argv, 'utf8'))) + "/"
-
-        data = (args_len.strip("/") + "\n" + args_text).encode("utf8")
+        data = encode_frame(*args)
 
         try:
-            with self._lock:
-                self.log.debug(rf"->>> {data}")
-                self.request.sendall(data)
-                response = self.request.recv(65535)
-                if response == b"":
-                    raise ConnectionAbortedError(f"{self.client_address[0]}:{self.client_address[1]} 客户端断开链接。")
-                data_length, data = response.split(b"/", 1)
-                while int(data_length) > len(data):
-                    data += self.request.recv(65535)
-                self.log.debug(rf"<<<- {data}")
+            traced = should_trace(self)
+            if traced:
+                self.log.debug(f"->>> {preview(data, self.trace_preview_size)}")
+            data = transact(self, data, command=args[0])
+            if traced:
+                self.log.debug(f"<<<- {preview(data, self.trace_preview_size)}")
 
             return data.decode("utf8").strip()
         except Exception as e:
             self.log.error("send/read tcp data error: " + str(e))
             raise e
 
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        获取当前连接按命令名统计的调用次数、错误次数、收发字节数、锁等待时间与往返时间分位数
+
+        :return: {命令名: {"count", "errors", "bytes_sent", "bytes_received", "lock_wait", "rtt_avg", "rtt_p50", "rtt_p95", "rtt_p99"}}，时间单位为秒
+        """
+        return self._metrics.snapshot()
+
+    def prometheus_metrics(self) -> str:
+        """
+        以 Prometheus 文本格式导出当前连接的命令统计
+
+        :return:
+        """
+        return prometheus_text([self])
+
+    def pipeline(self, max_workers: int = 16) -> Pipeline:
+        """
+        请求流水线，连续发送多个命令，只需约一次往返时间
+
+        :param max_workers: 同时等待响应的最大调用数
+        :return: Pipeline
+
+        ex:
+        with self.pipeline() as p:
+            p.click_element("//*[@id='kw']")
+            title = p.get_current_title()
+        print(title.result())
+        """
+        return Pipeline(self, max_workers)
+
     #############
     # 页面和导航 #
     #############
@@ -1,16 +1,23 @@
-import socket
+import contextlib
+import os
 import subprocess
+import tempfile
 import threading
-import time
 import json
 import base64
-from ast import literal_eval
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
 from urllib import request as request_lib, parse
 
 from loguru import logger
 
-from ._utils import Point, _Region, _Algorithm, _SubColors, Point2s, _Point_Tuple
+from ._frame import Frame, FrozenFrame
+from ._metrics import Metrics, prometheus_text
+from ._ocr import OcrCache, OcrLine, OcrPage, TextMatcher, parse_ocr
+from ._protocol import FrameReader, Pipeline, encode_frame, transact
+from ._sync import file_digest
+from ._trace import should_trace, preview
+from ._wait import Waiter, WaitStats
+from ._utils import Point, _Region, _Algorithm, _SubColors, Point2s, _Point_Tuple, _ocr_text_points, _shared_listener
 
 
 class WinBotBase:
@@ -18,20 +25,48 @@ class WinBotBase:
     wait_timeout = 3  # seconds
     interval_timeout = 0.5  # seconds
 
+    # 轮询等待：间隔的指数增长倍数（1 表示固定间隔）、最大间隔、随机抖动比例，见 Waiter
+    wait_backoff = 1.0
+    wait_max_interval: Optional[float] = None
+    wait_jitter = 0.0
+    # 最近一次轮询等待的统计
+    last_wait: Optional[WaitStats] = None
+
     log_storage = False
     log_level = "INFO"
     log_size = 10  # MB
     log = logger
 
+    # 调试日志：数据预览的最大字节数（0 表示不截断），以及每 N 帧记录一帧
+    trace_preview_size = 256
+    trace_sample_rate = 1
+
+    # 当前连接的请求流水线
+    _pipeline: Optional[Pipeline] = None
+
+    # 是否记录命令统计，见 metrics()
+    metrics_enabled = True
+    _metrics: Optional[Metrics] = None
+
+    # 当前的冻结截图帧，见 frozen_frame()；以下命令会改变窗口内容，发送时作废冻结帧
+    _frozen: Optional[FrozenFrame] = None
+    frozen_frame_invalidated_by = frozenset({
+        "clickMouse", "moveMouse", "moveMouseRelative", "rollMouse", "sendKeys", "sendKeysByHwnd", "sendVk",
+        "sendVkByHwnd", "hidClick", "hidDoubleClick", "hidLongClick", "hidSwipe", "hidDispatchGesture", "hidPress",
+        "hidMove", "hidRelease", "setWindowPos", "setWindowTop", "showWindow",
+    })
+
+    # OCR 识别结果缓存，见 OcrCache；窗口识别前先截取识别区域，截图内容未变化时直接返回缓存的结果，
+    # 图片识别按图片文件的修改时间与大小判断内容是否变化
+    ocr_cache: Optional[OcrCache] = None
+
     def __init__(self, port):
         self._lock = threading.Lock()
-        address_info = socket.getaddrinfo(None, port, socket.AF_INET, socket.SOCK_STREAM)[0]
-        family, socket_type, proto, _, socket_address = address_info
-        server = socket.socket(family, socket_type, proto)
-        server.bind(socket_address)
-        server.listen(1)
+        self._metrics = Metrics()
+        server = _shared_listener(port)
         print("WinSocket服务启动成功，等待客户端链接...")
         self.request, self.client_address = server.accept()
+        self._reader = FrameReader(self.request, self.client_address)
         print("WinSocket客户端链接成功")
 
     @classmethod
@@ -57,40 +92,54 @@ class WinBotBase:
         return WinBotBase(listen_port)
 
     def __send_data(self, *args) -> str:
-        args_len = ""
-        args_text = ""
-
-        for argv in args:
-            if argv is None:
-                argv = ""
-            elif isinstance(argv, bool) and argv:
-                argv = "true"
-            elif isinstance(argv, bool) and not argv:
-                argv = "false"
-
-            argv = str(argv)
-            args_text += argv
-            args_len += str(len(bytes(argv, 'utf8'))) + "/"
-
-        data = (args_len.strip("/") + "\n" + args_text).encode("utf8")
+        if self._frozen is not None and args[0] in self.frozen_frame_invalidated_by:
+            self._frozen.invalidate()
+        data = encode_frame(*args)
 
         try:
-            with self._lock:
-                self.log.debug(rf"->-> {data}")
-                self.request.sendall(data)
-                response = self.request.recv(65535)
-                if response == b"":
-                    raise ConnectionAbortedError(f"{self.client_address[0]}:{self.client_address[1]} 客户端断开链接。")
-                data_length, data = response.split(b"/", 1)
-                while int(data_length) > len(data):
-                    data += self.request.recv(65535)
-                self.log.debug(rf"<-<- {data}")
+            traced = should_trace(self)
+            if traced:
+                self.log.debug(f"->-> {preview(data, self.trace_preview_size)}")
+            data = transact(self, data, command=args[0])
+            if traced:
+                self.log.debug(f"<-<- {preview(data, self.trace_preview_size)}")
 
             return data.decode("utf8").strip()
         except Exception as e:
             self.log.error("send/read tcp data error: " + str(e))
             raise e
 
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        获取当前连接按命令名统计的调用次数、错误次数、收发字节数、锁等待时间与往返时间分位数
+
+        :return: {命令名: {"count", "errors", "bytes_sent", "bytes_received", "lock_wait", "rtt_avg", "rtt_p50", "rtt_p95", "rtt_p99"}}，时间单位为秒
+        """
+        return self._metrics.snapshot()
+
+    def prometheus_metrics(self) -> str:
+        """
+        以 Prometheus 文本格式导出当前连接的命令统计
+
+        :return:
+        """
+        return prometheus_text([self])
+
+    def pipeline(self, max_workers: int = 16) -> Pipeline:
+        """
+        请求流水线，连续发送多个命令，只需约一次往返时间
+
+        :param max_workers: 同时等待响应的最大调用数
+        :return: Pipeline
+
+        ex:
+        with self.pipeline() as p:
+            p.move_mouse(hwnd, 100, 200)
+            color = p.get_color(hwnd, 300, 400)
+        print(color.result())
+        """
+        return Pipeline(self, max_workers)
+
     # #############
     #   窗口操作   #
     # #############
@@ -206,14 +255,14 @@ class WinBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data("getWindowPos", hwnd)
             if response == "-1|-1|-1|-1":
-                time.sleep(interval_time)
                 continue
             else:
                 x1, y1, x2, y2 = response.split("|")
+                waiter.hit()
                 return Point2s(Point(x=float(x1), y=float(y1)), Point(x=float(x2), y=float(y2)))
         # 超时
         return None
@@ -378,6 +427,57 @@ class WinBotBase:
         return self.__send_data("saveScreenshot", hwnd, save_path, *region, algorithm_type, threshold, max_val,
                                 mode) == "true"
 
+    def capture(self, hwnd: str, mode: bool = False) -> Optional[Frame]:
+        """
+        截取窗口并解码为本地图像帧，之后可在本地多次取色、找色、找图，不再与驱动通信
+
+        通过 save_screenshot 保存到本机临时目录后读取，仅支持驱动与脚本部署在同一台电脑（local=True）。
+
+        :param hwnd: 窗口句柄；
+        :param mode: 操作模式，后台 true，前台 false, 默认前台操作；
+        :return: Frame 或者 None，需要安装 numpy 以及 opencv-python 或 Pillow
+        """
+        fd, save_path = tempfile.mkstemp(suffix=".png", prefix="aibot_")
+        os.close(fd)
+        try:
+            if not self.save_screenshot(hwnd, save_path, mode=mode):
+                return None
+            return Frame.from_file(save_path)
+        finally:
+            os.remove(save_path)
+
+    @contextlib.contextmanager
+    def frozen_frame(self, hwnd: str, ttl: float = 0.2, mode: bool = False):
+        """
+        冻结截图帧：首次取色/找色时截取一张窗口截图，之后 ttl 秒内该窗口的 get_color、find_color 直接在本地图像中完成；
+        过期后下次使用时重新截图，发送鼠标、键盘等命令（见 frozen_frame_invalidated_by）时立即作废。
+
+        with bot.frozen_frame(hwnd, ttl=0.2):
+            hp = bot.get_color(hwnd, 100, 20)
+            mp = bot.get_color(hwnd, 100, 40)
+
+        嵌套使用时沿用外层的冻结帧。截图方式见 capture。
+
+        :param hwnd: 窗口句柄；
+        :param ttl: 帧的有效时长（秒）
+        :param mode: 操作模式，后台 true，前台 false, 默认前台操作；
+        :return: FrozenFrame
+        """
+        if self._frozen is not None:
+            yield self._frozen
+            return
+
+        self._frozen = FrozenFrame(ttl, lambda: self.capture(hwnd, mode), key=(hwnd, mode))
+        try:
+            yield self._frozen
+        finally:
+            self._frozen = None
+
+    def __frozen(self, hwnd: str, mode: bool) -> Optional[Frame]:
+        if self._frozen is None or self._frozen.key != (hwnd, mode):
+            return None
+        return self._frozen.get()
+
     def get_color(self, hwnd: str, x: float, y: float, mode: bool = False) -> Optional[str]:
         """
         获取指定坐标点的色值，返回色值字符串(#008577)或者 None
@@ -388,6 +488,10 @@ class WinBotBase:
         :param mode: 操作模式，后台 true，前台 false, 默认前台操作；
         :return:
         """
+        frame = self.__frozen(hwnd, mode)
+        if frame is not None:
+            return frame.get_color((x, y))
+
         response = self.__send_data("getColor", hwnd, x, y, mode)
         if response == "null":
             return None
@@ -432,15 +536,24 @@ class WinBotBase:
         else:
             sub_colors_str = "null"
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
+            frame = self.__frozen(hwnd, mode)
+            if frame is not None:
+                point = frame.find_color(color, sub_colors, region, similarity)
+                if point is None:
+                    continue
+                waiter.hit()
+                return point
+
             response = self.__send_data("findColor", hwnd, color, sub_colors_str, *region, similarity, mode)
             # 找色失败
             if response == "-1.0|-1.0":
-                time.sleep(interval_time)
+                continue
             else:
                 # 找色成功
                 x, y = response.split("|")
+                waiter.hit()
                 return Point(x=float(x), y=float(y))
         # 超时
         return None
@@ -541,8 +654,8 @@ class WinBotBase:
                 threshold = 127
                 max_val = 255
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             if hwnd_or_big_image_path.isdigit():
                 # 句柄
                 response = self.__send_data("findImage", hwnd_or_big_image_path, image_path, *region, similarity,
@@ -555,7 +668,6 @@ class WinBotBase:
                                             threshold, max_val, multi, mode)
             # 找图失败
             if response in ["-1.0|-1.0", "-1|-1"]:
-                time.sleep(interval_time)
                 continue
             else:
                 # 找图成功，返回图片左上角坐标
@@ -565,6 +677,7 @@ class WinBotBase:
                 for point_str in image_points:
                     x, y = point_str.split("|")
                     point_list.append(Point(x=float(x), y=float(y)))
+                waiter.hit()
                 return point_list
         # 超时
         return []
@@ -595,12 +708,11 @@ class WinBotBase:
         if not region:
             region = [0, 0, 0, 0]
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data("findAnimation", hwnd, interval_ti, *region, mode)
             # 找图失败
             if response == "-1.0|-1.0":
-                time.sleep(interval_time)
                 continue
             else:
                 # 找图成功，返回图片左上角坐标
@@ -610,6 +722,7 @@ class WinBotBase:
                 for point_str in image_points:
                     x, y = point_str.split("|")
                     point_list.append(Point(x=float(x), y=float(y)))
+                waiter.hit()
                 return point_list
         # 超时
         return []
@@ -618,25 +731,17 @@ class WinBotBase:
     #   OCR 相关   #
     # ##############
     @staticmethod
-    def __parse_ocr(text: str) -> list:
+    def __parse_ocr(text: str) -> List[OcrLine]:
         """
         解析 OCR 识别出出来的信息
 
         :param text:
         :return:
         """
-        # pattern = re.compile(r'(\[\[\[).+?(\)])')
-        # matches = pattern.finditer(text)
-        #
-        # text_info_list = []
-        # for match in matches:
-        #     result_str = match.group()
-        #     text_info = literal_eval(result_str)
-        #     text_info_list.append(text_info)
-
-        return literal_eval(text)
+        return parse_ocr(text)
 
-    def __ocr_server(self, hwnd: str, region: _Region = None, algorithm: _Algorithm = None, mode: bool = False) -> list:
+    def __ocr_server(self, hwnd: str, region: _Region = None, algorithm: _Algorithm = None,
+                     mode: bool = False) -> List[OcrLine]:
         """
         OCR 服务，通过 OCR 识别屏幕中文字
 
@@ -657,12 +762,13 @@ class WinBotBase:
                 threshold = 127
                 max_val = 255
 
-        response = self.__send_data("ocrByHwnd", hwnd, *region, algorithm_type, threshold, max_val, mode)
-        if response == "null" or response == "":
-            return []
-        return self.__parse_ocr(response)
+        key = None
+        if self.ocr_cache is not None:
+            key = self.__hwnd_cache_key(hwnd, region, (algorithm_type, threshold, max_val), mode)
+        return self.__cached_ocr(key, "ocrByHwnd", hwnd, *region, algorithm_type, threshold, max_val, mode)
 
-    def __ocr_server_by_file(self, image_path: str, region: _Region = None, algorithm: _Algorithm = None) -> list:
+    def __ocr_server_by_file(self, image_path: str, region: _Region = None,
+                             algorithm: _Algorithm = None) -> List[OcrLine]:
         """
         OCR 服务，通过 OCR 识别屏幕中文字
 
@@ -682,10 +788,46 @@ class WinBotBase:
                 threshold = 127
                 max_val = 255
 
-        response = self.__send_data("ocrByFile", image_path, *region, algorithm_type, threshold, max_val)
+        key = None
+        if self.ocr_cache is not None:
+            key = self.__file_cache_key(image_path, region, (algorithm_type, threshold, max_val))
+        return self.__cached_ocr(key, "ocrByFile", image_path, *region, algorithm_type, threshold, max_val)
+
+    def __cached_ocr(self, key: Optional[tuple], *args) -> List[OcrLine]:
+        cache = self.ocr_cache if key is not None else None
+        if cache is not None:
+            lines = cache.get(key)
+            if lines is not None:
+                return lines
+
+        response = self.__send_data(*args)
         if response == "null" or response == "":
-            return []
-        return self.__parse_ocr(response)
+            lines = []
+        else:
+            lines = self.__parse_ocr(response)
+        if cache is not None:
+            cache.put(key, lines)
+        return lines
+
+    def __hwnd_cache_key(self, hwnd: str, region: _Region, algorithm: tuple, mode: bool) -> Optional[tuple]:
+        # 以识别区域截图文件的内容摘要代表窗口内容；截图保存在本机临时目录，驱动部署在其他电脑时读取到空文件，不使用缓存
+        fd, save_path = tempfile.mkstemp(suffix=".png", prefix="aibot_")
+        os.close(fd)
+        try:
+            if not self.save_screenshot(hwnd, save_path, region, mode=mode) or not os.path.getsize(save_path):
+                return None
+            return "ocrByHwnd", tuple(region), algorithm, file_digest(save_path)
+        finally:
+            os.remove(save_path)
+
+    @staticmethod
+    def __file_cache_key(image_path: str, region: _Region, algorithm: tuple) -> Optional[tuple]:
+        # 图片文件以路径、修改时间与大小代表内容；文件不在本机时不使用缓存
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        return "ocrByFile", image_path, stat.st_mtime_ns, stat.st_size, tuple(region), algorithm
 
     def init_ocr_server(self, ip: str, use_angle_model: bool = False, enable_gpu: bool = False,
                         enable_tensorrt: bool = False) -> bool:
@@ -722,11 +864,7 @@ class WinBotBase:
             # 图片
             text_info_list = self.__ocr_server_by_file(hwnd_or_image_path, region, algorithm)
 
-        text_list = []
-        for text_info in text_info_list:
-            text = text_info[-1][0]
-            text_list.append(text)
-        return text_list
+        return [line.text for line in text_info_list]
 
     def find_text(self, hwnd_or_image_path: str, text: str, region: _Region = None, algorithm: _Algorithm = None,
                   mode: bool = False) -> List[Point]:
@@ -754,41 +892,63 @@ class WinBotBase:
             # 图片
             text_info_list = self.__ocr_server_by_file(hwnd_or_image_path, region, algorithm)
 
-        text_points = []
-        for text_info in text_info_list:
-            if text in text_info[-1][0]:
-                points, words_tuple = text_info
-
-                left, _, right, _ = points
-
-                # 文本区域起点坐标
-                start_x = left[0]
-                start_y = left[1]
-                # 文本区域终点坐标
-                end_x = right[0]
-                end_y = right[1]
-                # 文本区域中心点据左上角的偏移量
-                # 可能指定文本只是部分文本，要计算出实际位置(x轴)
-                width = end_x - start_x
-                height = end_y - start_y
-                words: str = words_tuple[0]
-
-                # 单字符宽度
-                single_word_width = width / len(words)
-                # 文本在整体文本的起始位置
-                pos = words.find(text)
-
-                offset_x = single_word_width * (pos + len(text) / 2)
-                offset_y = height / 2
-
-                # 计算文本区域中心坐标
-                text_point = Point(
-                    x=float(region[0] + start_x + offset_x),
-                    y=float(region[1] + start_y + offset_y),
-                )
-                text_points.append(text_point)
-
-        return text_points
+        return _ocr_text_points(text_info_list, text, region)
+
+    def find_texts(self, hwnd_or_image_path: str, texts: List[str], region: _Region = None,
+                   algorithm: _Algorithm = None, mode: bool = False, max_distance: int = 0) -> Dict[str, List[Point]]:
+        """
+        只识别一次窗口/图片，同时查找多个文字的坐标，坐标计算与 find_text 相同
+
+        :param hwnd_or_image_path: 句柄或者图片路径
+        :param texts: 要查找的文字列表
+        :param region: 识别区域，默认全屏
+        :param algorithm: 处理图片/屏幕所用算法和参数，默认保存原图
+        :param mode: 操作模式，后台 true，前台 false, 默认前台操作
+        :param max_distance: 允许的最大编辑距离，用于容忍 OCR 识别错误的字符，默认 0 精确匹配
+        :return: {文字: 坐标列表}，未找到的文字对应空列表
+
+        .. seealso::
+            :meth:`save_screenshot`: ``region`` 和 ``algorithm`` 的参数说明
+
+        """
+        if not region:
+            region = [0, 0, 0, 0]
+
+        if hwnd_or_image_path.isdigit():
+            # 句柄
+            text_info_list = self.__ocr_server(hwnd_or_image_path, region, algorithm, mode)
+        else:
+            # 图片
+            text_info_list = self.__ocr_server_by_file(hwnd_or_image_path, region, algorithm)
+
+        return TextMatcher(texts, max_distance).points(text_info_list, region)
+
+    def ocr_page(self, hwnd_or_image_path: str, region: _Region = None, algorithm: _Algorithm = None,
+                 mode: bool = False) -> OcrPage:
+        """
+        识别窗口/图片中的文字并建立空间索引，之后的区域、最近邻、右侧、下方等查询都在本地完成
+
+        :param hwnd_or_image_path: 句柄或者图片路径
+        :param region: 识别区域，默认全屏
+        :param algorithm: 处理图片/屏幕所用算法和参数，默认保存原图
+        :param mode: 操作模式，后台 true，前台 false, 默认前台操作
+        :return: OcrPage，坐标与 find_text 的返回值一致
+
+        .. seealso::
+            :meth:`save_screenshot`: ``region`` 和 ``algorithm`` 的参数说明
+
+        """
+        if not region:
+            region = [0, 0, 0, 0]
+
+        if hwnd_or_image_path.isdigit():
+            # 句柄
+            text_info_list = self.__ocr_server(hwnd_or_image_path, region, algorithm, mode)
+        else:
+            # 图片
+            text_info_list = self.__ocr_server_by_file(hwnd_or_image_path, region, algorithm)
+
+        return OcrPage(text_info_list, region)
 
     def init_yolo_server(self, ip: str, model_path: str = "d:/yolov8n.onnx", classes_path: str = ''):
         """
@@ -848,13 +1008,13 @@ class WinBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data("getElementName", hwnd, xpath)
             if response == "null":
-                time.sleep(interval_time)
                 continue
             else:
+                waiter.hit()
                 return response
         # 超时
         return None
@@ -876,13 +1036,13 @@ class WinBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data("getElementValue", hwnd, xpath)
             if response == "null":
-                time.sleep(interval_time)
                 continue
             else:
+                waiter.hit()
                 return response
         # 超时
         return None
@@ -905,14 +1065,14 @@ class WinBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data("getElementRect", hwnd, xpath)
             if response == "-1|-1|-1|-1":
-                time.sleep(interval_time)
                 continue
             else:
                 x1, y1, x2, y2 = response.split("|")
+                waiter.hit()
                 return Point(x=float(x1), y=float(y1)), Point(x=float(x2), y=float(y2))
         # 超时
         return None
@@ -934,13 +1094,13 @@ class WinBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data("getElementWindow", hwnd, xpath)
             if response == "null":
-                time.sleep(interval_time)
                 continue
             else:
+                waiter.hit()
                 return response
         # 超时
         return None
@@ -963,13 +1123,13 @@ class WinBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data('clickElement', hwnd, xpath, typ)
             if response == "false":
-                time.sleep(interval_time)
                 continue
             else:
+                waiter.hit()
                 return True
         # 超时
         return False
@@ -991,13 +1151,13 @@ class WinBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data('invokeElement', hwnd, xpath)
             if response == "false":
-                time.sleep(interval_time)
                 continue
             else:
+                waiter.hit()
                 return True
         # 超时
         return False
@@ -1019,13 +1179,13 @@ class WinBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data('setElementFocus', hwnd, xpath)
             if response == "false":
-                time.sleep(interval_time)
                 continue
             else:
+                waiter.hit()
                 return True
         # 超时
         return False
@@ -1048,13 +1208,13 @@ class WinBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data('setElementValue', hwnd, xpath, value)
             if response == "false":
-                time.sleep(interval_time)
                 continue
             else:
+                waiter.hit()
                 return True
         # 超时
         return False
@@ -1078,13 +1238,13 @@ class WinBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data('setElementScroll', hwnd, xpath, horizontal, vertical)
             if response == "false":
-                time.sleep(interval_time)
                 continue
             else:
+                waiter.hit()
                 return True
         # 超时
         return False
@@ -1106,13 +1266,13 @@ class WinBotBase:
         if interval_time is None:
             interval_time = self.interval_timeout
 
-        end_time = time.time() + wait_time
-        while time.time() < end_time:
+        waiter = Waiter.for_bot(self, wait_time, interval_time)
+        for _ in waiter:
             response = self.__send_data('isSelected', hwnd, xpath)
             if response == "false":
-                time.sleep(interval_time)
                 continue
             else:
+                waiter.hit()
                 return True
         # 超时
         return False
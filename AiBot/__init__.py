@@ -6,5 +6,17 @@ if sys.version_info < (3, 10):
 from .AndroidBot import AndroidBotMain
 from .WebBot import WebBotMain
 from .WinBot import WinBotMain
+from ._AsyncBase import AsyncAndroidBot, AsyncWinBot, AsyncWebBot
+from ._conditions import ImageCondition, ColorCondition, ElementCondition, ElementTextCondition, TextCondition
+from ._fleet import distribute_files
+from ._frame import Frame
+from ._metrics import prometheus_text
+from ._ocr import OcrCache, OcrLine, OcrPage
+from ._pool import DriverPool, driver_pool
+from ._signatures import ColorSignatureSet
+from ._templates import TemplateRegistry
 
-__all__ = ["AndroidBotMain", "WebBotMain", "WinBotMain"]
+__all__ = ["AndroidBotMain", "WebBotMain", "WinBotMain", "AsyncAndroidBot", "AsyncWinBot", "AsyncWebBot", "DriverPool",
+           "driver_pool", "prometheus_text", "ImageCondition", "ColorCondition", "ElementCondition",
+           "ElementTextCondition", "TextCondition", "Frame", "ColorSignatureSet", "TemplateRegistry", "distribute_files",
+           "OcrLine", "OcrCache", "OcrPage"]
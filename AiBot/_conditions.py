@@ -0,0 +1,81 @@
+from typing import Optional
+
+from ._utils import _Region, _Algorithm, _SubColors
+
+
+class Condition:
+    """
+    wait_any 的等待条件基类
+
+    :param name: 条件名称，便于识别命中的条件
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+
+    def __repr__(self):
+        params = ", ".join(f"{key}={value!r}" for key, value in vars(self).items() if value is not None)
+        return f"{type(self).__name__}({params})"
+
+
+class ImageCondition(Condition):
+    """
+    图片存在，命中结果为 find_image 返回的坐标
+    """
+
+    def __init__(self, image_name: str, region: _Region = None, algorithm: _Algorithm = None,
+                 similarity: float = 0.9, name: Optional[str] = None):
+        super().__init__(name)
+        self.image_name = image_name
+        self.region = region
+        self.algorithm = algorithm
+        self.similarity = similarity
+
+
+class ColorCondition(Condition):
+    """
+    颜色存在，命中结果为 find_color 返回的坐标
+    """
+
+    def __init__(self, color: str, sub_colors: _SubColors = None, region: _Region = None, similarity: float = 0.9,
+                 name: Optional[str] = None):
+        super().__init__(name)
+        self.color = color
+        self.sub_colors = sub_colors
+        self.region = region
+        self.similarity = similarity
+
+
+class ElementCondition(Condition):
+    """
+    元素存在，命中结果为 xpath
+    """
+
+    def __init__(self, xpath: str, name: Optional[str] = None):
+        super().__init__(name)
+        self.xpath = xpath
+
+
+class ElementTextCondition(Condition):
+    """
+    元素文本可获取；指定 expected 时要求文本包含 expected，命中结果为元素文本
+    """
+
+    def __init__(self, xpath: str, expected: Optional[str] = None, name: Optional[str] = None):
+        super().__init__(name)
+        self.xpath = xpath
+        self.expected = expected
+
+
+class TextCondition(Condition):
+    """
+    OCR 识别到文字，命中结果为 find_text 返回的坐标列表；region、algorithm、scale 相同的文字条件共用一次 OCR
+    """
+
+    def __init__(self, text: str, region: _Region = None, algorithm: _Algorithm = None, scale: float = 1.0,
+                 name: Optional[str] = None):
+        super().__init__(name)
+        self.text = text
+        self.region = region
+        self.algorithm = algorithm
+        self.scale = scale
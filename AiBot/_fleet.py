@@ -0,0 +1,173 @@
+import contextlib
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from loguru import logger
+
+from ._AndroidBase import AndroidBotBase
+from ._protocol import BufferBody
+
+_Files = Union[Dict[str, str], Iterable[Tuple[str, str]]]
+
+
+class _TokenBucket:
+    """
+    令牌桶限速：允许令牌透支，透支部分按速率换算为等待时间，多个线程共享时按到达顺序排队
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: int) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate) - amount
+            self._updated = now
+            deficit = -self._tokens
+        if deficit > 0:
+            time.sleep(deficit / self.rate)
+
+
+class DeviceReport:
+    """
+    单台设备的分发结果
+
+    - bot：设备连接
+    - files：{目标路径: 是否成功}
+    - bytes：成功推送的字节数
+    - attempts：推送次数（含重试）
+    - errors：每次失败的原因
+    - elapsed：耗时（秒）
+    """
+    __slots__ = ("bot", "files", "bytes", "attempts", "errors", "elapsed")
+
+    def __init__(self, bot: AndroidBotBase):
+        self.bot = bot
+        self.files: Dict[str, bool] = {}
+        self.bytes = 0
+        self.attempts = 0
+        self.errors: List[str] = []
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return all(self.files.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        pushed = sum(self.files.values())
+        return (f"DeviceReport(address={self.bot.client_address}, files={pushed}/{len(self.files)}, "
+                f"attempts={self.attempts}, throughput={self.throughput / (1 << 20):.1f} MB/s)")
+
+
+class _Source:
+    __slots__ = ("local_path", "remote_path", "file", "data")
+
+    def __init__(self, local_path: str, remote_path: str):
+        self.local_path = local_path
+        self.remote_path = remote_path
+        self.file = open(local_path, "rb")
+        # mmap 不支持空文件
+        if os.fstat(self.file.fileno()).st_size:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.data = b""
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+
+def distribute_files(bots: Iterable[AndroidBotBase], files: _Files, bandwidth: Optional[float] = None,
+                     device_bandwidth: Optional[float] = None, retries: int = 2, retry_interval: float = 1.0,
+                     max_workers: Optional[int] = None,
+                     progress: Callable[[AndroidBotBase, str, int, int], None] = None) -> List[DeviceReport]:
+    """
+    将一个或多个文件并发推送到多台设备
+
+    每个源文件只打开一次并映射到内存（mmap），所有设备的连接共享同一份映射分块发送；每台设备一个线程，按顺序推送全部文件。
+    推送失败（返回 False 或连接异常）的文件单独重试，不影响其他设备。
+
+    bots = [AndroidBotBase._build(port) for port in ports]
+    reports = distribute_files(bots, {"assets/bundle.zip": "Android/data/com.aibot.client/files/bundle.zip"},
+                               bandwidth=100 << 20, device_bandwidth=20 << 20)
+    failed = [report for report in reports if not report.ok]
+
+    :param bots: 已连接的设备
+    :param files: {本地路径: 手机端路径} 或 [(本地路径, 手机端路径), ...]
+    :param bandwidth: 所有设备合计的最大发送速度（字节/秒），None 表示不限速
+    :param device_bandwidth: 每台设备的最大发送速度（字节/秒），None 表示不限速
+    :param retries: 每个文件失败后的最大重试次数
+    :param retry_interval: 重试间隔（秒）
+    :param max_workers: 最大并发设备数，默认全部设备同时推送
+    :param progress: 进度回调，参数为 (设备, 手机端路径, 已发送字节数, 总字节数)
+    :return: 每台设备的分发结果，顺序与 bots 一致
+    """
+    bots = list(bots)
+    pairs = list(files.items()) if isinstance(files, dict) else list(files)
+    if not bots or not pairs:
+        return [DeviceReport(bot) for bot in bots]
+
+    # 令牌桶的容量为一个发送块，限速误差不超过一块
+    burst = BufferBody.chunk_size
+    shared = _TokenBucket(bandwidth, burst) if bandwidth else None
+
+    def push_all(bot: AndroidBotBase, sources: List[_Source]) -> DeviceReport:
+        report = DeviceReport(bot)
+        limiter = _TokenBucket(device_bandwidth, burst) if device_bandwidth else None
+        start = time.perf_counter()
+        for source in sources:
+            sent = 0
+
+            def throttle(done: int, total: int) -> None:
+                nonlocal sent
+                chunk, sent = done - sent, done
+                if limiter is not None:
+                    limiter.consume(chunk)
+                if shared is not None:
+                    shared.consume(chunk)
+                if progress is not None:
+                    progress(bot, source.remote_path, done, total)
+
+            for attempt in range(retries + 1):
+                if attempt:
+                    time.sleep(retry_interval)
+                report.attempts += 1
+                sent = 0
+                try:
+                    pushed = bot.push_buffer(source.data, source.remote_path, throttle)
+                except Exception as e:
+                    pushed = False
+                    report.errors.append(f"{source.remote_path}: {e}")
+                else:
+                    if not pushed:
+                        report.errors.append(f"{source.remote_path}: 推送失败")
+                if pushed:
+                    report.bytes += len(source.data)
+                    break
+            report.files[source.remote_path] = pushed
+            if not pushed:
+                logger.error(f"{bot.client_address} 推送 {source.local_path} 失败，已重试 {retries} 次")
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    with contextlib.ExitStack() as stack:
+        sources = []
+        for local_path, remote_path in pairs:
+            source = _Source(local_path, remote_path)
+            stack.callback(source.close)
+            sources.append(source)
+        with ThreadPoolExecutor(max_workers=max_workers or len(bots), thread_name_prefix="AiBotFleet") as executor:
+            return list(executor.map(lambda bot: push_all(bot, sources), bots))
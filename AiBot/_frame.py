@@ -0,0 +1,492 @@
+import io
+import time
+from typing import Optional, List, Tuple, Union, Callable, Any
+
+from ._utils import _Point_Tuple, _Region, _Algorithm, _SubColors, Point
+
+# 自适应阈值算法（5、6）的邻域大小与常数，与 OpenCV adaptiveThreshold 的常用参数一致
+_ADAPTIVE_BLOCK_SIZE = 11
+_ADAPTIVE_C = 2
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("本地图像处理需要安装 numpy：pip install AiBot.py[frame]") from None
+    return numpy
+
+
+def _try_import_cv2():
+    try:
+        import cv2
+    except ImportError:
+        return None
+    return cv2
+
+
+def decode_image(data: Union[bytes, bytearray, memoryview]):
+    """
+    将图片字节（png、jpg 等）解码为 RGB 格式的 numpy 数组，优先使用 opencv-python，其次使用 Pillow
+
+    :param data: 图片字节
+    :return: 形状为 (高, 宽, 3) 的 uint8 数组
+    """
+    np = _require_numpy()
+    cv2 = _try_import_cv2()
+    if cv2 is not None:
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("图片解码失败")
+        return np.ascontiguousarray(image[:, :, ::-1])
+
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("图片解码需要安装 opencv-python 或 Pillow：pip install AiBot.py[frame]") from None
+    with Image.open(io.BytesIO(data)) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def _parse_color(color: str) -> Tuple[int, int, int]:
+    color = color.lstrip("#")
+    return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16)
+
+
+def _color_tolerance(similarity: float) -> float:
+    return (1 - similarity) * 255
+
+
+def _to_gray(pixels):
+    np = _require_numpy()
+    if pixels.ndim == 2:
+        return pixels
+    # 与 OpenCV COLOR_RGB2GRAY 相同的加权系数
+    gray = pixels[..., 0] * 0.299 + pixels[..., 1] * 0.587 + pixels[..., 2] * 0.114
+    return np.rint(gray).astype(np.uint8)
+
+
+def _box_mean(gray, block_size: int):
+    np = _require_numpy()
+    radius = block_size // 2
+    padded = np.pad(gray.astype(np.float64), radius, mode="edge")
+    integral = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1))
+    integral[1:, 1:] = padded.cumsum(0).cumsum(1)
+    height, width = gray.shape
+    total = (integral[block_size:block_size + height, block_size:block_size + width]
+             - integral[:height, block_size:block_size + width]
+             - integral[block_size:block_size + height, :width]
+             + integral[:height, :width])
+    return total / (block_size * block_size)
+
+
+def _gaussian_mean(gray, block_size: int):
+    np = _require_numpy()
+    radius = block_size // 2
+    sigma = 0.3 * ((block_size - 1) * 0.5 - 1) + 0.8
+    kernel = np.exp(-(np.arange(-radius, radius + 1) ** 2) / (2 * sigma * sigma))
+    kernel /= kernel.sum()
+    padded = np.pad(gray.astype(np.float64), radius, mode="edge")
+    height, width = gray.shape
+    rows = sum(weight * padded[index:index + height, :] for index, weight in enumerate(kernel))
+    return sum(weight * rows[:, index:index + width] for index, weight in enumerate(kernel))
+
+
+def apply_algorithm(pixels, algorithm: _Algorithm):
+    """
+    按驱动的算法处理图像，算法说明见 AndroidBotBase.take_screenshot
+
+    :param pixels: RGB 或灰度图像数组
+    :param algorithm: ``algorithm = (algorithm_type, threshold, max_val)``
+    :return: 处理后的灰度图像数组
+    """
+    np = _require_numpy()
+    algorithm_type, threshold, max_val = algorithm
+    if algorithm_type in (5, 6):
+        threshold = 127
+        max_val = 255
+
+    gray = _to_gray(pixels)
+    if threshold == 255 and max_val == 255:
+        return gray
+
+    cv2 = _try_import_cv2()
+    if algorithm_type in (5, 6):
+        if cv2 is not None:
+            method = cv2.ADAPTIVE_THRESH_MEAN_C if algorithm_type == 5 else cv2.ADAPTIVE_THRESH_GAUSSIAN_C
+            return cv2.adaptiveThreshold(gray, max_val, method, cv2.THRESH_BINARY, _ADAPTIVE_BLOCK_SIZE, _ADAPTIVE_C)
+        if algorithm_type == 5:
+            mean = _box_mean(gray, _ADAPTIVE_BLOCK_SIZE)
+        else:
+            mean = _gaussian_mean(gray, _ADAPTIVE_BLOCK_SIZE)
+        return np.where(gray > np.rint(mean) - _ADAPTIVE_C, max_val, 0).astype(np.uint8)
+
+    above = gray > threshold
+    if algorithm_type == 0:
+        return np.where(above, max_val, 0).astype(np.uint8)
+    if algorithm_type == 1:
+        return np.where(above, 0, max_val).astype(np.uint8)
+    if algorithm_type == 2:
+        return np.where(above, gray, 0).astype(np.uint8)
+    if algorithm_type == 3:
+        return np.where(above, 0, gray).astype(np.uint8)
+    if algorithm_type == 4:
+        return np.where(above, threshold, gray).astype(np.uint8)
+    raise ValueError(f"不支持的算法类型: {algorithm_type}")
+
+
+def match_template(image, template):
+    """
+    归一化相关系数模板匹配（与 OpenCV TM_CCOEFF_NORMED 相同），多通道图像按通道合并计算
+
+    :param image: 图像数组
+    :param template: 模板数组，通道数与 image 相同
+    :return: 形状为 (H - h + 1, W - w + 1) 的相似度数组，取值 -1 到 1
+    """
+    np = _require_numpy()
+    cv2 = _try_import_cv2()
+    if cv2 is not None:
+        return cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+
+    if image.ndim == 2:
+        image = image[..., None]
+        template = template[..., None]
+    height, width = image.shape[:2]
+    t_height, t_width = template.shape[:2]
+    out_height, out_width = height - t_height + 1, width - t_width + 1
+    area = t_height * t_width
+
+    numerator = np.zeros((out_height, out_width))
+    window_var = np.zeros((out_height, out_width))
+    template_var = 0.0
+    for channel in range(image.shape[2]):
+        source = image[..., channel].astype(np.float64)
+        kernel = template[..., channel].astype(np.float64)
+        kernel -= kernel.mean()
+        template_var += float((kernel * kernel).sum())
+
+        # 循环卷积的有效区域不受回绕影响，FFT 尺寸取原图尺寸即可
+        spectrum = np.fft.rfft2(source) * np.fft.rfft2(kernel[::-1, ::-1], s=(height, width))
+        correlation = np.fft.irfft2(spectrum, s=(height, width))
+        numerator += correlation[t_height - 1:, t_width - 1:]
+
+        integral = np.zeros((height + 1, width + 1))
+        integral[1:, 1:] = source.cumsum(0).cumsum(1)
+        integral_sq = np.zeros((height + 1, width + 1))
+        integral_sq[1:, 1:] = (source * source).cumsum(0).cumsum(1)
+        sums = (integral[t_height:, t_width:] - integral[:out_height, t_width:]
+                - integral[t_height:, :out_width] + integral[:out_height, :out_width])
+        sums_sq = (integral_sq[t_height:, t_width:] - integral_sq[:out_height, t_width:]
+                   - integral_sq[t_height:, :out_width] + integral_sq[:out_height, :out_width])
+        window_var += np.maximum(sums_sq - sums * sums / area, 0)
+
+    denominator = np.sqrt(window_var * template_var)
+    scores = np.zeros((out_height, out_width))
+    valid = denominator > 1e-6 * area
+    scores[valid] = numerator[valid] / denominator[valid]
+    return np.clip(scores, -1, 1)
+
+
+class Frame:
+    """
+    本地图像帧，由 capture 截图得到，在本地完成取色、找色、找图，不再与驱动通信
+
+    方法的坐标参数与返回值均为屏幕坐标，与 AndroidBotBase 对应方法一致；
+    截图区域的起点与缩放率会自动换算为图像像素坐标。
+
+    依赖 numpy 与 opencv-python（未安装 opencv-python 时使用 Pillow 解码、numpy 实现找图，速度较慢），
+    可通过 ``pip install AiBot.py[frame]`` 一并安装。
+
+    :param pixels: RGB 图像数组，形状为 (高, 宽, 3)
+    :param region: 截图区域，默认全屏
+    :param scale: 截图缩放率
+    :param driver: 坐标关联的驱动
+    """
+
+    def __init__(self, pixels, region: _Region = None, scale: float = 1.0, driver=None):
+        self.pixels = pixels
+        self.region = tuple(region) if region else (0, 0, 0, 0)
+        self.scale = scale
+        self.driver = driver
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray], region: _Region = None, scale: float = 1.0,
+                   driver=None) -> "Frame":
+        """
+        从图片字节（png、jpg 等）创建图像帧
+
+        :param data: 图片字节
+        :param region: 截图区域，默认全屏
+        :param scale: 截图缩放率
+        :param driver: 坐标关联的驱动
+        :return:
+        """
+        return cls(decode_image(data), region, scale, driver)
+
+    @classmethod
+    def from_file(cls, path: str, region: _Region = None, scale: float = 1.0, driver=None) -> "Frame":
+        """
+        从本地图片文件创建图像帧
+
+        :param path: 图片路径
+        :param region: 截图区域，默认全屏
+        :param scale: 截图缩放率
+        :param driver: 坐标关联的驱动
+        :return:
+        """
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read(), region, scale, driver)
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    def __repr__(self):
+        return f"Frame(width={self.width}, height={self.height}, region={self.region}, scale={self.scale})"
+
+    def _to_pixel(self, x: float, y: float) -> Tuple[int, int]:
+        return int(round((x - self.region[0]) * self.scale)), int(round((y - self.region[1]) * self.scale))
+
+    def _to_point(self, x: float, y: float) -> Point:
+        return Point(x=float(self.region[0] + x / self.scale), y=float(self.region[1] + y / self.scale),
+                     driver=self.driver)
+
+    def _pixel_region(self, region: _Region) -> Tuple[int, int, int, int]:
+        if not region or not any(region):
+            return 0, 0, self.width, self.height
+        left, top = self._to_pixel(region[0], region[1])
+        right, bottom = self._to_pixel(region[2], region[3])
+        return max(left, 0), max(top, 0), min(right, self.width), min(bottom, self.height)
+
+    def _sub_offsets(self, sub_colors: _SubColors):
+        return [(int(round(offset_x * self.scale)), int(round(offset_y * self.scale)), _parse_color(color))
+                for offset_x, offset_y, color in sub_colors or ()]
+
+    def threshold(self, algorithm: _Algorithm) -> "Frame":
+        """
+        按驱动的算法处理图像，返回新的灰度图像帧，算法说明见 AndroidBotBase.take_screenshot
+
+        :param algorithm: ``algorithm = (algorithm_type, threshold, max_val)``
+        :return:
+        """
+        return Frame(apply_algorithm(self.pixels, algorithm), self.region, self.scale, self.driver)
+
+    # #############
+    #   色值相关   #
+    # #############
+    def get_color(self, point: _Point_Tuple) -> Optional[str]:
+        """
+        获取指定坐标点的色值
+
+        :param point: 坐标点
+        :return: 色值字符串(例如: #008577)，坐标超出图像范围时返回 None
+        """
+        x, y = self._to_pixel(point[0], point[1])
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        pixel = self.pixels[y, x]
+        if self.pixels.ndim == 2:
+            return f"#{int(pixel):02X}{int(pixel):02X}{int(pixel):02X}"
+        return f"#{int(pixel[0]):02X}{int(pixel[1]):02X}{int(pixel[2]):02X}"
+
+    def _match_pixels(self, ys, xs, rgb: Tuple[int, int, int], tolerance: float):
+        np = _require_numpy()
+        pixels = self.pixels[ys, xs].astype(np.int16)
+        if pixels.ndim == 1:
+            pixels = pixels[:, None]
+        return np.all(np.abs(pixels - np.array(rgb, np.int16)) <= tolerance, axis=-1)
+
+    def _match_sub_colors(self, ys, xs, sub_offsets, tolerance: float):
+        """
+        在候选坐标中筛选出所有辅助颜色都匹配的坐标
+        """
+        np = _require_numpy()
+        for offset_x, offset_y, rgb in sub_offsets:
+            sub_ys = ys + offset_y
+            sub_xs = xs + offset_x
+            inside = (sub_ys >= 0) & (sub_ys < self.height) & (sub_xs >= 0) & (sub_xs < self.width)
+            ys, xs, sub_ys, sub_xs = ys[inside], xs[inside], sub_ys[inside], sub_xs[inside]
+            matched = self._match_pixels(sub_ys, sub_xs, rgb, tolerance)
+            ys, xs = ys[matched], xs[matched]
+            if not len(ys):
+                break
+        return np.asarray(ys), np.asarray(xs)
+
+    def find_colors(self, color: str, sub_colors: _SubColors = None, region: _Region = None,
+                    similarity: float = 0.9) -> List[Point]:
+        """
+        获取所有匹配指定色值的坐标点，按从上到下、从左到右排序
+
+        每个通道的色差不超过 (1 - similarity) * 255 时视为匹配。
+
+        :param color: 颜色字符串，必须以 # 开头，例如：#008577；
+        :param sub_colors: 辅助定位的其他颜色；
+        :param region: 查找区域，默认整个图像，``region = (起点x、起点y、终点x、终点y)``，得到一个矩形
+        :param similarity: 相似度，0-1 的浮点数，默认 0.9；
+        :return: 坐标列表
+        """
+        np = _require_numpy()
+        tolerance = _color_tolerance(similarity)
+        left, top, right, bottom = self._pixel_region(region)
+        area = self.pixels[top:bottom, left:right].astype(np.int16)
+        if area.ndim == 2:
+            area = area[..., None]
+        mask = np.all(np.abs(area - np.array(_parse_color(color), np.int16)) <= tolerance, axis=-1)
+        ys, xs = np.nonzero(mask)
+        ys, xs = self._match_sub_colors(ys + top, xs + left, self._sub_offsets(sub_colors), tolerance)
+        return [self._to_point(x, y) for y, x in zip(ys.tolist(), xs.tolist())]
+
+    def find_color(self, color: str, sub_colors: _SubColors = None, region: _Region = None,
+                   similarity: float = 0.9) -> Optional[Point]:
+        """
+        获取指定色值的坐标点，返回第一个匹配的坐标（从上到下、从左到右）或者 None
+
+        :param color: 颜色字符串，必须以 # 开头，例如：#008577；
+        :param sub_colors: 辅助定位的其他颜色；
+        :param region: 查找区域，默认整个图像，``region = (起点x、起点y、终点x、终点y)``，得到一个矩形
+        :param similarity: 相似度，0-1 的浮点数，默认 0.9；
+        :return: 坐标或者 None
+        """
+        points = self.find_colors(color, sub_colors, region, similarity)
+        if not points:
+            return None
+        return points[0]
+
+    def compare_colors(self, main_point: _Point_Tuple, color: str, sub_colors: _SubColors = None,
+                       similarity: float = 0.9) -> bool:
+        """
+        比较指定坐标点及其辅助坐标点的颜色
+
+        :param main_point: 主颜色所在的坐标；
+        :param color: 颜色字符串，必须以 # 开头，例如：#008577；
+        :param sub_colors: 辅助定位的其他颜色；
+        :param similarity: 相似度，0-1 的浮点数，默认 0.9；
+        :return: True或者 False
+        """
+        np = _require_numpy()
+        x, y = self._to_pixel(main_point[0], main_point[1])
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        tolerance = _color_tolerance(similarity)
+        ys, xs = np.array([y]), np.array([x])
+        if not self._match_pixels(ys, xs, _parse_color(color), tolerance)[0]:
+            return False
+        ys, _ = self._match_sub_colors(ys, xs, self._sub_offsets(sub_colors), tolerance)
+        return bool(len(ys))
+
+    # #############
+    #   找图相关   #
+    # #############
+    def _template_pixels(self, template):
+        np = _require_numpy()
+        if isinstance(template, Frame):
+            return template.pixels
+        if isinstance(template, str):
+            with open(template, "rb") as file:
+                return decode_image(file.read())
+        if isinstance(template, (bytes, bytearray, memoryview)):
+            return decode_image(template)
+        return np.asarray(template)
+
+    def find_images(self, template, region: _Region = None, algorithm: _Algorithm = None,
+                    similarity: float = 0.9, multi: int = 1) -> List[Point]:
+        """
+        在图像中寻找模板图片，返回匹配区域左上角的坐标列表，按相似度从高到低排序
+
+        :param template: 模板图片，可以是本地图片路径、图片字节、numpy 数组或 Frame；
+        :param region: 查找区域，默认整个图像，``region = (起点x、起点y、终点x、终点y)``，得到一个矩形
+        :param algorithm: 处理图像所用的算法，默认原图，说明见 AndroidBotBase.find_images，
+            与驱动一致，只处理当前图像，模板应该是用相同算法处理过的图片；
+        :param similarity: 相似度，0-1 的浮点数，默认 0.9；
+        :param multi: 目标数量，默认为 1；
+        :return: 坐标列表
+        """
+        np = _require_numpy()
+        template = self._template_pixels(template)
+        left, top, right, bottom = self._pixel_region(region)
+        image = self.pixels[top:bottom, left:right]
+        if algorithm:
+            image = apply_algorithm(image, algorithm)
+        if image.ndim == 2:
+            template = _to_gray(template)
+        elif template.ndim == 2:
+            template = np.repeat(template[..., None], 3, axis=2)
+
+        t_height, t_width = template.shape[:2]
+        if t_height > image.shape[0] or t_width > image.shape[1]:
+            return []
+
+        scores = match_template(np.ascontiguousarray(image), np.ascontiguousarray(template))
+        points = []
+        while len(points) < multi:
+            index = int(np.argmax(scores))
+            y, x = divmod(index, scores.shape[1])
+            if scores[y, x] < similarity:
+                break
+            points.append(self._to_point(x + left, y + top))
+            # 抑制已命中区域，避免同一目标重复返回
+            scores[max(y - t_height + 1, 0):y + t_height, max(x - t_width + 1, 0):x + t_width] = -1
+        return points
+
+    def find_image(self, template, region: _Region = None, algorithm: _Algorithm = None,
+                   similarity: float = 0.9) -> Optional[Point]:
+        """
+        在图像中寻找模板图片，返回匹配区域左上角的坐标或者 None
+
+        :param template: 模板图片，可以是本地图片路径、图片字节、numpy 数组或 Frame；
+        :param region: 查找区域，默认整个图像，``region = (起点x、起点y、终点x、终点y)``，得到一个矩形
+        :param algorithm: 处理图像所用的算法，默认原图，说明见 AndroidBotBase.find_images；
+        :param similarity: 相似度，0-1 的浮点数，默认 0.9；
+        :return: 坐标或者 None
+        """
+        points = self.find_images(template, region, algorithm, similarity, 1)
+        if not points:
+            return None
+        return points[0]
+
+
+class FrozenFrame:
+    """
+    短时冻结的截图帧，由 bot.frozen_frame() 创建
+
+    首次使用时截图，之后在 ttl 秒内复用同一帧；过期或被输入命令作废后，下次使用时重新截图。
+
+    :param ttl: 帧的有效时长（秒）
+    :param capture: 截图函数，返回 Frame 或者 None
+    :param key: 帧对应的截图参数（例如 Windows 的窗口句柄与操作模式），参数不同的查询不使用该帧
+    """
+    __slots__ = ("ttl", "key", "captures", "_capture", "_frame", "_expires_at")
+
+    def __init__(self, ttl: float, capture: Callable[[], Optional[Frame]], key: Any = None):
+        self.ttl = ttl
+        self.key = key
+        # 截图次数
+        self.captures = 0
+        self._capture = capture
+        self._frame: Optional[Frame] = None
+        self._expires_at = 0.0
+
+    def get(self) -> Optional[Frame]:
+        """
+        获取当前帧，过期或已作废时重新截图
+
+        :return: Frame，截图失败时为 None
+        """
+        if time.monotonic() >= self._expires_at:
+            self._frame = self._capture()
+            self.captures += 1
+            self._expires_at = time.monotonic() + self.ttl
+        return self._frame
+
+    def invalidate(self) -> None:
+        """
+        作废当前帧
+
+        :return:
+        """
+        self._frame = None
+        self._expires_at = 0.0
@@ -0,0 +1,184 @@
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional
+
+# 往返时间直方图的桶上界（秒）：100us 起按 2^(1/4) 递增到约 104s，分位数误差约 10%
+_RTT_BOUNDS: List[float] = [1e-4 * 2 ** (i / 4) for i in range(81)]
+# Prometheus 导出只使用 2 的整数次幂对应的桶，减少输出行数
+_EXPORT_BOUNDS = range(0, len(_RTT_BOUNDS), 4)
+
+
+class _CommandStats:
+    __slots__ = ("count", "errors", "bytes_sent", "bytes_received", "lock_wait", "rtt_sum", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.lock_wait = 0.0
+        self.rtt_sum = 0.0
+        # 最后一个桶存放超出上界的样本
+        self.buckets = [0] * (len(_RTT_BOUNDS) + 1)
+
+    def percentile(self, q: float) -> float:
+        samples = self.count
+        if samples == 0:
+            return 0.0
+        rank = q * samples
+        cumulative = 0
+        for index, bucket in enumerate(self.buckets):
+            if bucket == 0:
+                continue
+            if cumulative + bucket >= rank:
+                if index >= len(_RTT_BOUNDS):
+                    return _RTT_BOUNDS[-1]
+                # 在桶内线性插值
+                lower = _RTT_BOUNDS[index - 1] if index else 0.0
+                upper = _RTT_BOUNDS[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket
+            cumulative += bucket
+        return _RTT_BOUNDS[-1]
+
+
+class Metrics:
+    """
+    单个驱动连接的命令统计
+
+    按命令名记录调用次数、错误次数、发送/接收字节数、等待连接锁的时间与往返时间直方图。
+    记录一次调用只需一次二分查找与几次加法，可在生产环境中常开。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._commands: Dict[str, _CommandStats] = {}
+
+    def _stats(self, command: str) -> _CommandStats:
+        stats = self._commands.get(command)
+        if stats is None:
+            stats = self._commands.setdefault(command, _CommandStats())
+        return stats
+
+    def record(self, command: str, bytes_sent: int, bytes_received: int, lock_wait: float, rtt: float) -> None:
+        """
+        记录一次成功的调用
+
+        :param command: 命令名
+        :param bytes_sent: 发送字节数
+        :param bytes_received: 接收字节数
+        :param lock_wait: 等待连接锁的时间（秒）
+        :param rtt: 往返时间（秒）
+        :return:
+        """
+        index = bisect.bisect_left(_RTT_BOUNDS, rtt)
+        with self._lock:
+            stats = self._stats(command)
+            stats.count += 1
+            stats.bytes_sent += bytes_sent
+            stats.bytes_received += bytes_received
+            stats.lock_wait += lock_wait
+            stats.rtt_sum += rtt
+            stats.buckets[index] += 1
+
+    def record_error(self, command: str) -> None:
+        """
+        记录一次失败的调用
+
+        :param command: 命令名
+        :return:
+        """
+        with self._lock:
+            self._stats(command).errors += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        获取统计快照，时间单位为秒
+
+        :return: {命令名: {"count", "errors", "bytes_sent", "bytes_received", "lock_wait", "rtt_avg", "rtt_p50", "rtt_p95", "rtt_p99"}}
+        """
+        with self._lock:
+            return {
+                command: {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "bytes_sent": stats.bytes_sent,
+                    "bytes_received": stats.bytes_received,
+                    "lock_wait": stats.lock_wait,
+                    "rtt_avg": stats.rtt_sum / stats.count if stats.count else 0.0,
+                    "rtt_p50": stats.percentile(0.50),
+                    "rtt_p95": stats.percentile(0.95),
+                    "rtt_p99": stats.percentile(0.99),
+                }
+                for command, stats in self._commands.items()
+            }
+
+    def reset(self) -> None:
+        """
+        清空统计
+
+        :return:
+        """
+        with self._lock:
+            self._commands.clear()
+
+    def _prometheus_samples(self, labels: str) -> Dict[str, List[str]]:
+        samples: Dict[str, List[str]] = {name: [] for name, _, _ in _PROMETHEUS_FAMILIES}
+        with self._lock:
+            for command, stats in self._commands.items():
+                label = f'{labels}command="{command}"'
+                samples["aibot_commands_total"].append(f"aibot_commands_total{{{label}}} {stats.count}")
+                samples["aibot_command_errors_total"].append(f"aibot_command_errors_total{{{label}}} {stats.errors}")
+                samples["aibot_command_sent_bytes_total"].append(
+                    f"aibot_command_sent_bytes_total{{{label}}} {stats.bytes_sent}")
+                samples["aibot_command_received_bytes_total"].append(
+                    f"aibot_command_received_bytes_total{{{label}}} {stats.bytes_received}")
+                samples["aibot_command_lock_wait_seconds_total"].append(
+                    f"aibot_command_lock_wait_seconds_total{{{label}}} {stats.lock_wait}")
+
+                histogram = samples["aibot_command_rtt_seconds"]
+                cumulative = 0
+                exported = 0
+                for index in _EXPORT_BOUNDS:
+                    cumulative += sum(stats.buckets[exported:index + 1])
+                    exported = index + 1
+                    histogram.append(f'aibot_command_rtt_seconds_bucket{{{label},le="{_RTT_BOUNDS[index]:.6g}"}} '
+                                     f'{cumulative}')
+                histogram.append(f'aibot_command_rtt_seconds_bucket{{{label},le="+Inf"}} {stats.count}')
+                histogram.append(f"aibot_command_rtt_seconds_sum{{{label}}} {stats.rtt_sum}")
+                histogram.append(f"aibot_command_rtt_seconds_count{{{label}}} {stats.count}")
+        return samples
+
+
+_PROMETHEUS_FAMILIES = (
+    ("aibot_commands_total", "counter", "Number of successful driver commands."),
+    ("aibot_command_errors_total", "counter", "Number of failed driver commands."),
+    ("aibot_command_sent_bytes_total", "counter", "Bytes sent to the driver."),
+    ("aibot_command_received_bytes_total", "counter", "Bytes received from the driver."),
+    ("aibot_command_lock_wait_seconds_total", "counter", "Time spent waiting for the connection lock."),
+    ("aibot_command_rtt_seconds", "histogram", "Command round-trip time."),
+)
+
+
+def prometheus_text(bots: Iterable) -> str:
+    """
+    将多个驱动连接的统计导出为 Prometheus 文本格式，每个连接以 device="ip:port" 标签区分
+
+    :param bots: AndroidBotBase/WinBotBase/WebBotBase 实例列表
+    :return:
+    """
+    merged: Dict[str, List[str]] = {name: [] for name, _, _ in _PROMETHEUS_FAMILIES}
+    for bot in bots:
+        metrics: Optional[Metrics] = getattr(bot, "_metrics", None)
+        if metrics is None:
+            continue
+        address = getattr(bot, "client_address", None)
+        device = f"{address[0]}:{address[1]}" if address else ""
+        for name, lines in metrics._prometheus_samples(f'device="{device}",').items():
+            merged[name].extend(lines)
+
+    output = []
+    for name, metric_type, description in _PROMETHEUS_FAMILIES:
+        output.append(f"# HELP {name} {description}")
+        output.append(f"# TYPE {name} {metric_type}")
+        output.extend(merged[name])
+    return "\n".join(output) + "\n"
@@ -1,8 +1,10 @@
+import multiprocessing
 import os
 import signal
+import socket
 import threading
 from multiprocessing.context import SpawnProcess
-from typing import Callable
+from typing import Callable, Optional
 
 import click
 
@@ -78,3 +80,46 @@ def multiprocess(workers_num: int, create_process: Callable[[], SpawnProcess]) -
             click.style(str(os.getpid()), fg="cyan", bold=True)
         )
     )
+
+
+def _serve_worker(handler_cls, socket_address, listen_socket: Optional[socket.socket]) -> None:
+    from AiBot._utils import _create_server
+
+    if listen_socket is None:
+        server = _create_server(socket_address, handler_cls, reuse_port=True)
+    else:
+        server = _create_server(socket_address, handler_cls, listen_socket=listen_socket)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def serve_workers(handler_cls, socket_address, workers_num: int) -> None:
+    """
+    启动 workers_num 个 spawn 子进程运行 Socket 服务，由 multiprocess 负责监控和重启
+
+    支持 SO_REUSEPORT 的平台上，每个子进程各自绑定同一端口，由内核将连接分配到各个进程；
+    否则由父进程创建监听 socket，子进程继承该 socket 共同 accept。
+
+    :param handler_cls: 脚本类，需要能在子进程中导入
+    :param socket_address: 监听地址
+    :param workers_num: 子进程数
+    :return:
+    """
+    from AiBot._utils import _create_server
+
+    context = multiprocessing.get_context("spawn")
+    listen_socket = None
+    if not hasattr(socket, "SO_REUSEPORT") or os.name == "nt":
+        server = _create_server(socket_address, handler_cls)
+        listen_socket = server.socket
+
+    def create_process() -> SpawnProcess:
+        return context.Process(target=_serve_worker, args=(handler_cls, socket_address, listen_socket))
+
+    try:
+        multiprocess(workers_num, create_process)
+    finally:
+        if listen_socket is not None:
+            listen_socket.close()
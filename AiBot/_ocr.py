@@ -0,0 +1,501 @@
+import re
+import threading
+from ast import literal_eval
+from collections import OrderedDict, deque
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+from ._utils import _Point_Tuple, _Region, Point, _ocr_point, _ocr_text_points
+
+_Box = Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float], Tuple[float, float]]
+
+_NUMBER = r"\s*(-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)\s*"
+_POINT = r"\[" + _NUMBER + "," + _NUMBER + r"\]"
+# 一行识别结果：[[[x, y], [x, y], [x, y], [x, y]], ('文本', 置信度)]
+_LINE = re.compile(r"\[\s*\[\s*" + r"\s*,\s*".join([_POINT] * 4) + r"\s*\]\s*,\s*\(\s*"
+                   r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")\s*,""" + _NUMBER + r"\)\s*\]", re.S)
+# 各行之间只允许出现的字符
+_SEPARATORS = " ,[]\r\n\t"
+
+
+class OcrLine:
+    """
+    一行 OCR 识别结果
+
+    - box：文本区域四个顶点 ((x, y), ...)，依次为左上、右上、右下、左下
+    - text：识别的文字
+    - score：置信度
+    - center：文本区域中心 (x, y)
+    """
+    __slots__ = ("box", "text", "score", "center")
+
+    def __init__(self, box: _Box, text: str, score: float):
+        self.box = box
+        self.text = text
+        self.score = score
+        (left, top), _, (right, bottom), _ = box
+        self.center = ((left + right) / 2, (top + bottom) / 2)
+
+    def __repr__(self):
+        return f"OcrLine(text={self.text!r}, score={self.score:.3f}, box={self.box})"
+
+
+def _from_literal(text: str) -> List[OcrLine]:
+    return [OcrLine(tuple((float(x), float(y)) for x, y in box), str(words), float(score))
+            for box, (words, score) in literal_eval(text)]
+
+
+def parse_ocr(text: str) -> List[OcrLine]:
+    """
+    解析驱动 OCR 接口返回的 ``[[[[x, y], ...], ('文本', 置信度)], ...]`` 文本
+
+    使用正则表达式逐行提取坐标、文字与置信度，不构建语法树；文字只有包含转义字符时才单独求值。
+    遇到无法识别的格式时回退到 ast.literal_eval。
+
+    :param text: 响应文本
+    :return: 识别结果列表
+    """
+    lines = []
+    position = 0
+    for match in _LINE.finditer(text):
+        if text[position:match.start()].strip(_SEPARATORS):
+            return _from_literal(text)
+        position = match.end()
+
+        groups = match.groups()
+        words = groups[8]
+        words = literal_eval(words) if "\\" in words else words[1:-1]
+        box = ((float(groups[0]), float(groups[1])), (float(groups[2]), float(groups[3])),
+               (float(groups[4]), float(groups[5])), (float(groups[6]), float(groups[7])))
+        lines.append(OcrLine(box, words, float(groups[9])))
+
+    if text[position:].strip(_SEPARATORS):
+        return _from_literal(text)
+    return lines
+
+
+class OcrCache:
+    """
+    OCR 识别结果的 LRU 缓存
+
+    键由识别区域、算法、缩放率与图像内容摘要（截图字节的摘要，或图片文件的修改时间与大小）组成，
+    内容不变时直接返回上次的识别结果，不再发送 OCR 命令；超过 max_entries 时淘汰最久未使用的结果。
+    键只与图像内容有关，多个连接可以共享同一个缓存。
+
+    class CustomAndroidScript(AndroidBotMain):
+        ocr_cache = OcrCache(64)
+
+    :param max_entries: 最多缓存的识别结果数
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, List[OcrLine]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"OcrCache(entries={len(self._entries)}, hits={self.hits}, misses={self.misses})"
+
+    def get(self, key: Hashable) -> Optional[List[OcrLine]]:
+        """
+        获取缓存的识别结果，并记录命中/未命中次数
+
+        :param key: 缓存键
+        :return: 识别结果，未命中时返回 None
+        """
+        with self._lock:
+            lines = self._entries.get(key)
+            if lines is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return lines
+
+    def put(self, key: Hashable, lines: List[OcrLine]) -> None:
+        """
+        保存识别结果
+
+        :param key: 缓存键
+        :param lines: 识别结果
+        :return:
+        """
+        with self._lock:
+            self._entries[key] = lines
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        清空缓存与统计，例如重新初始化 OCR 服务后
+
+        :return:
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        获取缓存统计
+
+        :return: {"entries": 缓存数, "hits": 命中次数, "misses": 未命中次数, "evictions": 淘汰次数, "hit_rate": 命中率}
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "hit_rate": self.hits / total if total else 0.0}
+
+
+def _fuzzy_find(pattern: str, text: str, max_distance: int) -> Optional[Tuple[int, int]]:
+    """
+    在 text 中查找与 pattern 编辑距离最小（不超过 max_distance）的子串，距离相同时取结束位置最靠前的
+
+    :return: (起始位置, 长度)，没有找到时返回 None
+    """
+    size = len(pattern)
+    # 第 i 项为 pattern[:i] 匹配到当前位置结束的子串的最小编辑距离与该子串的起始位置
+    costs, starts = list(range(size + 1)), [0] * (size + 1)
+    best = (costs[size], 0, 0) if costs[size] <= max_distance else None
+    for end, char in enumerate(text, 1):
+        row_costs, row_starts = [0] * (size + 1), [end] * (size + 1)
+        for i in range(1, size + 1):
+            cost, start = costs[i - 1] + (pattern[i - 1] != char), starts[i - 1]
+            if costs[i] + 1 < cost:
+                cost, start = costs[i] + 1, starts[i]
+            if row_costs[i - 1] + 1 < cost:
+                cost, start = row_costs[i - 1] + 1, row_starts[i - 1]
+            row_costs[i], row_starts[i] = cost, start
+        costs, starts = row_costs, row_starts
+        if costs[size] <= max_distance and (best is None or costs[size] < best[0]):
+            best = (costs[size], starts[size], end)
+            if not best[0]:
+                break
+    if best is None:
+        return None
+    return best[1], best[2] - best[1]
+
+
+class TextMatcher:
+    """
+    多目标文字匹配：用 Aho-Corasick 自动机一次扫描每行文字，同时查找所有目标
+
+    精确匹配时每个目标取每行中第一次出现的位置，与 find_text 一致；
+    max_distance 大于 0 时允许 OCR 识别误差：把每个目标分成 max_distance + 1 段放入自动机，
+    编辑距离不超过 max_distance 的匹配至少包含其中一段，只对命中分段的行计算编辑距离；
+    长度不超过 max_distance 的目标与任意文字都能匹配。
+
+    :param texts: 要查找的文字
+    :param max_distance: 允许的最大编辑距离（插入、删除、替换的字符数），0 表示精确匹配
+    """
+
+    def __init__(self, texts: Iterable[str], max_distance: int = 0):
+        self.texts = list(dict.fromkeys(texts))
+        self.max_distance = max_distance
+        # 自动机的转移表、失败指针与每个状态匹配到的 (目标序号, 分段长度)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, int]]] = [[]]
+        # 任意文字都可能匹配的目标：空串，或长度不超过 max_distance 的目标
+        self._always: List[int] = []
+
+        for index, text in enumerate(self.texts):
+            if len(text) <= max_distance or not text:
+                self._always.append(index)
+                continue
+            pieces = max_distance + 1
+            bounds = [len(text) * piece // pieces for piece in range(pieces + 1)]
+            for begin, end in zip(bounds, bounds[1:]):
+                self._add(text[begin:end], index)
+        self._build()
+
+    def _add(self, piece: str, index: int) -> None:
+        state = 0
+        for char in piece:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append((index, len(piece)))
+
+    def _build(self) -> None:
+        goto, fail, output = self._goto, self._fail, self._output
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                link = fail[state]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                fail[next_state] = goto[link].get(char, 0) if state else 0
+                output[next_state] = output[next_state] + output[fail[next_state]]
+
+    def match(self, text: str) -> Dict[int, Tuple[int, int]]:
+        """
+        查找一行文字中出现的目标
+
+        :param text: 一行文字
+        :return: {目标序号: (起始位置, 长度)}
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found: Dict[int, Tuple[int, int]] = {}
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index, length in output[state]:
+                if index not in found:
+                    found[index] = (position + 1 - length, length)
+
+        if not self.max_distance:
+            for index in self._always:
+                found[index] = (0, 0)
+            return found
+
+        # 命中分段只说明可能匹配，重新计算整个目标的编辑距离
+        matched = {}
+        for index in list(found) + self._always:
+            result = _fuzzy_find(self.texts[index], text, self.max_distance)
+            if result is not None:
+                matched[index] = result
+        return matched
+
+    def points(self, lines: List[OcrLine], region: _Region, scale: float = 1.0,
+               driver=None) -> Dict[str, List[Point]]:
+        """
+        在 OCR 识别结果中查找所有目标，坐标计算与 find_text 相同
+
+        :param lines: OCR 识别结果
+        :param region: 识别区域
+        :param scale: 识别时的图片缩放率
+        :param driver: 坐标关联的驱动
+        :return: {目标文字: 坐标列表}，未找到的目标对应空列表
+        """
+        result: Dict[str, List[Point]] = {text: [] for text in self.texts}
+        for line in lines:
+            for index, (position, length) in self.match(line.text).items():
+                result[self.texts[index]].append(_ocr_point(line, position, length, region, scale, driver))
+        return result
+
+
+class OcrPage:
+    """
+    一次 OCR 识别结果的空间索引，之后的区域、最近邻与方位查询都在本地完成，不再与驱动通信
+
+    文本行的坐标换算为屏幕坐标（与 find_text 返回的坐标一致），按外接矩形放入边长为 cell_size 的网格中，
+    查询时只检查相关网格内的文本行。
+
+    page = bot.ocr_page()
+    gold = page.right_of("金币:")
+    panel = page.in_region((100, 200, 600, 900))
+    bot.click(page.point(page.nearest((540, 960))))
+
+    :param lines: OCR 识别结果
+    :param region: 识别区域
+    :param scale: 识别时的图片缩放率
+    :param driver: 坐标关联的驱动
+    """
+    # 网格边长（像素）
+    cell_size = 64
+
+    def __init__(self, lines: List[OcrLine], region: _Region = None, scale: float = 1.0, driver=None):
+        left, top = (region[0], region[1]) if region else (0, 0)
+        if left or top or scale != 1.0:
+            lines = [OcrLine(tuple((left + x / scale, top + y / scale) for x, y in line.box), line.text, line.score)
+                     for line in lines]
+        self.lines = lines
+        self._driver = driver
+        # 每行的外接矩形 (left, top, right, bottom)
+        self._bounds: List[Tuple[float, float, float, float]] = []
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for index, line in enumerate(lines):
+            xs, ys = [x for x, _ in line.box], [y for _, y in line.box]
+            bounds = (min(xs), min(ys), max(xs), max(ys))
+            self._bounds.append(bounds)
+            min_x, min_y, max_x, max_y = self._cell_range(*bounds)
+            for cell_x in range(min_x, max_x + 1):
+                for cell_y in range(min_y, max_y + 1):
+                    self._cells.setdefault((cell_x, cell_y), []).append(index)
+
+        if self._cells:
+            self._extent = (min(cell[0] for cell in self._cells), min(cell[1] for cell in self._cells),
+                            max(cell[0] for cell in self._cells), max(cell[1] for cell in self._cells))
+        else:
+            self._extent = (0, 0, -1, -1)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def __repr__(self):
+        return f"OcrPage(lines={len(self.lines)})"
+
+    def _cell_range(self, left: float, top: float, right: float, bottom: float) -> Tuple[int, int, int, int]:
+        size = self.cell_size
+        return int(left // size), int(top // size), int(right // size), int(bottom // size)
+
+    def _search(self, left: float, top: float, right: float, bottom: float) -> List[int]:
+        """
+        返回外接矩形与给定矩形相交的文本行序号，按从上到下、从左到右排序
+        """
+        # 只遍历有文本行的网格范围
+        min_x, min_y, max_x, max_y = self._cell_range(left, top, right, bottom)
+        min_x, min_y = max(min_x, self._extent[0]), max(min_y, self._extent[1])
+        max_x, max_y = min(max_x, self._extent[2]), min(max_y, self._extent[3])
+        found = set()
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                found.update(self._cells.get((cell_x, cell_y), ()))
+        bounds = self._bounds
+        matched = [index for index in found
+                   if bounds[index][0] <= right and bounds[index][2] >= left
+                   and bounds[index][1] <= bottom and bounds[index][3] >= top]
+        return sorted(matched, key=lambda index: (bounds[index][1], bounds[index][0]))
+
+    def _anchor(self, anchor) -> Optional[int]:
+        if isinstance(anchor, OcrLine):
+            return next((index for index, line in enumerate(self.lines) if line is anchor), None)
+        return next((index for index, line in enumerate(self.lines) if anchor in line.text), None)
+
+    def texts(self) -> List[str]:
+        """
+        获取所有文字
+
+        :return:
+        """
+        return [line.text for line in self.lines]
+
+    def find(self, text: str) -> List[OcrLine]:
+        """
+        查找包含指定文字的文本行
+
+        :param text: 要查找的文字
+        :return: 文本行列表，按识别结果的顺序
+        """
+        return [line for line in self.lines if text in line.text]
+
+    def find_text(self, text: str) -> List[Point]:
+        """
+        查找文字所在的坐标，与 find_text 的返回值一致
+
+        :param text: 要查找的文字
+        :return: 坐标列表（坐标是文本区域中心位置）
+        """
+        return _ocr_text_points(self.lines, text, (0, 0), driver=self._driver)
+
+    def point(self, line: OcrLine) -> Point:
+        """
+        获取文本行中心的屏幕坐标
+
+        :param line: 文本行
+        :return:
+        """
+        return Point(x=float(line.center[0]), y=float(line.center[1]), driver=self._driver)
+
+    def in_region(self, region: _Region, contain: bool = True) -> List[OcrLine]:
+        """
+        获取区域内的文本行
+
+        :param region: 区域，``region = (起点x、起点y、终点x、终点y)``
+        :param contain: True 时只返回完全位于区域内的文本行，False 时返回与区域相交的文本行
+        :return: 文本行列表，按从上到下、从左到右排序
+        """
+        left, top, right, bottom = region
+        indexes = self._search(left, top, right, bottom)
+        if contain:
+            bounds = self._bounds
+            indexes = [index for index in indexes if bounds[index][0] >= left and bounds[index][1] >= top
+                       and bounds[index][2] <= right and bounds[index][3] <= bottom]
+        return [self.lines[index] for index in indexes]
+
+    def _distance(self, index: int, x: float, y: float) -> float:
+        left, top, right, bottom = self._bounds[index]
+        dx = max(left - x, 0, x - right)
+        dy = max(top - y, 0, y - bottom)
+        return (dx * dx + dy * dy) ** 0.5
+
+    def nearest(self, point: _Point_Tuple, max_distance: float = None) -> Optional[OcrLine]:
+        """
+        获取离坐标最近的文本行，距离为坐标到文本行外接矩形的距离（坐标在矩形内时为 0）
+
+        :param point: 坐标
+        :param max_distance: 最大距离，默认不限制
+        :return: 文本行或者 None
+        """
+        if not self.lines:
+            return None
+        x, y = point[0], point[1]
+        size = self.cell_size
+        cell_x, cell_y = int(x // size), int(y // size)
+        min_x, min_y, max_x, max_y = self._extent
+        max_ring = max(abs(cell_x - min_x), abs(cell_x - max_x), abs(cell_y - min_y), abs(cell_y - max_y))
+
+        best, best_distance = None, float("inf")
+        # 按环形向外扩展网格，只出现在第 ring 环及更外层网格中的文本行，距离至少为 (ring - 1) * cell_size
+        for ring in range(max_ring + 1):
+            bound = (ring - 1) * size
+            if best_distance <= bound or (max_distance is not None and bound > max_distance):
+                break
+            for ring_x in range(cell_x - ring, cell_x + ring + 1):
+                for ring_y in range(cell_y - ring, cell_y + ring + 1):
+                    if max(abs(ring_x - cell_x), abs(ring_y - cell_y)) != ring:
+                        continue
+                    for index in self._cells.get((ring_x, ring_y), ()):
+                        distance = self._distance(index, x, y)
+                        if distance < best_distance or (distance == best_distance and index < best):
+                            best, best_distance = index, distance
+
+        if best is None or (max_distance is not None and best_distance > max_distance):
+            return None
+        return self.lines[best]
+
+    def right_of(self, anchor: Union[str, OcrLine], max_distance: float = None) -> List[OcrLine]:
+        """
+        获取锚点右侧、与锚点处于同一行（纵向范围有重叠）的文本行
+
+        :param anchor: 锚点文本行，或者锚点文字（使用第一个包含该文字的文本行）
+        :param max_distance: 与锚点的最大水平间距，默认不限制
+        :return: 文本行列表，按与锚点的水平间距从近到远排序
+        """
+        index = self._anchor(anchor)
+        if index is None:
+            return []
+        left, top, right, bottom = self._bounds[index]
+        limit = right + max_distance if max_distance is not None else (self._extent[2] + 1) * self.cell_size
+        bounds = self._bounds
+        found = [other for other in self._search((left + right) / 2, top, limit, bottom)
+                 if other != index and bounds[other][0] >= (left + right) / 2 and bounds[other][0] <= limit]
+        return [self.lines[other] for other in sorted(found, key=lambda other: bounds[other][0])]
+
+    def below(self, anchor: Union[str, OcrLine], max_distance: float = None) -> List[OcrLine]:
+        """
+        获取锚点下方、与锚点处于同一列（横向范围有重叠）的文本行
+
+        :param anchor: 锚点文本行，或者锚点文字（使用第一个包含该文字的文本行）
+        :param max_distance: 与锚点的最大垂直间距，默认不限制
+        :return: 文本行列表，按与锚点的垂直间距从近到远排序
+        """
+        index = self._anchor(anchor)
+        if index is None:
+            return []
+        left, top, right, bottom = self._bounds[index]
+        limit = bottom + max_distance if max_distance is not None else (self._extent[3] + 1) * self.cell_size
+        bounds = self._bounds
+        found = [other for other in self._search(left, (top + bottom) / 2, right, limit)
+                 if other != index and bounds[other][1] >= (top + bottom) / 2 and bounds[other][1] <= limit]
+        return [self.lines[other] for other in sorted(found, key=lambda other: bounds[other][1])]
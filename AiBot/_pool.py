@@ -0,0 +1,259 @@
+import contextlib
+import json
+import select
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union, Iterator
+
+from loguru import logger
+
+from ._AndroidBase import AndroidBotBase
+from ._WebBase import WebBotBase
+from ._WinBase import WinBotBase
+
+_Driver = Union[AndroidBotBase, WinBotBase, WebBotBase]
+_Key = Tuple[str, int, str]
+
+
+def _build_driver(kind: str, port: int, params: dict) -> _Driver:
+    if kind == "android":
+        return AndroidBotBase._build(port)
+    if kind == "win":
+        return WinBotBase._build(port, params.get("local", True))
+    if kind == "web":
+        return WebBotBase._build(port, params.get("local", True), params.get("driver_params"))
+    raise ValueError(f"未知的驱动类型：{kind}")
+
+
+class _PooledDriver:
+    __slots__ = ("key", "driver", "leases", "last_used", "retired")
+
+    def __init__(self, key: _Key, driver: _Driver):
+        self.key = key
+        self.driver = driver
+        self.leases = 0
+        self.last_used = time.monotonic()
+        self.retired = False
+
+
+class DriverPool:
+    """
+    驱动连接池，按 (kind, port, params) 缓存 Android/Win/Web 驱动连接
+
+    每个 key 最多保持 pool_size 个连接，连接在多个脚本会话间复用；pool_size 默认为 1，与旧版本的全局驱动一致，
+    所有会话共用同一个连接，并发会话较多时需调大 pool_size（本地部署时每个连接启动一个驱动进程）。
+    共用借用（shared=True）Android 驱动或远程部署（local=False）的 win/web 驱动时无法主动启动新的驱动，
+    始终共用一个连接，不受 pool_size 影响。
+    归还的连接空闲超过 idle_timeout 秒后关闭，借出空闲连接前检查连接是否已断开。
+    """
+
+    pool_size = 1  # 每个 key 的最大连接数
+    idle_timeout = 300  # seconds，空闲连接的最长保留时间
+
+    def __init__(self, pool_size: Optional[int] = None, idle_timeout: Optional[float] = None):
+        if pool_size is not None:
+            self.pool_size = pool_size
+        if idle_timeout is not None:
+            self.idle_timeout = idle_timeout
+        self._cond = threading.Condition()
+        self._entries: Dict[_Key, List[_PooledDriver]] = {}
+        self._creating: Dict[_Key, int] = {}
+        self._by_driver: Dict[int, _PooledDriver] = {}
+
+    @staticmethod
+    def _make_key(kind: str, port: int, params: Optional[dict]) -> _Key:
+        if port < 0 or port > 65535:
+            raise OSError("`listen_port` must be in 0-65535.")
+        return kind, port, json.dumps(params or {}, sort_keys=True, default=str)
+
+    def _max_connections(self, kind: str, params: Optional[dict], shared: bool) -> int:
+        # 共用借用时只有能启动新驱动进程（本地部署的 win/web）才建立多个连接，
+        # 否则新连接要等待远程驱动连入，可能一直阻塞，应共用已有连接
+        if shared and not (kind in ("win", "web") and (params or {}).get("local", True)):
+            return 1
+        return self.pool_size
+
+    @staticmethod
+    def _is_healthy(entry: _PooledDriver) -> bool:
+        # 空闲连接上不应有未读取的数据；可读且读到 EOF 表示对端已断开
+        driver = entry.driver
+        if driver._pipeline is not None or driver._reader._pending:
+            return False
+        try:
+            readable, _, _ = select.select([driver.request], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+    def _close(self, entry: _PooledDriver) -> None:
+        self._by_driver.pop(id(entry.driver), None)
+        entries = self._entries.get(entry.key)
+        if entries is not None and entry in entries:
+            entries.remove(entry)
+            if not entries:
+                del self._entries[entry.key]
+        try:
+            entry.driver.request.close()
+        except OSError:
+            pass
+
+    def _evict_idle(self) -> None:
+        now = time.monotonic()
+        for entries in list(self._entries.values()):
+            for entry in list(entries):
+                if entry.leases == 0 and now - entry.last_used > self.idle_timeout:
+                    logger.debug(f"关闭空闲驱动连接：{entry.key}")
+                    self._close(entry)
+
+    def checkout(self, kind: str, port: int, params: Optional[dict] = None, shared: bool = False,
+                 new_driver: bool = False, timeout: Optional[float] = None) -> _Driver:
+        """
+        借出一个驱动连接，使用完毕后需要调用 checkin 归还
+
+        :param kind: 驱动类型，"android"/"win"/"web"
+        :param port: 驱动连接的端口
+        :param params: 构建驱动的参数，win/web 支持 local，web 支持 driver_params
+        :param shared: 是否允许与其他借用方共用连接；共用时优先选择借用数最少的连接
+        :param new_driver: 是否丢弃已有连接，重新构建
+        :param timeout: 独占借用时等待空闲连接的最长时间，None 表示一直等待
+        :return: 驱动实例
+        """
+        key = self._make_key(kind, port, params)
+        max_connections = self._max_connections(kind, params, shared)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            self._evict_idle()
+            if new_driver:
+                for entry in list(self._entries.get(key, ())):
+                    entry.retired = True
+                    if entry.leases == 0:
+                        self._close(entry)
+                    else:
+                        self._entries[key].remove(entry)
+
+            while True:
+                entries = self._entries.get(key, [])
+                for entry in [e for e in entries if e.leases == 0]:
+                    if self._is_healthy(entry):
+                        return self._lease(entry)
+                    logger.warning(f"驱动连接已失效，重新构建：{key}")
+                    self._close(entry)
+
+                entries = self._entries.get(key, [])
+                if len(entries) + self._creating.get(key, 0) < max_connections:
+                    self._creating[key] = self._creating.get(key, 0) + 1
+                    break
+
+                if shared and entries:
+                    return self._lease(min(entries, key=lambda e: e.leases))
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"等待驱动连接超时：{key}")
+                self._cond.wait(remaining)
+
+        # 构建连接需要等待驱动连入，不能持有连接池锁
+        try:
+            driver = _build_driver(kind, port, params or {})
+        except BaseException:
+            with self._cond:
+                self._creating[key] -= 1
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self._creating[key] -= 1
+            entry = _PooledDriver(key, driver)
+            self._entries.setdefault(key, []).append(entry)
+            self._by_driver[id(driver)] = entry
+            return self._lease(entry)
+
+    def _lease(self, entry: _PooledDriver) -> _Driver:
+        entry.leases += 1
+        entry.last_used = time.monotonic()
+        return entry.driver
+
+    def checkin(self, driver: _Driver, discard: bool = False) -> None:
+        """
+        归还驱动连接
+
+        :param driver: checkout 借出的驱动实例
+        :param discard: 是否关闭该连接，例如连接已出错
+        :return:
+        """
+        with self._cond:
+            entry = self._by_driver.get(id(driver))
+            if entry is None:
+                return
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+            if discard or (entry.retired and entry.leases == 0):
+                self._close(entry)
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def lease(self, kind: str, port: int, params: Optional[dict] = None, shared: bool = False,
+              timeout: Optional[float] = None) -> Iterator[_Driver]:
+        """
+        以上下文管理器的方式借用驱动连接，退出时自动归还；发生连接异常时关闭该连接
+
+        with driver_pool.lease("win", 26678, {"local": False}) as win_driver:
+            win_driver.find_window(...)
+
+        :param kind: 驱动类型，"android"/"win"/"web"
+        :param port: 驱动连接的端口
+        :param params: 构建驱动的参数
+        :param shared: 是否允许与其他借用方共用连接
+        :param timeout: 等待空闲连接的最长时间
+        :return:
+        """
+        driver = self.checkout(kind, port, params, shared=shared, timeout=timeout)
+        discard = False
+        try:
+            yield driver
+        except OSError:
+            discard = True
+            raise
+        finally:
+            self.checkin(driver, discard=discard)
+
+    def evict_idle(self) -> None:
+        """
+        关闭空闲超过 idle_timeout 的连接
+
+        :return:
+        """
+        with self._cond:
+            self._evict_idle()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        获取各 key 的连接数与借用数
+
+        :return: {"kind:port:params": {"connections": n, "leases": n}}
+        """
+        with self._cond:
+            return {
+                ":".join(map(str, key)): {
+                    "connections": len(entries),
+                    "leases": sum(entry.leases for entry in entries),
+                }
+                for key, entries in self._entries.items()
+            }
+
+    def close(self) -> None:
+        """
+        关闭连接池中的所有连接
+
+        :return:
+        """
+        with self._cond:
+            for entries in list(self._entries.values()):
+                for entry in list(entries):
+                    self._close(entry)
+            self._cond.notify_all()
+
+
+# 进程内共享的驱动连接池，可通过 driver_pool.pool_size、driver_pool.idle_timeout 调整
+driver_pool = DriverPool()
@@ -0,0 +1,484 @@
+import asyncio
+import queue
+import socket
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from time import perf_counter
+from typing import Dict, List, Optional, Callable
+
+# 已编码的命令名缓存，命令名集合有限，无需淘汰
+_COMMAND_CACHE: Dict[str, bytes] = {}
+
+
+def _encode_command(command: str) -> bytes:
+    encoded = _COMMAND_CACHE.get(command)
+    if encoded is None:
+        encoded = _COMMAND_CACHE[command] = command.encode("utf8")
+    return encoded
+
+
+def encode_frame(command: str, *args) -> bytes:
+    """
+    按驱动协议编码请求帧： ``len/len/...`` 头部 + 换行 + 参数
+
+    每个参数只编码一次（None 编码为空串，bool 编码为 true/false），命令名使用缓存，最后通过一次 join 拼接。
+
+    :param command: 命令名
+    :param args: 命令参数
+    :return: 请求帧字节
+    """
+    name = _encode_command(command)
+    parts = [name]
+    lengths = [str(len(name))]
+    for argv in args:
+        if type(argv) is str:
+            encoded = argv.encode("utf8")
+        elif argv is None:
+            encoded = b""
+        elif argv is True:
+            encoded = b"true"
+        elif argv is False:
+            encoded = b"false"
+        else:
+            encoded = str(argv).encode("utf8")
+        parts.append(encoded)
+        lengths.append(str(len(encoded)))
+    return "/".join(lengths).encode("ascii") + b"\n" + b"".join(parts)
+
+
+def encode_file_header(command: str, to_path: str, size: int) -> bytes:
+    """
+    编码文件传输请求帧的头部（不含文件内容），文件内容可紧随其后单独发送
+
+    :param command: 命令名
+    :param to_path: 目标路径
+    :param size: 文件字节长度
+    :return: 头部字节
+    """
+    name = _encode_command(command)
+    path = to_path.encode("utf8")
+    return b"".join([f"{len(name)}/{len(path)}/{size}\n".encode("ascii"), name, path])
+
+
+class TransferStats:
+    """
+    单次文件传输的统计
+
+    - bytes：传输的字节数
+    - elapsed：耗时（秒）
+    - throughput：吞吐量（字节/秒）
+    """
+    __slots__ = ("bytes", "elapsed")
+
+    def __init__(self, size: int, elapsed: float):
+        self.bytes = size
+        self.elapsed = elapsed
+
+    @property
+    def throughput(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"TransferStats(bytes={self.bytes}, elapsed={self.elapsed:.3f}, "
+                f"throughput={self.throughput / (1 << 20):.1f} MB/s)")
+
+
+class FileBody:
+    """
+    从磁盘流式发送的文件内容，作为 transact 的 body 使用
+
+    通过 socket.sendfile 分块发送（Linux/macOS 使用零拷贝的 os.sendfile，其他平台按块读取后发送），
+    内存占用与文件大小无关；每发送一块调用一次 progress(已发送字节数, 总字节数)。
+
+    :param file: 以二进制模式打开的文件
+    :param size: 发送的字节数
+    :param progress: 进度回调
+    """
+    __slots__ = ("file", "size", "progress")
+
+    # 每块的字节数，也是进度回调的粒度
+    chunk_size = 4 << 20
+
+    def __init__(self, file, size: int, progress: Optional[Callable[[int, int], None]] = None):
+        self.file = file
+        self.size = size
+        self.progress = progress
+
+    def __len__(self):
+        return self.size
+
+    def send(self, sock: socket.socket) -> None:
+        offset = 0
+        size = self.size
+        while offset < size:
+            sent = sock.sendfile(self.file, offset, min(self.chunk_size, size - offset))
+            if sent == 0:
+                raise EOFError("文件在传输过程中被截断")
+            offset += sent
+            if self.progress is not None:
+                self.progress(offset, size)
+
+
+class BufferBody:
+    """
+    内存中的数据（bytes、mmap 等支持缓冲区协议的对象），作为 transact 的 body 使用
+
+    按块通过 memoryview 切片发送，不复制数据，多个连接可共享同一个 mmap；每发送一块调用一次 progress(已发送字节数, 总字节数)，
+    progress 中阻塞即可限制发送速度。
+
+    :param buffer: 要发送的数据
+    :param progress: 进度回调
+    """
+    __slots__ = ("buffer", "progress")
+
+    # 每块的字节数，也是进度回调与限速的粒度
+    chunk_size = 256 << 10
+
+    def __init__(self, buffer, progress: Optional[Callable[[int, int], None]] = None):
+        self.buffer = buffer
+        self.progress = progress
+
+    def __len__(self):
+        return memoryview(self.buffer).nbytes
+
+    def send(self, sock: socket.socket) -> None:
+        with memoryview(self.buffer) as view, view.cast("B") as data:
+            size = len(data)
+            for offset in range(0, size, self.chunk_size):
+                with data[offset:offset + self.chunk_size] as chunk:
+                    sock.sendall(chunk)
+                if self.progress is not None:
+                    self.progress(min(offset + self.chunk_size, size), size)
+
+
+def _send_body(sock: socket.socket, body) -> None:
+    if isinstance(body, (FileBody, BufferBody)):
+        body.send(sock)
+    else:
+        sock.sendall(body)
+
+
+class FrameReader:
+    """
+    按驱动协议 ``length/data`` 读取响应帧
+
+    先解析 ``length/`` 头部，再按长度一次性预分配 ``bytearray``，通过 ``recv_into`` 直接写入，避免 ``+=`` 拼接带来的多次拷贝。
+    多读到的字节会保留在缓冲区中，留给下一帧使用。
+    """
+
+    __slots__ = ("_sock", "_address", "_pending")
+
+    # 单次读取头部的最大字节数
+    header_chunk_size = 65535
+
+    def __init__(self, sock: socket.socket, address=None):
+        self._sock = sock
+        self._address = address
+        self._pending = bytearray()
+
+    def _recv_more(self) -> None:
+        chunk = self._sock.recv(self.header_chunk_size)
+        if chunk == b"":
+            self._raise_aborted()
+        self._pending += chunk
+
+    def _raise_aborted(self):
+        if self._address:
+            raise ConnectionAbortedError(f"{self._address[0]}:{self._address[1]} 客户端断开链接")
+        raise ConnectionAbortedError("客户端断开链接")
+
+    def read_header(self) -> int:
+        """
+        读取帧头部，返回数据长度；首次读取可能不包含 ``/``，此时继续读取
+
+        :return: 数据字节长度
+        """
+        while True:
+            index = self._pending.find(b"/")
+            if index != -1:
+                break
+            self._recv_more()
+
+        length = int(self._pending[:index])
+        del self._pending[:index + 1]
+        return length
+
+    def read_into(self, view: memoryview) -> None:
+        """
+        读取数据直到填满 view
+
+        :param view: 可写的 memoryview
+        :return:
+        """
+        filled = 0
+        size = len(view)
+        if self._pending:
+            filled = min(len(self._pending), size)
+            view[:filled] = self._pending[:filled]
+            del self._pending[:filled]
+
+        while filled < size:
+            received = self._sock.recv_into(view[filled:])
+            if received == 0:
+                self._raise_aborted()
+            filled += received
+
+    def read_frame(self) -> bytearray:
+        """
+        读取一个完整的响应帧
+
+        :return: 响应数据
+        """
+        length = self.read_header()
+        data = bytearray(length)
+        with memoryview(data) as view:
+            self.read_into(view)
+        return data
+
+
+class FileSink:
+    """
+    直接写入文件的响应数据接收端，作为 transact 的 sink 使用
+
+    解析 ``length/`` 头部后，循环 ``recv_into`` 固定大小的缓冲区并立即写入文件，内存占用与文件大小无关；
+    每写入一块调用一次 progress(已接收字节数, 总字节数)。
+
+    :param file: 以二进制写模式打开的文件
+    :param progress: 进度回调
+    """
+    __slots__ = ("file", "progress", "received")
+
+    # 接收缓冲区的字节数，也是进度回调的粒度
+    buffer_size = 1 << 20
+
+    def __init__(self, file, progress: Optional[Callable[[int, int], None]] = None):
+        self.file = file
+        self.progress = progress
+        self.received = 0
+
+    def receive(self, reader: "FrameReader") -> None:
+        size = reader.read_header()
+        buffer = bytearray(min(self.buffer_size, size))
+        with memoryview(buffer) as view:
+            while self.received < size:
+                chunk = view[:min(len(view), size - self.received)]
+                reader.read_into(chunk)
+                self.file.write(chunk)
+                self.received += len(chunk)
+                if self.progress is not None:
+                    self.progress(self.received, size)
+
+    def write(self, data: bytes) -> None:
+        """
+        写入已完整读取的响应数据，用于流水线模式（流水线的读取线程总是读取完整的响应帧）
+        """
+        self.file.write(data)
+        self.received = len(data)
+        if self.progress is not None:
+            self.progress(self.received, self.received)
+
+
+def transact(bot, frame: bytes, body=None, command: str = None, sink: FileSink = None) -> Optional[bytearray]:
+    """
+    发送请求帧并读取响应帧，处于流水线模式时交由流水线处理
+
+    bot 开启 metrics_enabled 时按命令名记录发送/接收字节数、等待连接锁的时间、往返时间与错误次数。
+
+    :param bot: AndroidBotBase/WinBotBase/WebBotBase 实例
+    :param frame: 请求帧
+    :param body: 紧随请求帧发送的数据，例如文件内容；FileBody 从磁盘流式发送，BufferBody 分块发送内存中的数据
+    :param command: 命令名，用于统计
+    :param sink: 响应数据的接收端，指定时响应数据直接写入文件，不在内存中保留
+    :return: 响应数据，指定 sink 时返回 None
+    """
+    metrics = bot._metrics if bot.metrics_enabled else None
+    start = perf_counter()
+    acquired = start
+    try:
+        pipeline = bot._pipeline
+        if pipeline is not None:
+            try:
+                data = pipeline.transact(frame, body)
+            except _PipelineClosed:
+                # 读取 _pipeline 后流水线已结束，改为直接收发
+                pipeline = None
+            else:
+                if sink is not None:
+                    sink.write(data)
+                    data = None
+        if pipeline is None:
+            with bot._lock:
+                acquired = perf_counter()
+                bot.request.sendall(frame)
+                if body is not None:
+                    _send_body(bot.request, body)
+                if sink is None:
+                    data = bot._reader.read_frame()
+                else:
+                    sink.receive(bot._reader)
+                    data = None
+    except BaseException:
+        if metrics is not None:
+            metrics.record_error(command)
+        raise
+
+    if metrics is not None:
+        sent = len(frame) if body is None else len(frame) + len(body)
+        received = sink.received if sink is not None else len(data)
+        metrics.record(command, sent, received, acquired - start, perf_counter() - acquired)
+    return data
+
+
+class _PipelineClosed(Exception):
+    """
+    流水线已结束，请求需改为直接收发
+    """
+
+
+class Pipeline:
+    """
+    请求流水线，连续写出多个请求帧，由读取线程按 FIFO 顺序匹配响应
+
+    在 ``with bot.pipeline() as p:`` 中通过 ``p.xxx(...)`` 调用 bot 的方法，立即返回 ``concurrent.futures.Future``，
+    请求帧写出后即返回，不等待响应，因此一批命令只需约一次往返时间。
+    流水线期间在其他线程或直接通过 bot 调用的方法同样经由流水线收发，保证响应顺序正确。
+    同一线程内（包括流水线调用内部）嵌套使用时共用外层流水线；其他线程开启流水线时等待当前流水线结束。
+    """
+
+    def __init__(self, bot, max_workers: int = 16):
+        self._bot = bot
+        self._max_workers = max_workers
+        self._write_lock = threading.Lock()
+        self._waiters: "queue.SimpleQueue[Optional[Future]]" = queue.SimpleQueue()
+        self._local = threading.local()
+        self._futures: List[Future] = []
+        self._error: Optional[BaseException] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._reader_thread: Optional[threading.Thread] = None
+        self._owner: Optional[int] = None
+        self._outer: Optional["Pipeline"] = None
+        self._closed = False
+
+    def _owns_current_thread(self) -> bool:
+        # 开启流水线的线程，或正在执行流水线调用的线程
+        return threading.get_ident() == self._owner or getattr(self._local, "sent", None) is not None
+
+    def __enter__(self) -> "Pipeline":
+        bot = self._bot
+        outer = bot._pipeline
+        if outer is not None and outer._owns_current_thread():
+            # 同一线程（或流水线调用内部）嵌套使用时共用外层流水线的连接与读取线程，只使用独立的线程池，
+            # 外层流水线在所有调用完成前不会结束，因此无需加锁
+            self._outer = outer
+            self._local = outer._local
+        else:
+            # 其他线程的流水线或请求正在使用连接时在此等待
+            bot._lock.acquire()
+            try:
+                self._owner = threading.get_ident()
+                self._reader_thread = threading.Thread(target=self._read_loop, name="AiBotPipelineReader",
+                                                       daemon=True)
+                self._reader_thread.start()
+            except BaseException:
+                bot._lock.release()
+                raise
+            bot._pipeline = self
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="AiBotPipeline")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            # 等待所有调用完成，保证连接上没有未读取的响应
+            wait(self._futures)
+            self._executor.shutdown(wait=True)
+        finally:
+            if self._outer is None:
+                with self._write_lock:
+                    self._closed = True
+                    self._bot._pipeline = None
+                self._waiters.put(None)
+                self._reader_thread.join()
+                self._bot._lock.release()
+
+    def __getattr__(self, name: str) -> Callable[..., Future]:
+        method = getattr(self._bot, name)
+        if not callable(method):
+            raise AttributeError(f"`{name}` is not a method of {type(self._bot).__name__}")
+
+        def submit(*args, **kwargs) -> Future:
+            return self.submit(method, *args, **kwargs)
+
+        return submit
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        在流水线中调用 fn，fn 的第一个请求帧写出（或 fn 执行结束）后返回 Future
+
+        :param fn: 要调用的方法
+        :return: Future，结果为 fn 的返回值
+        """
+        sent = threading.Event()
+
+        def run():
+            self._local.sent = sent
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._local.sent = None
+                sent.set()
+
+        future = self._executor.submit(run)
+        self._futures.append(future)
+        sent.wait()
+        return future
+
+    def transact(self, frame: bytes, body=None) -> bytearray:
+        waiter = Future()
+        with self._write_lock:
+            if self._closed:
+                raise _PipelineClosed
+            if self._error is not None:
+                raise self._error
+            request = self._bot.request
+            request.sendall(frame)
+            if body is not None:
+                _send_body(request, body)
+            # 在写锁内入队，保证入队顺序与写出顺序一致
+            self._waiters.put(waiter)
+
+        sent = getattr(self._local, "sent", None)
+        if sent is not None:
+            sent.set()
+        return waiter.result()
+
+    def _read_loop(self) -> None:
+        reader = self._bot._reader
+        while True:
+            waiter = self._waiters.get()
+            if waiter is None:
+                return
+            if self._error is not None:
+                waiter.set_exception(self._error)
+                continue
+            try:
+                waiter.set_result(reader.read_frame())
+            except BaseException as e:
+                self._error = e
+                waiter.set_exception(e)
+
+
+async def read_frame_async(reader: asyncio.StreamReader, address=None) -> bytes:
+    """
+    从 asyncio 流中读取一个完整的响应帧
+
+    :param reader: asyncio.StreamReader
+    :param address: 对端地址，用于异常信息
+    :return: 响应数据
+    """
+    try:
+        header = await reader.readuntil(b"/")
+        return await reader.readexactly(int(header[:-1]))
+    except asyncio.IncompleteReadError:
+        if address:
+            raise ConnectionAbortedError(f"{address[0]}:{address[1]} 客户端断开链接") from None
+        raise ConnectionAbortedError("客户端断开链接") from None
@@ -0,0 +1,264 @@
+from typing import Dict, List, Hashable, Tuple
+
+from ._frame import Frame, _require_numpy, _parse_color, _color_tolerance
+from ._utils import _Region, _SubColors, Point
+
+# 估算颜色出现频率时的采样步长（像素）
+_SAMPLE_STEP = 4
+# 每次遍历的图像行数
+_CHUNK_ROWS = 128
+# 每批校验的最大候选点数量，限制中间数组的内存占用；只需第一个坐标时首批为 _FIRST_BATCH，之后每批增大 4 倍
+_MAX_BATCH = 1 << 16
+_FIRST_BATCH = 256
+
+
+class _Signature:
+    __slots__ = ("name", "offsets", "colors", "tolerance", "region", "entries")
+
+    def __init__(self, name: Hashable, color: str, sub_colors: _SubColors, similarity: float, region: _Region):
+        self.name = name
+        # 第 0 个点为主颜色，其余为辅助颜色，偏移量为 (x, y)
+        points = [(0, 0, color)] + list(sub_colors or ())
+        self.offsets = [(offset_x, offset_y) for offset_x, offset_y, _ in points]
+        self.colors = [_parse_color(point_color) for _, _, point_color in points]
+        self.tolerance = _color_tolerance(similarity)
+        self.region = region
+        # 每个点的颜色在查找表中的序号
+        self.entries: List[int] = []
+
+
+class ColorSignatureSet:
+    """
+    多点找色特征集合，一次遍历图像即可判断所有特征是否存在
+
+    每个特征与 find_color 的参数相同：主颜色、辅助颜色、相似度与查找区域。编译时把所有颜色做成按通道的位掩码查找表；
+    匹配时先对图像降采样估算各颜色的出现频率，每个特征选出现最少的颜色作为锚点，
+    只遍历一次图像找出所有锚点的候选坐标，再对候选点按颜色出现次数从少到多逐点校验该特征的其余颜色。
+    match 只需第一个坐标，图像按行分块从上到下遍历，全部特征都命中后提前结束。
+    结果与逐个调用 Frame.find_color 一致。
+
+    signatures = ColorSignatureSet()
+    signatures.add("首页", "#008577", [(10, 0, "#FFFFFF"), (0, 10, "#FFFFFF")])
+    signatures.add("弹窗", "#FF0000", region=(0, 0, 500, 300))
+    matched = signatures.match(bot.capture())
+    if "首页" in matched:
+        ...
+    """
+
+    def __init__(self):
+        self._signatures: List[_Signature] = []
+        # 按通道的颜色匹配表，形状为 (3, 256, 颜色数)
+        self._channel_bits = None
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __repr__(self):
+        return f"ColorSignatureSet(signatures={len(self._signatures)})"
+
+    def add(self, name: Hashable, color: str, sub_colors: _SubColors = None, similarity: float = 0.9,
+            region: _Region = None) -> None:
+        """
+        添加特征
+
+        :param name: 特征名称，作为匹配结果的键；
+        :param color: 颜色字符串，必须以 # 开头，例如：#008577；
+        :param sub_colors: 辅助定位的其他颜色；
+        :param similarity: 相似度，0-1 的浮点数，默认 0.9；
+        :param region: 查找区域，默认整个图像，``region = (起点x、起点y、终点x、终点y)``，得到一个矩形
+        :return:
+        """
+        self._signatures.append(_Signature(name, color, sub_colors, similarity, region))
+        self._channel_bits = None
+
+    def compile(self) -> "ColorSignatureSet":
+        """
+        编译查找表，添加特征后首次匹配时会自动编译
+
+        :return: self
+        """
+        np = _require_numpy()
+        entries: Dict[Tuple[Tuple[int, int, int], float], int] = {}
+        for signature in self._signatures:
+            signature.entries = [entries.setdefault((color, signature.tolerance), len(entries))
+                                 for color in signature.colors]
+
+        colors = np.array([color for color, _ in entries], np.int16).reshape(-1, 3)
+        tolerances = np.array([tolerance for _, tolerance in entries]).reshape(-1)
+        values = np.arange(256, dtype=np.int16)[:, None]
+        self._channel_bits = np.stack([np.abs(values - colors[:, channel]) <= tolerances for channel in range(3)])
+        return self
+
+    @staticmethod
+    def _pack(channel_bits):
+        """
+        把 (3, 256, n) 的匹配表按位打包为 (3, 256, 字节数)，第 i 个颜色对应第 i // 8 个字节的第 i % 8 位
+        """
+        np = _require_numpy()
+        return np.packbits(channel_bits, axis=-1, bitorder="little")
+
+    @staticmethod
+    def _channels(pixels, gray: bool):
+        if gray:
+            return pixels, pixels, pixels
+        return pixels[..., 0], pixels[..., 1], pixels[..., 2]
+
+    def _lookup(self, tables, pixels, gray: bool):
+        red_table, green_table, blue_table = tables
+        red, green, blue = self._channels(pixels, gray)
+        words = red_table[red]
+        words &= green_table[green]
+        words &= blue_table[blue]
+        return words
+
+    def _check_orders(self, frame: Frame) -> List[List[int]]:
+        """
+        按降采样图像中各颜色的出现次数，为每个特征的点排序：出现最少的点作为锚点，其余的点按出现次数从少到多校验
+
+        :return: 每个特征的点序号列表，第一个为锚点
+        """
+        np = _require_numpy()
+        sample = frame.pixels[::_SAMPLE_STEP, ::_SAMPLE_STEP]
+        words = self._lookup(self._pack(self._channel_bits), sample, frame.pixels.ndim == 2)
+        words = words.reshape(-1, words.shape[-1])
+        counts = np.zeros(words.shape[1] * 8, np.int64)
+        for bit in range(8):
+            counts[bit::8] = ((words >> bit) & 1).sum(axis=0)
+        return [sorted(range(len(signature.entries)), key=lambda index: counts[signature.entries[index]])
+                for signature in self._signatures]
+
+    @staticmethod
+    def _prefilter(anchor_bits):
+        """
+        按每通道高 5 位构建 32x32x32 的颜色立方体，标记可能匹配任一锚点颜色的格子，用于一次查表排除大部分像素
+        """
+        np = _require_numpy()
+        cells = anchor_bits.reshape(3, 32, 8, -1).any(axis=2).astype(np.float32)
+        red_green = (cells[0][:, None, :] * cells[1][None, :, :]).reshape(32 * 32, -1)
+        return (red_green @ cells[2].T > 0).reshape(-1)
+
+    def _prepare(self, anchor_entries: List[int]):
+        """
+        为当前锚点颜色构建颜色立方体预筛表与打包后的位掩码查找表
+        """
+        anchor_bits = self._channel_bits[:, :, anchor_entries]
+        return self._prefilter(anchor_bits), self._pack(anchor_bits)
+
+    def _candidates(self, pixels, top: int, prepared, anchor_entries: List[int], gray: bool):
+        """
+        遍历图像的若干行，返回匹配任一锚点颜色的像素坐标，以及每个锚点颜色的命中序号
+
+        :return: (ys, xs, {锚点颜色序号: 候选点序号数组})
+        """
+        np = _require_numpy()
+        cube, tables = prepared
+        red, green, blue = self._channels(pixels, gray)
+        code = (red >> 3).astype(np.uint16) << 10
+        code |= (green >> 3).astype(np.uint16) << 5
+        code |= blue >> 3
+        ys, xs = np.nonzero(cube[code])
+
+        words = self._lookup(tables, pixels[ys, xs], gray)
+        # 转置后每行对应 8 个锚点颜色，按行提取命中序号时内存连续
+        masks = np.ascontiguousarray(words.T)
+        hits = {entry: np.flatnonzero(masks[index >> 3] & (1 << (index & 7)))
+                for index, entry in enumerate(anchor_entries)}
+        return ys + top, xs, hits
+
+    def _verify(self, frame: Frame, signature: _Signature, ys, xs, order: List[int]):
+        """
+        批量校验候选主颜色坐标的查找区域与其余颜色，按 order 的顺序逐点筛选，先校验出现较少的颜色
+        """
+        np = _require_numpy()
+        if signature.region and any(signature.region):
+            left, top, right, bottom = frame._pixel_region(signature.region)
+            inside = (ys >= top) & (ys < bottom) & (xs >= left) & (xs < right)
+            ys, xs = ys[inside], xs[inside]
+
+        for index in order:
+            if not len(ys):
+                break
+            offset_x, offset_y = signature.offsets[index]
+            point_ys = ys + round(offset_y * frame.scale)
+            point_xs = xs + round(offset_x * frame.scale)
+            inside = (point_ys >= 0) & (point_ys < frame.height) & (point_xs >= 0) & (point_xs < frame.width)
+            ys, xs, point_ys, point_xs = ys[inside], xs[inside], point_ys[inside], point_xs[inside]
+            pixels = frame.pixels[point_ys, point_xs].astype(np.int16)
+            if pixels.ndim == 1:
+                pixels = pixels[:, None]
+            matched = np.all(np.abs(pixels - signature.colors[index]) <= signature.tolerance, axis=-1)
+            ys, xs = ys[matched], xs[matched]
+        return ys, xs
+
+    def match_all(self, frame: Frame) -> Dict[Hashable, List[Point]]:
+        """
+        在图像中查找所有特征，返回每个存在的特征的全部坐标
+
+        :param frame: 由 capture 得到的图像帧
+        :return: {特征名称: 坐标列表}，坐标按从上到下、从左到右排序
+        """
+        return self._match(frame, first_only=False)
+
+    def match(self, frame: Frame) -> Dict[Hashable, Point]:
+        """
+        在图像中查找所有特征，返回每个存在的特征的第一个坐标，与 find_color 的返回值一致
+
+        :param frame: 由 capture 得到的图像帧
+        :return: {特征名称: 坐标}
+        """
+        return {name: points[0] for name, points in self._match(frame, first_only=True).items()}
+
+    def _match(self, frame: Frame, first_only: bool) -> Dict[Hashable, List[Point]]:
+        if self._channel_bits is None:
+            self.compile()
+        if not self._signatures:
+            return {}
+
+        orders = self._check_orders(frame)
+        anchors = [order[0] for order in orders]
+        gray = frame.pixels.ndim == 2
+        matches: Dict[int, Tuple[List[int], List[int]]] = {index: ([], []) for index in range(len(self._signatures))}
+        pending = list(range(len(self._signatures)))
+        anchor_entries, prepared = None, None
+
+        # 按行分块从上到下遍历；只需第一个坐标时，已命中的特征不再参与后续分块，锚点颜色随之减少
+        for top in range(0, frame.height, _CHUNK_ROWS):
+            entries = sorted({self._signatures[index].entries[anchors[index]] for index in pending})
+            if entries != anchor_entries:
+                anchor_entries, prepared = entries, self._prepare(entries)
+            ys, xs, hits = self._candidates(frame.pixels[top:top + _CHUNK_ROWS], top, prepared, anchor_entries, gray)
+
+            for index in pending:
+                signature, anchor = self._signatures[index], anchors[index]
+                hit = hits[signature.entries[anchor]]
+                # 锚点坐标换算为主颜色坐标，两者偏移固定，排序不变
+                offset_x, offset_y = signature.offsets[anchor]
+                offset_x, offset_y = round(offset_x * frame.scale), round(offset_y * frame.scale)
+
+                matched_ys, matched_xs = matches[index]
+                # 只需第一个坐标时按批次校验，命中后不再校验剩余的候选点
+                begin, step = 0, _FIRST_BATCH if first_only else _MAX_BATCH
+                while begin < len(hit):
+                    batch = hit[begin:begin + step]
+                    batch_ys, batch_xs = self._verify(frame, signature, ys[batch] - offset_y, xs[batch] - offset_x,
+                                                      orders[index][1:])
+                    matched_ys.extend(batch_ys.tolist())
+                    matched_xs.extend(batch_xs.tolist())
+                    if first_only and matched_ys:
+                        break
+                    begin += step
+                    step = min(step * 4, _MAX_BATCH)
+
+            if first_only:
+                pending = [index for index in pending if not matches[index][0]]
+                if not pending:
+                    break
+
+        result = {}
+        for index, (matched_ys, matched_xs) in matches.items():
+            if not matched_ys:
+                continue
+            if first_only:
+                matched_ys, matched_xs = matched_ys[:1], matched_xs[:1]
+            result[self._signatures[index].name] = [frame._to_point(x, y) for y, x in zip(matched_ys, matched_xs)]
+        return result
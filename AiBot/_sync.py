@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import posixpath
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+# 计算文件摘要时每次读取的字节数
+_HASH_CHUNK = 1 << 20
+
+# 手机端清单文件名（write_android_file 要求 .txt 后缀）与本地摘要缓存文件名，两者都不参与同步
+REMOTE_MANIFEST = ".aibot_manifest.txt"
+LOCAL_MANIFEST = ".aibot_manifest.json"
+
+
+def file_digest(path: str) -> str:
+    """
+    计算文件内容摘要（blake2b，16 字节）
+
+    :param path: 文件路径
+    :return: 十六进制摘要
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_json(text: Optional[str]) -> dict:
+    if not text:
+        return {}
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def local_manifest(local_dir: str) -> Dict[str, str]:
+    """
+    计算本地目录的清单 {相对路径: 摘要}，相对路径使用 ``/`` 分隔
+
+    摘要按 (修改时间, 大小) 缓存在目录下的 LOCAL_MANIFEST 中，未变化的文件不会重新读取；目录只读时不保存缓存。
+
+    :param local_dir: 本地目录
+    :return:
+    """
+    cache_path = os.path.join(local_dir, LOCAL_MANIFEST)
+    try:
+        with open(cache_path, encoding="utf8") as file:
+            cache = _load_json(file.read())
+    except OSError:
+        cache = {}
+
+    manifest: Dict[str, str] = {}
+    updated: Dict[str, list] = {}
+    for root, dirs, files in os.walk(local_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, local_dir).replace(os.sep, "/")
+            if relative in (LOCAL_MANIFEST, REMOTE_MANIFEST):
+                continue
+            stat = os.stat(path)
+            cached = cache.get(relative)
+            if isinstance(cached, list) and len(cached) == 3 and cached[:2] == [stat.st_mtime_ns, stat.st_size]:
+                digest = cached[2]
+            else:
+                digest = file_digest(path)
+            manifest[relative] = digest
+            updated[relative] = [stat.st_mtime_ns, stat.st_size, digest]
+
+    if updated != cache:
+        try:
+            with open(cache_path, "w", encoding="utf8") as file:
+                json.dump(updated, file, separators=(",", ":"))
+        except OSError as e:
+            logger.warning(f"无法保存本地摘要缓存 {cache_path}: {e}")
+    return manifest
+
+
+def plan_sync(local: Dict[str, str], remote: Dict[str, str], delete: bool) -> Tuple[List[str], List[str], List[str]]:
+    """
+    对比本地与手机端清单，计算需要创建的目录、推送的文件与删除的文件
+
+    手机端已有文件所在的目录视为已存在；需要创建的目录按层级排序，父目录在前。
+
+    :param local: 本地清单
+    :param remote: 手机端清单
+    :param delete: 是否删除本地已不存在的文件
+    :return: (目录列表, 推送列表, 删除列表)，均为相对路径，目录 "" 表示同步根目录
+    """
+    pushes = [relative for relative, digest in local.items() if remote.get(relative) != digest]
+    deletes = sorted(relative for relative in remote if relative not in local) if delete else []
+
+    existing = set()
+    for relative in remote:
+        parent = posixpath.dirname(relative)
+        while parent not in existing:
+            existing.add(parent)
+            if not parent:
+                break
+            parent = posixpath.dirname(parent)
+    if remote:
+        existing.add("")
+
+    dirs = set()
+    for relative in pushes:
+        parent = posixpath.dirname(relative)
+        while parent not in existing and parent not in dirs:
+            dirs.add(parent)
+            if not parent:
+                break
+            parent = posixpath.dirname(parent)
+    return sorted(dirs, key=lambda d: (d.count("/") + bool(d), d)), pushes, deletes
+
+
+def _succeeded(future: Future, message: str) -> bool:
+    try:
+        if future.result():
+            return True
+    except Exception as e:
+        message = f"{message}: {e}"
+    logger.error(message)
+    return False
+
+
+def sync_dir(bot, local_dir: str, remote_dir: str, delete: bool = True,
+             progress: Callable[[str, int, int], None] = None) -> Dict[str, int]:
+    """
+    将本地目录增量同步到手机，实现见 AndroidBotBase.sync_dir
+    """
+    remote_dir = remote_dir.rstrip("/") + "/"
+    manifest_path = remote_dir + REMOTE_MANIFEST
+
+    local = local_manifest(local_dir)
+    remote = _load_json(bot.read_android_file(manifest_path))
+    dirs, pushes, deletes = plan_sync(local, remote, delete)
+
+    stats = {"pushed": 0, "deleted": 0, "skipped": len(local) - len(pushes), "dirs": len(dirs), "bytes": 0,
+             "failed": 0}
+    if not dirs and not pushes and not deletes:
+        return stats
+
+    def push(relative: str) -> bool:
+        local_path = os.path.join(local_dir, *relative.split("/"))
+        callback = None if progress is None else lambda sent, total: progress(relative, sent, total)
+        return bot.push_file(local_path, remote_dir + relative, callback)
+
+    # 推送前先从清单中移除，结果未确认（包括同步中途出错）的文件下次同步时重新推送
+    for relative in pushes:
+        remote.pop(relative, None)
+    try:
+        # 同一连接上的请求按发送顺序执行，目录先于文件创建
+        with bot.pipeline() as p:
+            for directory in dirs:
+                p.make_android_dir(remote_dir + directory)
+            deleted = {relative: p.delete_android_file(remote_dir + relative) for relative in deletes}
+            pushed = {relative: p.submit(push, relative) for relative in pushes}
+
+        for relative, future in deleted.items():
+            if _succeeded(future, f"删除手机文件失败: {remote_dir + relative}"):
+                remote.pop(relative)
+                stats["deleted"] += 1
+            else:
+                stats["failed"] += 1
+        for relative, future in pushed.items():
+            if _succeeded(future, f"推送文件失败: {relative}"):
+                remote[relative] = local[relative]
+                stats["pushed"] += 1
+                stats["bytes"] += os.path.getsize(os.path.join(local_dir, *relative.split("/")))
+            else:
+                stats["failed"] += 1
+    finally:
+        bot.write_android_file(manifest_path, json.dumps(remote, separators=(",", ":"), sort_keys=True), False)
+    return stats
@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from loguru import logger
+
+from ._sync import file_digest
+
+
+class TemplateRegistry:
+    """
+    找图模板注册表：按文件内容寻址，只推送手机上缺失或已变化的模板
+
+    每个模板以内容摘要命名保存在手机 ``_base_path + remote_dir`` 目录下，内容相同的模板只保存一份；
+    手机上的清单文件记录已存在的摘要，同步时读取清单、推送缺失的模板后写回清单。
+    模板以逻辑名称引用，逻辑名称为相对 local_dir 的路径（不含扩展名），例如 ``login/button``。
+
+    registry = TemplateRegistry("images")
+
+    class CustomAndroidScript(AndroidBotMain):
+        template_registry = registry
+
+        def script_main(self):
+            # 首次使用逻辑名称时自动同步模板
+            self.find_image("login/button")
+
+    :param local_dir: 本地模板目录，为 None 时只能通过 add 注册模板
+    :param patterns: 扫描 local_dir 时匹配的文件名
+    """
+    # 手机上的模板目录（相对 _base_path）与清单文件名，清单文件必须以 .txt 结尾
+    remote_dir = "templates/"
+    manifest_name = "manifest.txt"
+
+    def __init__(self, local_dir: Optional[str] = None,
+                 patterns: Iterable[str] = ("*.png", "*.jpg", "*.jpeg", "*.bmp")):
+        self._lock = threading.Lock()
+        # 逻辑名称 -> 本地路径
+        self._paths: Dict[str, str] = {}
+        # 本地路径 -> ((mtime_ns, size), 远程文件名)
+        self._digests: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        if local_dir is not None:
+            root = Path(local_dir)
+            for pattern in patterns:
+                for path in root.rglob(pattern):
+                    self.add(path.relative_to(root).with_suffix("").as_posix(), str(path))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._paths
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __getitem__(self, name: str) -> str:
+        return self.remote_name(name)
+
+    def __repr__(self):
+        return f"TemplateRegistry(templates={len(self._paths)}, remote_dir={self.remote_dir!r})"
+
+    def add(self, name: str, local_path: str) -> None:
+        """
+        注册模板
+
+        :param name: 逻辑名称
+        :param local_path: 本地图片路径
+        :return:
+        """
+        with self._lock:
+            self._paths[name] = local_path
+
+    def names(self) -> list:
+        """
+        获取所有模板的逻辑名称
+
+        :return:
+        """
+        return list(self._paths)
+
+    def _file_name(self, local_path: str) -> str:
+        """
+        计算本地文件对应的远程文件名（内容摘要 + 扩展名），文件修改时间与大小不变时使用缓存
+        """
+        stat = os.stat(local_path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._digests.get(local_path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        file_name = file_digest(local_path) + os.path.splitext(local_path)[1].lower()
+        with self._lock:
+            self._digests[local_path] = (key, file_name)
+        return file_name
+
+    def remote_name(self, name: str) -> str:
+        """
+        获取模板在手机上的图片名称（相对 _base_path），可直接传给 find_image、find_images
+
+        :param name: 逻辑名称
+        :return:
+        """
+        return self.remote_dir + self._file_name(self._paths[name])
+
+    def _read_manifest(self, bot) -> Dict[str, int]:
+        text = bot.read_android_file(bot._base_path + self.remote_dir + self.manifest_name)
+        if not text:
+            return {}
+        try:
+            manifest = json.loads(text)
+        except ValueError:
+            manifest = None
+        if not isinstance(manifest, dict):
+            logger.warning("模板清单格式错误，将重新推送全部模板")
+            return {}
+        return manifest
+
+    def sync(self, bot, verify: bool = False) -> Dict[str, int]:
+        """
+        将缺失或已变化的模板推送到手机，并更新手机上的清单
+
+        :param bot: AndroidBotBase 实例
+        :param verify: 是否逐个确认清单中的文件仍然存在（清单可能因手动删除文件而过期）
+        :return: {"pushed": 推送文件数, "skipped": 已存在的文件数, "bytes": 推送字节数}
+        """
+        manifest = self._read_manifest(bot)
+        remote_dir = bot._base_path + self.remote_dir
+        if verify:
+            manifest = {file_name: size for file_name, size in manifest.items()
+                        if bot.exists_android_file(remote_dir + file_name)}
+
+        # 内容相同的模板只推送一次
+        files = {self._file_name(local_path): local_path for local_path in set(self._paths.values())}
+        pending = {file_name: local_path for file_name, local_path in files.items() if file_name not in manifest}
+
+        stats = {"pushed": 0, "skipped": len(files) - len(pending), "bytes": 0}
+        if not pending:
+            return stats
+
+        if not manifest:
+            bot.make_android_dir(remote_dir)
+        try:
+            for file_name, local_path in pending.items():
+                if not bot.push_file(local_path, remote_dir + file_name):
+                    logger.error(f"模板推送失败: {local_path}")
+                    continue
+                size = os.path.getsize(local_path)
+                manifest[file_name] = size
+                stats["pushed"] += 1
+                stats["bytes"] += size
+        finally:
+            # 推送中途出错时同样写回已推送的模板，下次同步不再重复推送
+            bot.write_android_file(remote_dir + self.manifest_name, json.dumps(manifest, separators=(",", ":")),
+                                   False)
+        return stats
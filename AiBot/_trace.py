@@ -0,0 +1,46 @@
+import functools
+import itertools
+
+from loguru import logger
+
+_DEBUG_NO = 10
+
+# 全局帧计数器，用于采样；next() 在 GIL 下是原子操作
+_frame_counter = itertools.count()
+
+
+@functools.lru_cache(maxsize=None)
+def _level_no(level: str) -> int:
+    try:
+        return logger.level(level.upper()).no
+    except ValueError:
+        return _DEBUG_NO + 1
+
+
+def should_trace(bot) -> bool:
+    """
+    判断本次收发是否需要记录调试日志
+
+    bot 的 log_level 与 loguru 处理器的最低级别都不高于 DEBUG 时才记录，且每 trace_sample_rate 帧记录一帧。
+    日志关闭时只做两次整数比较，不格式化任何数据。
+
+    :param bot: AndroidBotBase/WinBotBase/WebBotBase 实例
+    :return:
+    """
+    if logger._core.min_level > _DEBUG_NO or _level_no(bot.log_level) > _DEBUG_NO:
+        return False
+    rate = bot.trace_sample_rate
+    return rate <= 1 or next(_frame_counter) % rate == 0
+
+
+def preview(data, size: int) -> str:
+    """
+    截断数据用于日志预览，只格式化前 size 个字节
+
+    :param data: 请求或响应数据
+    :param size: 预览的最大字节数，0 表示不截断
+    :return:
+    """
+    if size <= 0 or len(data) <= size:
+        return repr(data)
+    return f"{data[:size]!r}... ({len(data)} bytes)"
@@ -1,7 +1,12 @@
 import abc
+import queue
 import socket
 import socketserver
-from typing import Union, Tuple, List
+import threading
+import time
+from typing import Union, Tuple, List, Dict
+
+from loguru import logger
 
 Log_Format = "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | " \
              "<level>{level: <8}</level> | " \
@@ -93,6 +98,58 @@ _Algorithm = Tuple[int, int, int]
 _SubColors = List[Tuple[int, int, str]]
 
 
+def _ocr_text_points(text_info_list: list, text: str, region: _Region, scale: float = 1.0, driver=None) -> List[Point]:
+    """
+    根据 OCR 识别结果计算文字所在的坐标（坐标是文本区域中心位置）
+
+    :param text_info_list: OCR 识别结果，OcrLine 列表
+    :param text: 要查找的文字
+    :param region: 识别区域
+    :param scale: 识别时的图片缩放率
+    :param driver: 坐标关联的驱动
+    :return: 坐标列表
+    """
+    text_points = []
+    for line in text_info_list:
+        pos = line.text.find(text)
+        if pos != -1:
+            text_points.append(_ocr_point(line, pos, len(text), region, scale, driver))
+
+    return text_points
+
+
+def _ocr_point(line, pos: int, length: int, region: _Region, scale: float = 1.0, driver=None) -> Point:
+    """
+    计算 OCR 识别结果中一段文字的中心坐标
+
+    :param line: OcrLine
+    :param pos: 文字在整行文本中的起始位置
+    :param length: 文字长度
+    :param region: 识别区域
+    :param scale: 识别时的图片缩放率
+    :param driver: 坐标关联的驱动
+    :return:
+    """
+    (start_x, start_y), _, (end_x, end_y), _ = line.box
+    # 文本区域中心点据左上角的偏移量
+    # 可能指定文本只是部分文本，要计算出实际位置(x轴)
+    width = end_x - start_x
+    height = end_y - start_y
+
+    # 单字符宽度
+    single_word_width = width / len(line.text)
+
+    offset_x = single_word_width * (pos + length / 2)
+    offset_y = height / 2
+
+    # 计算文本区域中心坐标
+    return Point(
+        x=float(region[0] + (start_x + offset_x) / scale),
+        y=float(region[1] + (start_y + offset_y) / scale),
+        driver=driver
+    )
+
+
 def _protect(*protected):
     """
     元类工厂，禁止类属性或方法被子类重写
@@ -124,6 +181,198 @@ class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
     allow_reuse_address = True
 
 
+# 多个服务同时创建工作线程时串行修改 threading.stack_size
+_STACK_SIZE_LOCK = threading.Lock()
+
+
+class _PoolingTCPServer(socketserver.TCPServer):
+    """
+    基于有界线程池的 TCP 服务
+
+    最多同时运行 max_sessions 个会话（script_main），超出的连接进入长度为 session_queue_size 的等待队列，
+    队列已满时直接拒绝（关闭连接）。工作线程按需创建，数量不超过 max_sessions，线程栈大小由 thread_stack_size 控制。
+    """
+    allow_reuse_address = True
+
+    max_sessions = 64  # 最大并发会话数
+    session_queue_size = 128  # 等待队列长度，0 表示不排队，会话已满时直接拒绝
+    thread_stack_size = 0  # 工作线程栈大小（字节），0 表示使用系统默认值
+
+    def __init__(self, server_address, RequestHandlerClass, bind_and_activate=True):
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+        self._pending: "queue.Queue" = queue.Queue()
+        self._state_lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+        self._idle = 0
+        self._active = 0
+        self._queued = 0
+        self._accepted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._queue_time_total = 0.0
+        self._queue_time_max = 0.0
+
+    def process_request(self, request, client_address):
+        with self._state_lock:
+            if self._active + self._queued >= self.max_sessions + self.session_queue_size:
+                self._rejected += 1
+                rejected = True
+                active, queued = self._active, self._queued
+            else:
+                self._accepted += 1
+                self._queued += 1
+                rejected = False
+                if self._idle < self._queued and len(self._workers) < self.max_sessions:
+                    try:
+                        self._spawn_worker()
+                    except BaseException:
+                        # 创建线程失败时撤销计数，由 socketserver 关闭连接
+                        self._accepted -= 1
+                        self._queued -= 1
+                        raise
+
+        if rejected:
+            logger.warning(f"{client_address[0]}:{client_address[1]} 会话数已达上限，拒绝连接；"
+                           f"活跃会话数：{active}，排队数：{queued}")
+            self.shutdown_request(request)
+            return
+
+        self._pending.put((request, client_address, time.monotonic()))
+
+    def _spawn_worker(self) -> None:
+        worker = threading.Thread(target=self._work, name=f"AiBotSession-{len(self._workers)}", daemon=True)
+        if not self.thread_stack_size:
+            worker.start()
+        else:
+            # threading.stack_size 为进程级设置，仅在创建工作线程时临时修改，启动失败时同样恢复
+            with _STACK_SIZE_LOCK:
+                previous = threading.stack_size()
+                try:
+                    threading.stack_size(self.thread_stack_size)
+                    worker.start()
+                finally:
+                    threading.stack_size(previous)
+        self._workers.append(worker)
+        self._idle += 1
+
+    def _work(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            request, client_address, enqueued_at = item
+            waited = time.monotonic() - enqueued_at
+            with self._state_lock:
+                self._idle -= 1
+                self._queued -= 1
+                self._active += 1
+                self._queue_time_total += waited
+                self._queue_time_max = max(self._queue_time_max, waited)
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                with self._state_lock:
+                    self._active -= 1
+                    self._completed += 1
+                    self._idle += 1
+
+    def session_stats(self) -> Dict[str, Union[int, float]]:
+        """
+        获取会话统计信息
+
+        :return: 包含 active、queued、workers、accepted、rejected、completed、queue_time_avg、queue_time_max 的字典，时间单位为秒
+        """
+        with self._state_lock:
+            started = self._accepted - self._queued
+            return {
+                "active": self._active,
+                "queued": self._queued,
+                "workers": len(self._workers),
+                "accepted": self._accepted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "queue_time_avg": self._queue_time_total / started if started else 0.0,
+                "queue_time_max": self._queue_time_max,
+            }
+
+    def server_close(self):
+        super().server_close()
+        for _ in self._workers:
+            self._pending.put(None)
+
+
+def _create_server(socket_address, handler_cls, reuse_port: bool = False,
+                   listen_socket: socket.socket = None) -> socketserver.TCPServer:
+    """
+    根据脚本类的配置创建 Socket 服务
+
+    脚本类的 max_sessions 大于 0 时使用有界线程池 _PoolingTCPServer，否则每个连接创建一个线程；
+    request_queue_size、session_queue_size、thread_stack_size 同样从脚本类读取。
+
+    :param socket_address: 监听地址
+    :param handler_cls: 脚本类
+    :param reuse_port: 是否设置 SO_REUSEPORT，多个进程绑定同一端口时由内核分配连接
+    :param listen_socket: 已处于监听状态的 socket，传入时不再绑定端口，直接在该 socket 上接受连接
+    :return:
+    """
+    max_sessions = int(getattr(handler_cls, "max_sessions", 0) or 0)
+    if max_sessions > 0:
+        server = _PoolingTCPServer(socket_address, handler_cls, bind_and_activate=False)
+        server.max_sessions = max_sessions
+        server.session_queue_size = int(getattr(handler_cls, "session_queue_size", server.session_queue_size))
+        server.thread_stack_size = int(getattr(handler_cls, "thread_stack_size", server.thread_stack_size))
+    else:
+        server = _ThreadingTCPServer(socket_address, handler_cls, bind_and_activate=False)
+
+    if listen_socket is not None:
+        server.socket.close()
+        server.socket = listen_socket
+        server.server_address = listen_socket.getsockname()
+        return server
+
+    # listen 的 backlog 需要在 server_activate 之前设置才会生效
+    server.request_queue_size = int(getattr(handler_cls, "request_queue_size", server.request_queue_size))
+    try:
+        if reuse_port:
+            server.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        server.server_bind()
+        server.server_activate()
+    except BaseException:
+        server.server_close()
+        raise
+    return server
+
+
+_LISTENERS: Dict[int, socket.socket] = {}
+_LISTENERS_LOCK = threading.Lock()
+
+
+def _shared_listener(port: int) -> socket.socket:
+    """
+    获取端口对应的监听 socket，同一端口只绑定一次，多个驱动连接共用
+
+    :param port: 监听端口
+    :return:
+    """
+    with _LISTENERS_LOCK:
+        server = _LISTENERS.get(port)
+        if server is None:
+            address_info = socket.getaddrinfo(None, port, socket.AF_INET, socket.SOCK_STREAM)[0]
+            family, socket_type, proto, _, socket_address = address_info
+            server = socket.socket(family, socket_type, proto)
+            try:
+                server.bind(socket_address)
+                server.listen(16)
+            except BaseException:
+                server.close()
+                raise
+            _LISTENERS[port] = server
+        return server
+
+
 def get_local_ip() -> str:
     """
     获取局域网IP
@@ -0,0 +1,138 @@
+import asyncio
+import random
+import time
+from typing import Optional
+
+
+class WaitStats:
+    """
+    单次等待的统计
+
+    - polls：轮询次数（即发送的命令数）
+    - succeeded：是否在超时前成功
+    - elapsed：总耗时（秒）
+    - slept：休眠总时长（秒）
+    - wasted_sleep：浪费的休眠时长（秒），成功时为最后一次休眠时长（目标可能在该段时间内已出现，是检测延迟的上界），
+      超时时为全部休眠时长
+    """
+    __slots__ = ("polls", "succeeded", "elapsed", "slept", "wasted_sleep")
+
+    def __init__(self):
+        self.polls = 0
+        self.succeeded = False
+        self.elapsed = 0.0
+        self.slept = 0.0
+        self.wasted_sleep = 0.0
+
+    def __repr__(self):
+        return (f"WaitStats(polls={self.polls}, succeeded={self.succeeded}, elapsed={self.elapsed:.3f}, "
+                f"slept={self.slept:.3f}, wasted_sleep={self.wasted_sleep:.3f})")
+
+
+class Waiter:
+    """
+    轮询等待，替代 ``while time.time() < end_time: ... time.sleep(interval_time)`` 循环
+
+    waiter = Waiter(wait_time, interval_time)
+    for _ in waiter:
+        if 条件满足:
+            waiter.hit()
+            return 结果
+
+    - 使用 time.monotonic，不受系统时间调整影响；
+    - 至少轮询一次；两次轮询之间的间隔包含命令本身的耗时，即只休眠 interval - 命令耗时；
+    - 休眠不会超过剩余的等待时间，剩余时间不足时在截止时间再轮询最后一次；
+    - backoff 大于 1 时间隔按指数增长，不超过 max_interval；jitter 为间隔的随机抖动比例（0-1）。
+
+    条件满足时调用 ``hit()`` 标记成功，未调用时（超时、异常、按次数提前结束）视为失败；统计信息见 ``stats``。
+    """
+
+    def __init__(self, timeout: float, interval: float, backoff: float = 1.0, max_interval: Optional[float] = None,
+                 jitter: float = 0.0):
+        self.timeout = timeout
+        self.interval = interval
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.stats = WaitStats()
+
+    def hit(self) -> None:
+        """
+        标记本次等待成功
+        """
+        self.stats.succeeded = True
+
+    @classmethod
+    def for_bot(cls, bot, wait_time: float, interval_time: float) -> "Waiter":
+        """
+        按 bot 的 wait_backoff、wait_max_interval、wait_jitter 配置创建 Waiter，bot.last_wait 指向本次等待的统计
+
+        :param bot: AndroidBotBase/WinBotBase/AsyncAndroidBot 等实例
+        :param wait_time: 等待时间
+        :param interval_time: 轮询间隔时间
+        :return:
+        """
+        waiter = cls(wait_time, interval_time, bot.wait_backoff, bot.wait_max_interval, bot.wait_jitter)
+        bot.last_wait = waiter.stats
+        return waiter
+
+    def _next_delay(self, interval: float, poll_started: float, now: float, deadline: float) -> float:
+        delay = interval - (now - poll_started)
+        if self.jitter:
+            delay += interval * random.uniform(-self.jitter, self.jitter)
+        return max(0.0, min(delay, deadline - now))
+
+    def _grow(self, interval: float) -> float:
+        if self.backoff > 1:
+            interval *= self.backoff
+            if self.max_interval is not None:
+                interval = min(interval, self.max_interval)
+        return interval
+
+    def __iter__(self):
+        stats = self.stats
+        start = time.monotonic()
+        deadline = start + self.timeout
+        interval = self.interval
+        last_sleep = 0.0
+        try:
+            while True:
+                poll_started = time.monotonic()
+                stats.polls += 1
+                yield stats.polls
+
+                now = time.monotonic()
+                if now >= deadline:
+                    return
+                last_sleep = self._next_delay(interval, poll_started, now, deadline)
+                if last_sleep:
+                    time.sleep(last_sleep)
+                    stats.slept += last_sleep
+                interval = self._grow(interval)
+        finally:
+            stats.elapsed = time.monotonic() - start
+            stats.wasted_sleep = last_sleep if stats.succeeded else stats.slept
+
+    async def __aiter__(self):
+        stats = self.stats
+        start = time.monotonic()
+        deadline = start + self.timeout
+        interval = self.interval
+        last_sleep = 0.0
+        try:
+            while True:
+                poll_started = time.monotonic()
+                stats.polls += 1
+                yield stats.polls
+
+                now = time.monotonic()
+                if now >= deadline:
+                    return
+                last_sleep = self._next_delay(interval, poll_started, now, deadline)
+                if last_sleep:
+                    await asyncio.sleep(last_sleep)
+                    stats.slept += last_sleep
+                interval = self._grow(interval)
+        finally:
+            stats.elapsed = time.monotonic() - start
+            stats.wasted_sleep = last_sleep if stats.succeeded else stats.slept
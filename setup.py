@@ -10,6 +10,10 @@ install_requires = [
     "click==8.1.6",
 ]
 
+extras_require = {
+    "frame": ["numpy", "opencv-python"],
+}
+
 setup_kwargs = {
     'name': 'AiBot.py',
     'version': '2.1.0',
@@ -24,6 +28,7 @@ setup_kwargs = {
     'packages': packages,
     'package_data': package_data,
     'install_requires': install_requires,
+    'extras_require': extras_require,
     'python_requires': '>=3.10,<4.0',
 }
 
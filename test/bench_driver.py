@@ -0,0 +1,77 @@
+"""
+基于 FakeDriver 的基准测试：命令吞吐、截图吞吐与轮询效率
+
+运行：python -m test.bench_driver
+"""
+import time
+
+from AiBot._AndroidBase import AndroidBotBase
+from AiBot._WinBase import WinBotBase
+from test.fake_driver import FakeDriver
+
+_NOT_FOUND = "-1.0|-1.0"
+
+
+def bench_commands(port: int, number: int = 5000):
+    print("commands/sec (latency 0):")
+    driver = FakeDriver(port).start()
+    bot = AndroidBotBase._build(port)
+    for name, call in (("click", lambda: bot.click((100, 200))),
+                       ("get_color", lambda: bot.get_color((100, 200))),
+                       ("find_color", lambda: bot.find_color("#FFFFFF")),
+                       ("get_text", lambda: bot.get_text())):
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = time.perf_counter() - start
+        print(f"  android {name:<12}{number / elapsed:>12.0f} cmd/s")
+    driver.stop()
+
+    driver = FakeDriver(port + 1).start()
+    win = WinBotBase._build(port + 1, local=False)
+    start = time.perf_counter()
+    for _ in range(number):
+        win.find_window("Notepad", "")
+    elapsed = time.perf_counter() - start
+    print(f"  win     {'find_window':<12}{number / elapsed:>12.0f} cmd/s")
+    driver.stop()
+
+
+def bench_screenshot(port: int, size_mb: int = 4, number: int = 50):
+    print(f"take_screenshot ({size_mb} MB):")
+    driver = FakeDriver(port, screenshot_size=size_mb << 20).start()
+    bot = AndroidBotBase._build(port)
+    start = time.perf_counter()
+    for _ in range(number):
+        bot.take_screenshot()
+    elapsed = time.perf_counter() - start
+    print(f"  {number * size_mb / elapsed:>10.1f} MB/s")
+    driver.stop()
+
+
+def bench_polling(port: int, misses: int = 10, interval: float = 0.05, latency: float = 0.02):
+    print(f"polling efficiency (find_image, {misses} misses, interval {interval * 1000:.0f} ms, "
+          f"latency {latency * 1000:.0f} ms):")
+    driver = FakeDriver(port, latency=latency,
+                        responses={"findImage": [_NOT_FOUND] * misses + ["100.0|200.0"]}).start()
+    bot = AndroidBotBase._build(port)
+    start = time.perf_counter()
+    point = bot.find_image("target.png", wait_time=30, interval_time=interval)
+    elapsed = time.perf_counter() - start
+    assert point is not None
+    # 理想情况：每 interval 轮询一次，命令耗时计入轮询间隔
+    ideal = misses * interval + latency
+    polls = driver.requests["findImage"]
+    print(f"  polls {polls}, elapsed {elapsed * 1000:.0f} ms, ideal {ideal * 1000:.0f} ms, "
+          f"overshoot {(elapsed - ideal) * 1000:.0f} ms ({elapsed / ideal:.2f}x)")
+    driver.stop()
+
+
+def main(port: int = 17100):
+    bench_commands(port)
+    bench_screenshot(port + 20)
+    bench_polling(port + 30)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+多设备文件分发基准测试：逐台调用 push_file 对比 distribute_files 并发推送
+
+模拟驱动在本机回环网络上，用 device_bandwidth 模拟每台设备的网络带宽上限。
+
+运行：python -m test.bench_fleet [--devices 4] [--size 64] [--device-bandwidth 32]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from AiBot._AndroidBase import AndroidBotBase
+from AiBot._fleet import _TokenBucket, distribute_files
+from test.bench_transfer import make_file
+from test.fake_driver import FakeDriver
+
+
+def serial_push(bots, local_path: str, remote_path: str, device_bandwidth: float) -> float:
+    start = time.perf_counter()
+    for bot in bots:
+        limiter = _TokenBucket(device_bandwidth, 256 << 10)
+        sent = 0
+
+        def throttle(done: int, total: int) -> None:
+            nonlocal sent
+            limiter.consume(done - sent)
+            sent = done
+
+        with open(local_path, "rb") as file:
+            bot.push_buffer(file.read(), remote_path, throttle)
+    return time.perf_counter() - start
+
+
+def main(port: int = 17160):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--size", type=int, default=64, help="文件大小（MB）")
+    parser.add_argument("--device-bandwidth", type=int, default=32, help="每台设备的带宽（MB/s）")
+    args = parser.parse_args()
+
+    size, device_bandwidth = args.size << 20, args.device_bandwidth << 20
+    drivers = [FakeDriver(port + index).start() for index in range(args.devices)]
+    bots = [AndroidBotBase._build(port + index) for index in range(args.devices)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        local_path = os.path.join(directory, "bundle.bin")
+        make_file(local_path, size)
+        total = size * args.devices / (1 << 20)
+        print(f"{args.devices} devices x {args.size} MB, {args.device_bandwidth} MB/s per device")
+
+        elapsed = serial_push(bots, local_path, "bundle.bin", device_bandwidth)
+        print(f"  serial loop          {elapsed:>6.2f} s  {total / elapsed:>7.1f} MB/s")
+
+        for bandwidth in (None, device_bandwidth * args.devices // 2):
+            start = time.perf_counter()
+            reports = distribute_files(bots, {local_path: "bundle.bin"}, bandwidth=bandwidth,
+                                       device_bandwidth=device_bandwidth)
+            elapsed = time.perf_counter() - start
+            assert all(report.ok for report in reports)
+            label = "uncapped" if bandwidth is None else f"cap {bandwidth >> 20} MB/s"
+            print(f"  distribute_files     {elapsed:>6.2f} s  {total / elapsed:>7.1f} MB/s  (aggregate {label})")
+
+    for driver in drivers:
+        driver.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+本地图像处理基准测试：ColorSignatureSet 一次匹配多个多点找色特征，对比逐个发送 findColor 的往返耗时
+
+运行：python -m test.bench_frame
+"""
+import time
+
+import numpy as np
+
+from AiBot._AndroidBase import AndroidBotBase
+from AiBot._frame import Frame
+from AiBot._signatures import ColorSignatureSet
+from test.fake_driver import FakeDriver
+
+
+def make_screen(height: int, width: int, seed: int = 0) -> np.ndarray:
+    """
+    生成类似界面截图的图像：浅色背景、若干纯色色块与少量噪点
+    """
+    rng = np.random.default_rng(seed)
+    pixels = np.full((height, width, 3), 245, np.uint8)
+    for _ in range(60):
+        top, left = rng.integers(0, height - 20), rng.integers(0, width - 20)
+        block_height, block_width = rng.integers(20, 200, 2)
+        pixels[top:top + block_height, left:left + block_width] = rng.integers(0, 256, 3)
+    noise = rng.random((height, width)) < 0.02
+    pixels[noise] = rng.integers(0, 256, (int(noise.sum()), 3))
+    return pixels
+
+
+def make_signatures(pixels: np.ndarray, number: int, seed: int = 1) -> ColorSignatureSet:
+    rng = np.random.default_rng(seed)
+    height, width = pixels.shape[:2]
+    signatures = ColorSignatureSet()
+    for index in range(number):
+        y, x = int(rng.integers(20, height - 20)), int(rng.integers(20, width - 20))
+        sub_colors = []
+        for offset_x, offset_y in rng.integers(-10, 10, (3, 2)).tolist():
+            sub_colors.append((offset_x, offset_y, "#%02X%02X%02X" % tuple(pixels[y + offset_y, x + offset_x])))
+        # 三分之一的特征不存在
+        if index % 3 == 0:
+            sub_colors[0] = (sub_colors[0][0], sub_colors[0][1], "#010203")
+        signatures.add(index, "#%02X%02X%02X" % tuple(pixels[y, x]), sub_colors, similarity=0.95)
+    return signatures
+
+
+def bench_signatures(number: int = 5):
+    print("ColorSignatureSet.match:")
+    for height, width in ((720, 1280), (1080, 1920)):
+        frame = Frame(make_screen(height, width))
+        for count in (50, 200):
+            signatures = make_signatures(frame.pixels, count).compile()
+            start = time.perf_counter()
+            for _ in range(number):
+                matched = signatures.match(frame)
+            elapsed = (time.perf_counter() - start) / number
+            print(f"  {width}x{height} {count:>4} signatures  {elapsed * 1000:>8.1f} ms  matched {len(matched)}")
+
+
+def bench_round_trips(port: int, count: int = 200, latency: float = 0.005):
+    print(f"findColor round trips ({count} signatures, latency {latency * 1000:.0f} ms):")
+    driver = FakeDriver(port, latency=latency).start()
+    bot = AndroidBotBase._build(port)
+    start = time.perf_counter()
+    for _ in range(count):
+        bot.find_color("#FFFFFF", [(10, 0, "#FFFFFF")], wait_time=0)
+    elapsed = time.perf_counter() - start
+    print(f"  {elapsed * 1000:>8.1f} ms")
+    driver.stop()
+
+
+def main(port: int = 17140):
+    bench_signatures()
+    bench_round_trips(port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+OCR 基准：对比 ast.literal_eval 与 AiBot._ocr.parse_ocr 的解析耗时，以及逐个 find_text 与一次 find_texts 的耗时
+
+运行：python -m test.bench_ocr
+"""
+import random
+import time
+import timeit
+from ast import literal_eval
+
+from AiBot._AndroidBase import AndroidBotBase
+from AiBot._ocr import parse_ocr
+from test.fake_driver import FakeDriver
+
+TARGETS = ["设置", "金币:", "确定", "取消", "Level", "背包", "任务奖励", "每日签到", "商城", "不存在"]
+
+
+def make_screen_response(lines: int, seed: int = 0) -> str:
+    """
+    生成类似全屏 OCR 的响应：坐标带小数、文字长短不一，包含引号与数字
+    """
+    rng = random.Random(seed)
+    words = ["设置", "金币:", "12,345", "确定", "取消", "Level 12", "背包", "It's ok", "任务奖励", "每日签到", "商城"]
+    result = []
+    for _ in range(lines):
+        left, top = rng.uniform(0, 1000), rng.uniform(0, 2000)
+        width, height = rng.uniform(20, 400), rng.uniform(20, 60)
+        box = [[left, top], [left + width, top], [left + width, top + height], [left, top + height]]
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        result.append([box, (text, rng.random())])
+    return repr(result)
+
+
+def bench_parse(number: int = 20):
+    for lines in (50, 300, 1000):
+        response = make_screen_response(lines)
+        parsed = parse_ocr(response)
+        expected = literal_eval(response)
+        assert [(line.text, line.score, [list(point) for point in line.box]) for line in parsed] == \
+               [(words, score, box) for box, (words, score) in expected]
+
+        old = timeit.timeit(lambda: literal_eval(response), number=number) / number
+        new = timeit.timeit(lambda: parse_ocr(response), number=number) / number
+        print(f"{lines:>5} lines {len(response) >> 10:>5} KB  literal_eval {old * 1000:>8.2f} ms  "
+              f"parse_ocr {new * 1000:>7.2f} ms  x{old / new:.1f}")
+
+
+def bench_find_texts(port: int, lines: int = 300, latency: float = 0.05):
+    print(f"{len(TARGETS)} targets, {lines} lines, ocr latency {latency * 1000:.0f} ms:")
+    driver = FakeDriver(port, responses={"ocr": make_screen_response(lines)}, latency=latency).start()
+    bot = AndroidBotBase._build(port)
+
+    start = time.perf_counter()
+    expected = {text: bot.find_text(text) for text in TARGETS}
+    print(f"  find_text x{len(TARGETS)}  {(time.perf_counter() - start) * 1000:>8.1f} ms")
+    for max_distance in (0, 1):
+        start = time.perf_counter()
+        result = bot.find_texts(TARGETS, max_distance=max_distance)
+        print(f"  find_texts (max_distance={max_distance})  {(time.perf_counter() - start) * 1000:>8.1f} ms")
+        if not max_distance:
+            assert {text: [(point.x, point.y) for point in points] for text, points in result.items()} == \
+                   {text: [(point.x, point.y) for point in points] for text, points in expected.items()}
+    driver.stop()
+
+
+def main(port: int = 17170):
+    bench_parse()
+    bench_find_texts(port)
+
+
+if __name__ == '__main__':
+    main()
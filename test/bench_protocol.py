@@ -0,0 +1,48 @@
+"""
+请求帧编码微基准：对比旧的 ``+=`` 拼接编码与 AiBot._protocol.encode_frame
+
+运行：python -m test.bench_protocol
+"""
+import timeit
+
+from AiBot._protocol import encode_frame
+
+
+def old_encode(*args) -> bytes:
+    args_len = ""
+    args_text = ""
+
+    for argv in args:
+        if argv is None:
+            argv = ""
+        elif isinstance(argv, bool) and argv:
+            argv = "true"
+        elif isinstance(argv, bool) and not argv:
+            argv = "false"
+
+        argv = str(argv)
+        args_text += argv
+        args_len += str(len(bytes(argv, 'utf8'))) + "/"
+
+    return (args_len.strip("/") + "\n" + args_text).encode("utf8")
+
+
+CASES = {
+    "click": ("click", 540.0, 1200.0),
+    "findImage": ("findImage", "/storage/emulated/0/Android/data/com.aibot.client/files/login.png",
+                  0, 0, 0, 0, 0.9, 0, 0, 0, 1),
+    "setElementText": ("setElementText", "com.aibot.client/android.widget.EditText@text=用户名", "测试文本" * 8),
+}
+
+
+def main(number: int = 200000):
+    print(f"{'command':<16}{'old (us)':>12}{'new (us)':>12}{'speedup':>10}")
+    for name, args in CASES.items():
+        assert old_encode(*args) == encode_frame(*args)
+        old = timeit.timeit(lambda: old_encode(*args), number=number) / number * 1e6
+        new = timeit.timeit(lambda: encode_frame(*args), number=number) / number * 1e6
+        print(f"{name:<16}{old:>12.3f}{new:>12.3f}{old / new:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
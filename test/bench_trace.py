@@ -0,0 +1,68 @@
+"""
+调试日志开销基准：对比旧的 ``log.debug(rf"---> {data}")`` 与 AiBot._trace 的级别判断 + 截断预览
+
+日志级别为 INFO 时，旧写法仍会格式化整个 bytes 的 repr；新写法只做级别判断。
+
+运行：python -m test.bench_trace
+"""
+import sys
+import timeit
+
+from loguru import logger
+
+from AiBot._trace import should_trace, preview
+
+
+class _Bot:
+    log_level = "INFO"
+    trace_preview_size = 256
+    trace_sample_rate = 1
+    log = logger
+
+
+def old_trace(bot, data):
+    bot.log.debug(rf"---> {data}")
+
+
+def new_trace(bot, data):
+    if should_trace(bot):
+        bot.log.debug(f"---> {preview(data, bot.trace_preview_size)}")
+
+
+def no_trace(bot, data):
+    pass
+
+
+PAYLOADS = {
+    "click (20 B)": b"5/5/3\nclick540.01200.0"[:20],
+    "screenshot (1 MB)": bytes(range(256)) * 4096,
+}
+
+
+def run(title: str, number: int, log_level: str = "INFO"):
+    bot = _Bot()
+    bot.log_level = log_level
+    print(title)
+    print(f"{'payload':<20}{'none (us)':>12}{'old (us)':>12}{'new (us)':>12}")
+    for name, data in PAYLOADS.items():
+        times = []
+        for fn in (no_trace, old_trace, new_trace):
+            loops = number if len(data) < 1024 else max(number // 1000, 20)
+            times.append(timeit.timeit(lambda: fn(bot, data), number=loops) / loops * 1e6)
+        print(f"{name:<20}{times[0]:>12.3f}{times[1]:>12.3f}{times[2]:>12.3f}")
+
+
+def main(number: int = 200000):
+    # 日志级别为 INFO：调试日志关闭
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+    run("tracing off (INFO):", number)
+
+    # 日志级别为 DEBUG：新写法只格式化前 trace_preview_size 个字节
+    logger.remove()
+    logger.add(lambda message: None, level="DEBUG")
+    run("tracing on (DEBUG, null sink):", number // 10, "DEBUG")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+文件传输基准测试：pull_file 流式写入临时文件，对比把整个响应读入内存后再写入文件，统计吞吐量与进程峰值内存
+
+每次传输在独立的子进程中运行（与模拟驱动同进程），峰值内存取子进程的 ru_maxrss，互不影响。
+
+运行：python -m test.bench_transfer [--sizes 10,100,1024,2048] [--memory-limit 1024]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from AiBot._AndroidBase import AndroidBotBase
+from AiBot._protocol import encode_frame, transact
+from test.fake_driver import FakeDriver
+
+
+def make_file(path: str, size: int) -> None:
+    chunk = os.urandom(1 << 20)
+    with open(path, "wb") as file:
+        for offset in range(0, size, len(chunk)):
+            file.write(chunk[:size - offset])
+
+
+def _peak_rss() -> int:
+    # Linux 上 ru_maxrss 的单位为 KB，macOS 上为字节
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _pull_in_memory(bot: AndroidBotBase, remote_path: str, local_path: str) -> None:
+    data = transact(bot, encode_frame("pullFile", remote_path), command="pullFile")
+    with open(local_path, "wb") as file:
+        file.write(data)
+
+
+def run_child(mode: str, source: str, port: int) -> dict:
+    driver = FakeDriver(port, responses={"pullFile": Path(source)}).start()
+    bot = AndroidBotBase._build(port)
+    target = source + ".pulled"
+    baseline = _peak_rss()
+    start = time.perf_counter()
+    if mode == "stream":
+        bot.pull_file("bench", target)
+    else:
+        _pull_in_memory(bot, "bench", target)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(target)
+    os.remove(target)
+    driver.stop()
+    return {"size": size, "elapsed": elapsed, "baseline": baseline, "peak": _peak_rss()}
+
+
+def bench(size: int, mode: str, directory: str, port: int) -> dict:
+    source = os.path.join(directory, f"source-{size}.bin")
+    if not os.path.exists(source):
+        make_file(source, size)
+    output = subprocess.run([sys.executable, "-m", "test.bench_transfer", "--child", mode, source, str(port)],
+                            check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    if result["size"] != size:
+        raise RuntimeError(f"传输字节数不一致: {result['size']} != {size}")
+    return result
+
+
+def main(port: int = 17150):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10,100,1024,2048", help="文件大小（MB），逗号分隔")
+    parser.add_argument("--memory-limit", type=int, default=1024, help="读入内存方式只测试不超过该大小（MB）的文件")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "SOURCE", "PORT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, source, child_port = args.child
+        print(json.dumps(run_child(mode, source, int(child_port))))
+        return
+
+    print(f"{'size':>8}  {'mode':<7} {'MB/s':>8} {'peak RSS':>10} {'+RSS':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for megabytes in (int(size) for size in args.sizes.split(",")):
+            size = megabytes << 20
+            for mode in ("stream", "memory"):
+                if mode == "memory" and megabytes > args.memory_limit:
+                    continue
+                result = bench(size, mode, directory, port)
+                port += 1
+                print(f"{megabytes:>6}MB  {mode:<7} {size / result['elapsed'] / (1 << 20):>8.1f} "
+                      f"{result['peak'] / (1 << 20):>8.1f}MB {(result['peak'] - result['baseline']) / (1 << 20):>8.1f}MB")
+            os.remove(os.path.join(directory, f"source-{size}.bin"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+import socket
+
+import pytest
+
+from AiBot._AndroidBase import AndroidBotBase
+from test.fake_driver import FakeDriver
+
+
+def free_port() -> int:
+    # 固定端口在上次运行后可能仍处于 TIME_WAIT，监听端不设置 SO_REUSEADDR，每次取一个空闲端口
+    with socket.socket() as sock:
+        sock.bind(("", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def android():
+    """
+    连接模拟驱动的 AndroidBotBase：android(responses=None, latency=0.0) -> (driver, bot)，测试结束后断开
+    """
+    connections = []
+
+    def connect(responses=None, latency: float = 0.0, **kwargs):
+        port = free_port()
+        driver = FakeDriver(port, responses=responses, latency=latency, **kwargs).start()
+        bot = AndroidBotBase._build(port)
+        connections.append((driver, bot))
+        return driver, bot
+
+    yield connect
+    for driver, bot in connections:
+        # 先关闭脚本端连接，模拟驱动读到 EOF 后退出
+        bot.request.close()
+        driver.stop()
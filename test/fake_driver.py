@@ -0,0 +1,248 @@
+"""
+纯 Python 模拟驱动：连接脚本监听的端口，按驱动协议解析请求并返回预设响应
+
+用于在没有手机、WindowsDriver.exe、WebDriver.exe 的环境下测试与压测 AndroidBotBase/WinBotBase/WebBotBase：
+
+    driver = FakeDriver(16678, latency=0.005, jitter=0.002).start()
+    bot = AndroidBotBase._build(16678)
+
+responses 的值可以是：
+    - str/bytes：固定响应；
+    - list：按顺序依次返回，用完后重复最后一个，用于模拟“轮询若干次后成功”；
+    - pathlib.Path：从磁盘流式发送文件内容，用于压测大文件 pullFile；
+    - callable：接收参数列表（bytes），返回 str/bytes/pathlib.Path。
+
+超过 max_arg_size 字节的请求参数（例如 pushFile 的文件内容）边接收边丢弃，以空串传给 callable，
+模拟驱动自身的内存占用不随文件大小增长。
+"""
+import json
+import os
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+_Response = Union[str, bytes, Path, List[Union[str, bytes]], Callable[[List[bytes]], Union[str, bytes, Path]]]
+
+
+def make_ocr_response(lines: int = 20, text: str = "模拟文本", width: int = 200, height: int = 30) -> str:
+    """
+    生成与驱动 ocr 接口格式一致的响应：[[[[x, y], ...4 个点], ("文本", 置信度)], ...]
+
+    :param lines: 文本行数
+    :param text: 文本内容前缀
+    :param width: 文本区域宽度
+    :param height: 文本区域高度
+    :return:
+    """
+    result = []
+    for index in range(lines):
+        top = 10 + index * (height + 10)
+        box = [[10.0, float(top)], [10.0 + width, float(top)], [10.0 + width, float(top + height)],
+               [10.0, float(top + height)]]
+        result.append(f"[{json.dumps(box)}, ('{text}{index}', 0.9{index % 10})]")
+    return "[" + ", ".join(result) + "]"
+
+
+def default_responses(screenshot_size: int = 1 << 20, ocr_lines: int = 20) -> Dict[str, _Response]:
+    """
+    常用命令的默认响应
+
+    :param screenshot_size: takeScreenshot/pullFile 响应的字节数
+    :param ocr_lines: ocr 响应的文本行数
+    :return:
+    """
+    payload = random.Random(0).randbytes(screenshot_size)
+    ocr = make_ocr_response(ocr_lines)
+    return {
+        "findImage": "100.0|200.0",
+        "findColor": "100.0|200.0",
+        "getColor": "#FFFFFF",
+        "compareColor": "true",
+        "takeScreenshot": payload,
+        "pullFile": payload,
+        "ocr": ocr,
+        "ocrByHwnd": ocr,
+        "ocrByFile": ocr,
+        "getElementRect": "10|20|110|220",
+        "getElementText": "模拟文本",
+        "getElementValue": "模拟文本",
+        "existsElement": "true",
+        "findWindow": "123456",
+        "getAndroidId": "fake-android-id",
+        "getCurrentUrl": "https://example.com/",
+    }
+
+
+class FakeDriver:
+    """
+    模拟驱动，在后台线程中运行
+
+    每个请求按 latency ± jitter 秒延迟后响应，未配置的命令返回 "true"。
+    """
+
+    def __init__(self, port: int, host: str = "127.0.0.1", responses: Optional[Dict[str, _Response]] = None,
+                 latency: float = 0.0, jitter: float = 0.0, screenshot_size: int = 1 << 20, ocr_lines: int = 20,
+                 connect_timeout: float = 10.0, max_arg_size: int = 64 << 20):
+        self.address = (host, port)
+        self.latency = latency
+        self.jitter = jitter
+        self.connect_timeout = connect_timeout
+        self.max_arg_size = max_arg_size
+        self.responses = default_responses(screenshot_size, ocr_lines)
+        if responses:
+            self.responses.update(responses)
+
+        self.requests = Counter()
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.bytes_discarded = 0
+        self._scripted: Dict[str, int] = {}
+        self._random = random.Random(0)
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "FakeDriver":
+        """
+        在后台线程中连接脚本端口并开始响应请求
+
+        :return: self
+        """
+        self._thread = threading.Thread(target=self.run, name="FakeDriver", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        断开连接
+
+        :return:
+        """
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _connect(self) -> socket.socket:
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                sock = socket.create_connection(self.address)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                return sock
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+
+    def run(self) -> None:
+        self._sock = sock = self._connect()
+        buffer = bytearray()
+        try:
+            while True:
+                request = self._read_request(sock, buffer)
+                if request is None:
+                    return
+                command, args = request
+                response = self._respond(command, args)
+                delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+                if delay > 0:
+                    time.sleep(delay)
+                if isinstance(response, Path):
+                    self._send_file(sock, response)
+                    continue
+                frame = f"{len(response)}/".encode("ascii") + response
+                sock.sendall(frame)
+                self.bytes_sent += len(frame)
+        except OSError:
+            return
+        finally:
+            sock.close()
+
+    def _read_request(self, sock: socket.socket, buffer: bytearray):
+        while True:
+            index = buffer.find(b"\n")
+            if index != -1:
+                break
+            if not self._recv(sock, buffer):
+                return None
+
+        lengths = [int(n) for n in bytes(buffer[:index]).split(b"/")]
+        del buffer[:index + 1]
+        self.bytes_received += index + 1
+
+        args = []
+        for length in lengths:
+            if length > self.max_arg_size:
+                if not self._discard(sock, buffer, length):
+                    return None
+                args.append(b"")
+                continue
+            while len(buffer) < length:
+                if not self._recv(sock, buffer):
+                    return None
+            args.append(bytes(buffer[:length]))
+            del buffer[:length]
+            self.bytes_received += length
+        return args[0].decode("utf8"), args[1:]
+
+    def _discard(self, sock: socket.socket, buffer: bytearray, length: int) -> bool:
+        discarded = min(len(buffer), length)
+        del buffer[:discarded]
+        chunk = bytearray(1 << 20)
+        with memoryview(chunk) as view:
+            while discarded < length:
+                received = sock.recv_into(view[:min(len(view), length - discarded)])
+                if not received:
+                    return False
+                discarded += received
+        self.bytes_received += length
+        self.bytes_discarded += length
+        return True
+
+    def _send_file(self, sock: socket.socket, path: Path) -> None:
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            header = f"{size}/".encode("ascii")
+            sock.sendall(header)
+            sock.sendfile(file, 0, size)
+        self.bytes_sent += len(header) + size
+
+    def _recv(self, sock: socket.socket, buffer: bytearray) -> bool:
+        chunk = sock.recv(1 << 20)
+        if not chunk:
+            return False
+        buffer += chunk
+        return True
+
+    def _respond(self, command: str, args: List[bytes]) -> bytes:
+        self.requests[command] += 1
+        response = self.responses.get(command, "true")
+        if isinstance(response, list):
+            index = self._scripted.get(command, 0)
+            self._scripted[command] = index + 1
+            response = response[min(index, len(response) - 1)]
+        elif callable(response):
+            response = response(args)
+        if isinstance(response, str):
+            response = response.encode("utf8")
+        return response
+
+    def reset_script(self, command: Optional[str] = None) -> None:
+        """
+        重置按顺序返回的响应序列
+
+        :param command: 命令名，None 表示全部
+        :return:
+        """
+        if command is None:
+            self._scripted.clear()
+        else:
+            self._scripted.pop(command, None)
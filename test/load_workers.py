@@ -0,0 +1,117 @@
+"""
+多进程 execute 压测：本地模拟设备客户端并发连接，统计不同 workers 数下每秒完成的会话数
+
+运行：python -m test.load_workers [sessions] [concurrency]
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from AiBot import AndroidBotMain
+
+PORT = 16900
+COMMANDS_PER_SESSION = 20
+# 每条命令后脚本侧的 Python 计算量，模拟解析响应、业务判断等占用 GIL 的工作
+CPU_WORK = 20000
+
+
+class LoadScript(AndroidBotMain):
+    log_level = "WARNING"
+    request_queue_size = 128
+
+    def script_main(self):
+        for _ in range(COMMANDS_PER_SESSION):
+            self.get_android_id()
+            sum(i * i for i in range(CPU_WORK))
+
+
+def _read_request(sock: socket.socket, buffer: bytearray) -> bool:
+    while b"\n" not in buffer:
+        chunk = sock.recv(65535)
+        if not chunk:
+            return False
+        buffer += chunk
+    index = buffer.index(b"\n")
+    size = index + 1 + sum(int(n) for n in bytes(buffer[:index]).split(b"/"))
+    while len(buffer) < size:
+        chunk = sock.recv(65535)
+        if not chunk:
+            return False
+        buffer += chunk
+    del buffer[:size]
+    return True
+
+
+def fake_device() -> None:
+    """
+    模拟设备：连接脚本服务，对每个请求回复固定响应，直到脚本关闭连接
+    """
+    sock = socket.create_connection(("127.0.0.1", PORT))
+    buffer = bytearray()
+    try:
+        while _read_request(sock, buffer):
+            sock.sendall(b"16/0123456789abcdef")
+    finally:
+        sock.close()
+
+
+def run_clients(sessions: int, concurrency: int) -> float:
+    remaining = [sessions]
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    return
+                remaining[0] -= 1
+            fake_device()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def wait_port() -> None:
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", PORT), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError("脚本服务未启动")
+
+
+def main(sessions: int = 200, concurrency: int = 16):
+    cpu_count = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, cpu_count})
+    print(f"cpu count: {cpu_count}, sessions: {sessions}, concurrency: {concurrency}")
+    print(f"{'workers':>8}{'seconds':>10}{'sessions/s':>12}")
+    for workers in counts:
+        server = subprocess.Popen([sys.executable, "-m", "test.load_workers", "serve", str(workers)],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_port()
+            # 探测连接也会产生一个会话，先预热一轮
+            run_clients(concurrency, concurrency)
+            elapsed = run_clients(sessions, concurrency)
+            print(f"{workers:>8}{elapsed:>10.2f}{sessions / elapsed:>12.1f}")
+        finally:
+            server.send_signal(signal.SIGINT)
+            server.wait()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == "serve":
+        LoadScript.execute(PORT, workers=int(sys.argv[2]))
+    else:
+        main(*map(int, sys.argv[1:]))
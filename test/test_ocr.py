@@ -0,0 +1,128 @@
+import random
+
+import pytest
+
+from AiBot._ocr import OcrCache, OcrLine, OcrPage, TextMatcher, _from_literal, _fuzzy_find, parse_ocr
+from AiBot._utils import _ocr_text_points
+from test.bench_ocr import TARGETS, make_screen_response
+
+
+def as_tuples(lines):
+    return [(line.box, line.text, line.score) for line in lines]
+
+
+def test_parse_ocr_matches_literal_eval():
+    for seed in range(3):
+        response = make_screen_response(200, seed)
+        parsed = parse_ocr(response)
+        assert len(parsed) == 200
+        assert all(isinstance(line, OcrLine) for line in parsed)
+        assert as_tuples(parsed) == as_tuples(_from_literal(response))
+
+
+def test_parse_ocr_escapes_and_numbers():
+    response = r"""[[[[1, 2], [3.5, 2], [3.5, 4e1], [1, 4e1]], ('It\'s "ok" 金', 0.5)], """ \
+               r"""[[[-1.0, 0.0], [2.0, 0.0], [2.0, 3.0], [-1.0, 3.0]], ("a,b)]", 1)]]"""
+    first, second = parse_ocr(response)
+    assert first.text == "It's \"ok\" 金"
+    assert first.box == ((1.0, 2.0), (3.5, 2.0), (3.5, 40.0), (1.0, 40.0))
+    assert first.center == (2.25, 21.0)
+    assert second.text == "a,b)]" and second.score == 1.0
+
+
+def test_parse_ocr_fallback_and_empty():
+    assert parse_ocr("[]") == []
+    # 正则无法识别的格式回退到 literal_eval
+    with pytest.raises(ValueError):
+        parse_ocr("[[[[0, 0], [2, 0], [2, 2], [0, 2]], ('x', 0.9, 'extra')]]")
+    lines = parse_ocr("[([[0, 0], [2, 0], [2, 2], [0, 2]], ['x', 0.9])]")
+    assert [(line.text, line.score, line.center) for line in lines] == [("x", 0.9, (1.0, 1.0))]
+
+
+def test_ocr_cache_lru():
+    cache = OcrCache(2)
+    lines = parse_ocr(make_screen_response(3))
+    assert cache.get("a") is None
+    cache.put("a", lines)
+    cache.put("b", [])
+    assert cache.get("a") is lines
+    cache.put("c", [])
+    # b 最久未使用，被淘汰
+    assert cache.get("b") is None
+    assert cache.get("c") == []
+    assert cache.stats() == {"entries": 2, "hits": 2, "misses": 2, "evictions": 1, "hit_rate": 0.5}
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["hits"] == 0
+
+
+def test_ocr_cache_on_bot(android):
+    driver, bot = android({"takeScreenshot": [b"frame-1", b"frame-1", b"frame-2"]})
+    bot.ocr_cache = OcrCache()
+    first = bot.get_text()
+    assert bot.get_text() == first
+    assert driver.requests["ocr"] == 1
+    # 截图内容变化后重新识别
+    bot.get_text()
+    assert driver.requests["ocr"] == 2
+    # 不同的识别区域使用不同的键
+    bot.get_text((0, 0, 100, 100))
+    assert driver.requests["ocr"] == 3
+    assert bot.ocr_cache.stats()["hits"] == 1
+
+
+def test_text_matcher_exact_matches_find_text():
+    lines = parse_ocr(make_screen_response(300))
+    region = (10, 20, 0, 0)
+    result = TextMatcher(TARGETS).points(lines, region, 0.5)
+    for text in TARGETS:
+        expected = _ocr_text_points(lines, text, region, 0.5)
+        assert [(point.x, point.y) for point in result[text]] == [(point.x, point.y) for point in expected]
+    assert result["不存在"] == []
+
+
+def edit_distance(a: str, b: str) -> int:
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        previous, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (ca != cb))
+    return row[-1]
+
+
+def test_text_matcher_fuzzy():
+    matcher = TextMatcher(["每日签到", "设置", "ab"], max_distance=1)
+    found = matcher.match("点击每日签倒领取")
+    # 距离同为 1 时取结束位置最靠前的子串
+    assert found[0] == (2, 3)
+    assert 1 not in found
+    # 长度不超过 max_distance 的部分可与任意文字匹配，"ab" 在 "xb" 中距离为 1
+    assert 2 in matcher.match("xb")
+
+    rng = random.Random(1)
+    for _ in range(300):
+        pattern = "".join(rng.choice("abc") for _ in range(rng.randint(2, 5)))
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 12)))
+        result = _fuzzy_find(pattern, text, 1)
+        best = min((edit_distance(pattern, text[i:j]) for i in range(len(text) + 1)
+                    for j in range(i, len(text) + 1)), default=len(pattern))
+        assert (result is not None) == (best <= 1)
+        if result is not None:
+            start, length = result
+            assert edit_distance(pattern, text[start:start + length]) == best
+
+
+def test_ocr_page_queries():
+    lines = parse_ocr(make_screen_response(300, seed=2))
+    page = OcrPage(lines)
+
+    def distance(line, x, y):
+        xs, ys = [px for px, _ in line.box], [py for _, py in line.box]
+        return max(min(xs) - x, 0, x - max(xs)) ** 2 + max(min(ys) - y, 0, y - max(ys)) ** 2
+
+    for x, y in [(0, 0), (500, 1000), (1200, 2500), (-300, 40)]:
+        nearest = page.nearest((x, y))
+        assert distance(nearest, x, y) == min(distance(line, x, y) for line in lines)
+
+    region = (100, 200, 600, 900)
+    inside = [line for line in lines if all(100 <= x <= 600 and 200 <= y <= 900 for x, y in line.box)]
+    assert sorted(map(id, page.in_region(region))) == sorted(map(id, inside))
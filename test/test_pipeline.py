@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+
+
+def test_nested_pipeline_in_same_thread(android):
+    driver, bot = android()
+    with bot.pipeline() as outer:
+        first = outer.get_color((1, 1))
+        with bot.pipeline() as inner:
+            second = inner.get_color((2, 2))
+        # 内层流水线结束时其调用已完成
+        assert second.done()
+        third = bot.get_color((3, 3))
+    assert first.result() == second.result() == third == "#FFFFFF"
+    assert bot._pipeline is None
+    assert driver.requests["getColor"] == 3
+
+
+def test_pipeline_inside_pipeline_call(android):
+    driver, bot = android()
+
+    def batch():
+        with bot.pipeline() as p:
+            futures = [p.get_color((index, index)) for index in range(4)]
+        return [future.result() for future in futures]
+
+    with bot.pipeline() as p:
+        future = p.submit(batch)
+    assert future.result() == ["#FFFFFF"] * 4
+
+
+def test_pipeline_from_other_threads_waits(android):
+    driver, bot = android(latency=0.01)
+    errors = []
+    results = []
+
+    def run():
+        try:
+            with bot.pipeline() as p:
+                futures = [p.get_color((index, index)) for index in range(5)]
+            results.extend(future.result() for future in futures)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not errors
+    assert results == ["#FFFFFF"] * 20
+    assert bot._pipeline is None
+
+
+def test_direct_calls_during_pipeline(android):
+    driver, bot = android(latency=0.01)
+    results = []
+    stop = threading.Event()
+
+    def poll():
+        while not stop.is_set():
+            results.append(bot.get_color((0, 0)))
+
+    thread = threading.Thread(target=poll)
+    thread.start()
+    try:
+        for _ in range(5):
+            with bot.pipeline() as p:
+                futures = [p.get_color((index, index)) for index in range(3)]
+            assert [future.result() for future in futures] == ["#FFFFFF"] * 3
+            time.sleep(0.005)
+    finally:
+        stop.set()
+        thread.join(timeout=10)
+    assert results and set(results) == {"#FFFFFF"}
+
+
+def test_pipeline_releases_lock_on_error(android):
+    driver, bot = android()
+    with pytest.raises(ValueError):
+        with bot.pipeline() as p:
+            p.get_color((0, 0))
+            raise ValueError
+    assert bot._pipeline is None
+    assert bot.get_color((0, 0)) == "#FFFFFF"
+
+
+def test_pipeline_preserves_order(android):
+    received = []
+
+    def echo(args):
+        received.append(args[0])
+        return b"#" + args[0] + args[1]
+
+    driver, bot = android({"getColor": echo}, latency=0.002, jitter=0.002)
+    with bot.pipeline() as p:
+        futures = [p.get_color((index, index * 2)) for index in range(50)]
+        # 流水线期间直接调用的方法同样按顺序收发
+        direct = bot.get_color((99, 99))
+    assert [future.result() for future in futures] == [f"#{index}{index * 2}" for index in range(50)]
+    assert direct == "#9999"
+    assert received[:50] == [str(index).encode() for index in range(50)]
+
+
+
+def test_take_screenshot_returns_bytes(android):
+    driver, bot = android({"takeScreenshot": [b"png-data", b"null"]})
+    data = bot.take_screenshot()
+    assert type(data) is bytes and data == b"png-data"
+    assert {data: 1}[b"png-data"] == 1
+    assert bot.take_screenshot() is None
+
+    driver.responses["takeScreenshot"] = b"png-data"
+    with bot.pipeline() as p:
+        future = p.take_screenshot()
+    assert type(future.result()) is bytes
@@ -0,0 +1,53 @@
+import threading
+
+from AiBot._pool import DriverPool
+from test.conftest import free_port
+from test.fake_driver import FakeDriver
+
+
+def checkout_in_thread(pool, *args, **kwargs):
+    # 旧实现会在 accept() 中一直等待第二个驱动连入，放到线程中以便超时判断
+    result = []
+    thread = threading.Thread(target=lambda: result.append(pool.checkout(*args, **kwargs)), daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive(), "共用借用不应等待新的驱动连入"
+    return result[0]
+
+
+def test_shared_remote_checkout_reuses_connection():
+    pool = DriverPool(pool_size=4)
+    drivers = []
+    try:
+        for kind, params in (("android", None), ("win", {"local": False})):
+            port = free_port()
+            drivers.append(FakeDriver(port).start())
+            first = pool.checkout(kind, port, params, shared=True)
+            second = checkout_in_thread(pool, kind, port, params, shared=True)
+            assert second is first
+            (stats,) = [value for key, value in pool.stats().items() if key.startswith(f"{kind}:{port}:")]
+            assert stats == {"connections": 1, "leases": 2}
+            pool.checkin(first)
+            pool.checkin(second)
+    finally:
+        # 先关闭脚本端连接，模拟驱动读到 EOF 后退出
+        pool.close()
+        for driver in drivers:
+            driver.stop()
+
+
+def test_exclusive_checkout_still_uses_pool_size():
+    pool = DriverPool(pool_size=2)
+    port = free_port()
+    drivers = [FakeDriver(port).start(), FakeDriver(port).start()]
+    try:
+        first = pool.checkout("android", port)
+        second = pool.checkout("android", port)
+        assert second is not first
+        pool.checkin(first)
+        assert pool.checkout("android", port, shared=True) is first
+    finally:
+        # 先关闭脚本端连接，模拟驱动读到 EOF 后退出
+        pool.close()
+        for driver in drivers:
+            driver.stop()
@@ -0,0 +1,96 @@
+import json
+
+from AiBot._sync import REMOTE_MANIFEST, plan_sync
+
+
+class FakeStorage:
+    """
+    模拟手机端文件：记录写入的文本文件与推送的文件
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.pushed = []
+
+    def responses(self):
+        return {
+            "readAndroidFile": lambda args: self.files.get(args[0].decode("utf8"), "null"),
+            "writeAndroidFile": self.write,
+            "pushFile": self.push,
+        }
+
+    def write(self, args):
+        self.files[args[0].decode("utf8")] = args[1].decode("utf8")
+        return "true"
+
+    def push(self, args):
+        self.pushed.append(args[0].decode("utf8"))
+        return "true"
+
+    def manifest(self) -> dict:
+        (text,) = [text for path, text in self.files.items() if path.endswith("/" + REMOTE_MANIFEST)]
+        return json.loads(text)
+
+
+def make_tree(root, files):
+    for relative, text in files.items():
+        path = root.joinpath(*relative.split("/"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+def test_sync_dir_push_error_still_writes_manifest(android, tmp_path):
+    storage = FakeStorage()
+    driver, bot = android(storage.responses())
+    make_tree(tmp_path, {"a.txt": "a", "sub/b.txt": "b", "sub/c.txt": "c"})
+
+    push_file = bot.push_file
+
+    def failing_push(local_path, remote_path, progress=None):
+        if remote_path.endswith("b.txt"):
+            raise ConnectionError("模拟推送异常")
+        return push_file(local_path, remote_path, progress)
+
+    bot.push_file = failing_push
+    stats = bot.sync_dir(str(tmp_path), "remote")
+    assert stats["pushed"] == 2
+    assert stats["failed"] == 1
+    assert sorted(storage.manifest()) == ["a.txt", "sub/c.txt"]
+
+    # 下次同步只重新推送失败的文件
+    del bot.push_file
+    storage.pushed.clear()
+    stats = bot.sync_dir(str(tmp_path), "remote")
+    assert stats["pushed"] == 1 and stats["failed"] == 0 and stats["skipped"] == 2
+    assert [path.endswith("sub/b.txt") for path in storage.pushed] == [True]
+    assert sorted(storage.manifest()) == ["a.txt", "sub/b.txt", "sub/c.txt"]
+
+
+def test_sync_dir_inside_pipeline(android, tmp_path):
+    storage = FakeStorage()
+    driver, bot = android(storage.responses())
+    make_tree(tmp_path, {"a.txt": "a", "b.txt": "b"})
+    with bot.pipeline() as p:
+        color = p.get_color((0, 0))
+        stats = bot.sync_dir(str(tmp_path), "remote")
+    assert stats["pushed"] == 2 and stats["failed"] == 0
+    assert color.result() == "#FFFFFF"
+
+
+def test_plan_sync():
+    local = {"a.txt": "1", "img/x.png": "2", "img/new/y.png": "3", "deep/er/z.bin": "4"}
+    remote = {"a.txt": "1", "img/x.png": "old", "gone.txt": "5", "img/old.png": "6"}
+    dirs, pushes, deletes = plan_sync(local, remote, True)
+    assert sorted(pushes) == ["deep/er/z.bin", "img/new/y.png", "img/x.png"]
+    assert deletes == ["gone.txt", "img/old.png"]
+    # img 已存在于手机端；父目录排在子目录之前
+    assert dirs == ["deep", "deep/er", "img/new"]
+
+    assert plan_sync(local, remote, False)[2] == []
+    assert plan_sync(local, local, True) == ([], [], [])
+
+
+def test_plan_sync_empty_remote():
+    dirs, pushes, deletes = plan_sync({"a.txt": "1", "b/c.txt": "2"}, {}, True)
+    assert dirs == ["", "b"]
+    assert sorted(pushes) == ["a.txt", "b/c.txt"] and deletes == []
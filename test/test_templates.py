@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from AiBot._templates import TemplateRegistry
+from test.test_sync import FakeStorage
+
+
+def test_sync_writes_manifest_when_push_fails(android, tmp_path):
+    for name in ("a", "b", "c"):
+        tmp_path.joinpath(f"{name}.png").write_bytes(name.encode() * 10)
+    registry = TemplateRegistry(str(tmp_path))
+    storage = FakeStorage()
+    driver, bot = android(storage.responses())
+    manifest_path = bot._base_path + registry.remote_dir + registry.manifest_name
+
+    push_file = bot.push_file
+    calls = []
+
+    def failing_push(local_path, remote_path, progress=None):
+        calls.append(local_path)
+        if len(calls) == 2:
+            raise ConnectionError("模拟推送异常")
+        return push_file(local_path, remote_path, progress)
+
+    bot.push_file = failing_push
+    with pytest.raises(ConnectionError):
+        registry.sync(bot)
+    # 异常前已推送的模板写入了清单
+    assert len(json.loads(storage.files[manifest_path])) == 1
+
+    del bot.push_file
+    stats = registry.sync(bot)
+    assert stats["pushed"] == 2 and stats["skipped"] == 1
+    assert len(json.loads(storage.files[manifest_path])) == 3
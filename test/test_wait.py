@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from AiBot._wait import Waiter
+
+
+def exists_only(xpath: str):
+    return lambda args: "true" if args[0].decode("utf8") == xpath else "false"
+
+
+def test_any_elements_exists_from_threads(android):
+    driver, bot = android({"existsElement": exists_only("b")}, latency=0.005)
+    results = []
+    errors = []
+
+    def run():
+        try:
+            results.append(bot.any_elements_exists(["a", "b", "c"], wait_time=1, interval_time=0.01))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not errors
+    assert results == ["b"] * 4
+
+
+def test_any_elements_exists_inside_pipeline(android):
+    driver, bot = android({"existsElement": exists_only("c")})
+    with bot.pipeline() as p:
+        color = p.get_color((0, 0))
+        direct = bot.any_elements_exists(["a", "b", "c"], wait_time=1, interval_time=0.01)
+        submitted = p.any_elements_exists(["a", "b", "c"], wait_time=1, interval_time=0.01)
+    assert direct == "c"
+    assert submitted.result() == "c"
+    assert color.result() == "#FFFFFF"
+
+
+def test_wait_any_timeout(android):
+    driver, bot = android({"existsElement": "false"})
+    assert bot.any_elements_exists(["a", "b"], wait_time=0.05, interval_time=0.01) is None
+    assert driver.requests["existsElement"] >= 2
+
+
+def test_waiter_succeeds_only_on_hit():
+    waiter = Waiter(1, 0.001)
+    for _ in waiter:
+        waiter.hit()
+        break
+    assert waiter.stats.succeeded and waiter.stats.polls == 1
+
+    # 按次数提前结束不算成功
+    waiter = Waiter(1, 0.001)
+    for count in waiter:
+        if count >= 3:
+            break
+    assert not waiter.stats.succeeded and waiter.stats.polls == 3
+
+    waiter = Waiter(1, 0.001)
+    with pytest.raises(ConnectionError):
+        for _ in waiter:
+            raise ConnectionError
+    assert not waiter.stats.succeeded
+
+    waiter = Waiter(0.01, 0.001)
+    for _ in waiter:
+        pass
+    assert not waiter.stats.succeeded and waiter.stats.wasted_sleep == waiter.stats.slept
+
+
+def test_last_wait(android):
+    driver, bot = android({"existsElement": ["false", "false", "true"]})
+    assert bot.element_exists("a", wait_time=1, interval_time=0.001)
+    assert bot.last_wait.succeeded and bot.last_wait.polls == 3
+
+    driver.responses["existsElement"] = "false"
+    assert not bot.element_exists("a", wait_time=0.01, interval_time=0.001)
+    assert not bot.last_wait.succeeded and bot.last_wait.polls >= 2